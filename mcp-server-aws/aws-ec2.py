@@ -1,64 +1,5 @@
-from mcp.server.fastmcp import FastMCP
-from helper import create_ec2_instance,terminate_ec2_instance,stop_ec2_instance, start_ec2_instance
-
-
-# Initialize FastMCP server
-mcp = FastMCP("aws")
-
-@mcp.tool()
-async def initiate_aws_ec2_instance():
-    """
-    Initiates the AWS EC2 instance creation process.
-    This function doesn't take any arguments and is called when the script is run.
-    """
-    print("Initiating AWS EC2 instance creation...")
-    instance_id = create_ec2_instance()
-    if instance_id:
-        return f"EC2 instance created with ID: {instance_id}"
-    else:
-        return "Failed to create EC2 instance. Please check the logs for more details."
-
-@mcp.tool()
-async def terminate_aws_ec2_instance(instance_id: str):
-    """
-    Terminates the AWS EC2 instance.
-    This function doesn't take any arguments and is called when the script is run.
-    """
-    print("Terminating AWS EC2 instance...")
-    # Replace 'your_instance_id' with the actual instance ID you want to terminate
-    
-    if instance_id:
-        terminate_ec2_instance(instance_id)
-        return f"EC2 instance with ID: {instance_id} has been terminated."
-    else:
-        return "No instance ID provided. Please provide a valid instance ID to terminate."
-
-@mcp.tool()
-async def stop_aws_ec2_instance(instance_id: str):
-    """Stops the AWS EC2 instance."""
-    print("Stopping AWS EC2 instance...")
-    if instance_id:
-        result = stop_ec2_instance(instance_id)
-        return f"EC2 instance with ID: {instance_id} has been stopped." if result else "Failed to stop EC2 instance."
-    else:
-        return "No instance ID provided. Please provide a valid instance ID to stop."
-
-@mcp.tool()
-async def start_aws_ec2_instance(instance_id: str):
-    """Starts the AWS EC2 instance."""
-    print("Starting AWS EC2 instance...")
-    if instance_id:
-        result = start_ec2_instance(instance_id)
-        return f"EC2 instance with ID: {instance_id} has been started." if result else "Failed to start EC2 instance."
-    else:
-        return "No instance ID provided. Please provide a valid instance ID to start."
-
-
-
+"""EC2 MCP server: server.py with the ec2 toolset (override with --toolsets or MCP_AWS_TOOLSETS)."""
+from server import main
 
 if __name__ == "__main__":
-    # Initialize and run the server
-    
-    print("Starting FastMCP server...")
-    mcp.run(transport='stdio')
-    print("FastMCP server is running.")
+    main(["ec2"])
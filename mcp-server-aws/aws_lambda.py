@@ -1,18 +1,5 @@
-from mcp.server.fastmcp import FastMCP
-from helper import create_lambda_function, delete_lambda_function
-
-mcp = FastMCP("aws")
-
-@mcp.tool()
-async def create_lambda():
-    """Creates an AWS Lambda function."""
-    return create_lambda_function()
-
-@mcp.tool()
-async def delete_lambda():
-    """Deletes an AWS Lambda function."""
-    return delete_lambda_function()
+"""Lambda MCP server: server.py with the lambda toolset (override with --toolsets or MCP_AWS_TOOLSETS)."""
+from server import main
 
 if __name__ == "__main__":
-    print("Starting FastMCP server for Lambda...")
-    mcp.run(transport='stdio')
+    main(["lambda"])
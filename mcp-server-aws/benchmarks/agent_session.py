@@ -0,0 +1,89 @@
+"""
+Per-query MCP overhead: a server spawned per query vs one persistent session.
+
+Measures what the agent pays around the model calls, without calling a model:
+
+    spawn       the old agent loop: start the server, initialize, list tools,
+                call one tool, shut down (for every query)
+    persistent  openai-agent/session.py: one server for all queries; each
+                query is a liveness ping plus the tool call
+
+The tool is inventory_cache_stats, which never touches AWS.
+
+    uv run benchmarks/agent_session.py --queries 20
+    uv run benchmarks/agent_session.py --launcher python    # skip `uv run` in the spawn path
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOOL = "inventory_cache_stats"
+
+
+def _params(launcher):
+    if launcher == "uv":
+        return StdioServerParameters(command="uv", args=["--directory", ROOT_DIR, "run", "aws.py"])
+    return StdioServerParameters(command=sys.executable, args=[os.path.join(ROOT_DIR, "aws.py")],
+                                 cwd=ROOT_DIR)
+
+
+async def spawn_per_query(params, queries):
+    latencies = []
+    for _ in range(queries):
+        started = time.perf_counter()
+        async with stdio_client(params) as streams:
+            async with ClientSession(*streams) as session:
+                await session.initialize()
+                await session.list_tools()
+                await session.call_tool(TOOL, {})
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def persistent(params, queries):
+    latencies = []
+    async with stdio_client(params) as streams:
+        async with ClientSession(*streams) as session:
+            await session.initialize()
+            await session.list_tools()
+            for _ in range(queries):
+                started = time.perf_counter()
+                await session.send_ping()
+                await session.call_tool(TOOL, {})
+                latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def _report(label, latencies):
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<11} {len(latencies):>7} {statistics.median(latencies) * 1000:>10.1f} "
+          f"{p95 * 1000:>10.1f}")
+    return statistics.median(latencies)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--launcher", choices=["uv", "python"],
+                        default="uv" if shutil.which("uv") else "python")
+    args = parser.parse_args()
+
+    params = _params(args.launcher)
+    print(f"launcher: {args.launcher}")
+    print(f"{'mode':<11} {'queries':>7} {'p50 ms':>10} {'p95 ms':>10}")
+    spawn = _report("spawn", await spawn_per_query(params, args.queries))
+    warm = _report("persistent", await persistent(params, args.queries))
+    print(f"persistent session saves {(spawn - warm) * 1000:.0f} ms per query ({spawn / warm:.0f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
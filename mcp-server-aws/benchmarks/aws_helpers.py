@@ -0,0 +1,422 @@
+"""
+Latency, API calls and memory of the AWS helpers and MCP tools, offline.
+
+Runs the EC2 instance lifecycle (create, stop, start, terminate), S3 bucket
+create/delete and Lambda deploys (create, update, unchanged) at each
+concurrency level, through two layers:
+
+    helpers   helper_ec2 / helper1 / helper_lambda, called from a thread pool
+    tools     the same operations as MCP tool calls to server.py's toolsets,
+              in-process over in-memory MCP sessions (one per concurrent caller)
+
+By default every AWS call is answered in-process by benchmarks/aws_stub.py,
+which adds --latency-ms per call and needs no account. --endpoint-url sends the
+calls to a local emulator instead (moto_server, LocalStack). For each
+(layer, operation, concurrency) it reports p50/p95/p99 latency, throughput,
+AWS API calls per operation (counted on every pooled client) and the
+process's peak RSS so far.
+
+There is a single S3_BUCKET_NAME, so concurrent bucket creates all target one
+bucket (the first creates it, the rest find it already owned). Bucket deletes
+run one at a time against a bucket seeded with --bucket-objects objects,
+and the concurrency level sets the emptying workers (S3_EMPTY_MAX_WORKERS).
+
+    uv run benchmarks/aws_helpers.py --compare benchmarks/baselines/aws_helpers.json   # exit 1 on more API calls/errors
+    uv run benchmarks/aws_helpers.py --save benchmarks/baselines/aws_helpers.json      # accept new numbers
+    moto_server -p 5000 &
+    uv run benchmarks/aws_helpers.py --endpoint-url http://localhost:5000 --concurrency 1,4
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+BUCKET = "mcp-helpers-bench"
+GROUPS = {
+    "ec2": ["ec2.create", "ec2.stop", "ec2.start", "ec2.terminate"],
+    "s3": ["s3.create_bucket", "s3.delete_bucket"],
+    "lambda": ["lambda.create", "lambda.update", "lambda.unchanged"],
+}
+# (layer, operation, concurrency) identifies a result across runs.
+KEY_FIELDS = ("layer", "operation", "concurrency")
+
+
+class CallCounter:
+    """client_pool hook counting API calls per service.Operation on every pooled client."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.paused = False
+        self._lock = threading.Lock()
+
+    def install(self, client, account="default"):
+        service = client.meta.service_model.service_name
+
+        def after_call(model, **kwargs):
+            if not self.paused:
+                with self._lock:
+                    self.calls[f"{service}.{model.name}"] += 1
+
+        client.meta.events.register("after-call", after_call)
+
+    def take(self):
+        with self._lock:
+            calls, self.calls = self.calls, Counter()
+        return calls
+
+
+def peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _environment(args, workdir):
+    """Settings the helpers read, pointed at the stub or the emulator. Returns the two deploy zips."""
+    os.environ.update(
+        AWS_REGION="us-east-1",
+        AMI_ID=os.environ.get("AMI_ID", "ami-12c6146b"),
+        KEY_NAME=os.environ.get("KEY_NAME", "bench"),
+        SECURITY_GROUP_IDS=os.environ.get("SECURITY_GROUP_IDS", "sg-0123456789abcdef0"),
+        S3_BUCKET_NAME=BUCKET,
+        S3_EMPTY_CHECKPOINT_DIR=os.path.join(workdir, "checkpoints"),
+        LAMBDA_ROLE_ARN="arn:aws:iam::123456789012:role/bench",
+        # Stub and emulator calls never hit the AWS rate limits.
+        AWS_RATE_LIMIT="100000", AWS_RATE_BURST="100000",
+        # FastMCP logs every request at INFO.
+        FASTMCP_LOG_LEVEL="WARNING",
+    )
+    if args.endpoint_url:
+        os.environ["AWS_ENDPOINT_URL"] = args.endpoint_url
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        os.environ.setdefault(name, "testing")
+    zips = []
+    for version in (1, 2):
+        path = os.path.join(workdir, f"function-v{version}.zip")
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("lambda_function.py", f"def lambda_handler(event, context):\n    return {version}\n")
+        zips.append(path)
+    import config
+
+    config.reload()
+    return zips
+
+
+class Suite:
+    def __init__(self, args, zips):
+        import client_pool
+        import helper1
+        import helper_ec2
+        import helper_lambda
+
+        self.args = args
+        self.zips = zips
+        self.helper1, self.helper_ec2, self.helper_lambda = helper1, helper_ec2, helper_lambda
+        self.counter = CallCounter()
+        self.stub = None
+        if not args.endpoint_url:
+            from aws_stub import FakeAWS
+
+            self.stub = FakeAWS(args.latency_ms)
+            client_pool.add_client_hook(self.stub.install)
+        client_pool.add_client_hook(self.counter.install)
+        self.get_client = client_pool.get_client
+        # Build the pooled clients up front so the first samples do not pay for it.
+        for service in ("ec2", "s3", "lambda"):
+            self.get_client(service)
+        self.instances = []
+
+    # -- what one operation does, per layer ---------------------------------
+
+    def helper_call(self, operation, prefix, i):
+        if operation == "ec2.create":
+            return self.helper_ec2.create_ec2_instance(IdempotencyKey=f"{prefix}-{i}")
+        if operation in ("ec2.stop", "ec2.start", "ec2.terminate"):
+            verb = operation.split(".")[1]
+            return getattr(self.helper_ec2, f"{verb}_ec2_instance")(self.instances[i])
+        if operation == "s3.create_bucket":
+            return self.helper1.create_s3_bucket(f"{prefix}-{i}")
+        if operation == "s3.delete_bucket":
+            return self.helper1.delete_s3_bucket(force=True)
+        return self.helper_lambda.deploy_lambda_function(f"{prefix}-fn-{i}", self._zip(operation))
+
+    def tool_call(self, operation, prefix, i):
+        if operation == "ec2.create":
+            return "initiate_aws_ec2_instance", {"idempotency_key": f"{prefix}-{i}"}
+        if operation in ("ec2.stop", "ec2.start", "ec2.terminate"):
+            return f"{operation.split('.')[1]}_aws_ec2_instance", {"instance_id": self.instances[i]}
+        if operation == "s3.create_bucket":
+            return "initiate_s3_bucket_creation", {"idempotency_key": f"{prefix}-{i}"}
+        if operation == "s3.delete_bucket":
+            return "initiate_s3_bucket_deletion", {"force": True}
+        return "deploy_lambda", {"function_name": f"{prefix}-fn-{i}", "zip_path": self._zip(operation)}
+
+    def _zip(self, operation):
+        return self.zips[0] if operation == "lambda.create" else self.zips[1]
+
+    def _record(self, operation, i, result):
+        if operation == "ec2.create" and result.get("ok"):
+            self.instances[i] = result["instance_id"]
+        return bool(result.get("ok"))
+
+    def _seed_bucket(self):
+        """Recreate BUCKET with --bucket-objects objects, without counting the calls."""
+        if self.stub is not None:
+            self.stub.seed_bucket(BUCKET, self.args.bucket_objects)
+            return
+        self.counter.paused = True
+        try:
+            s3 = self.get_client("s3")
+            try:
+                s3.create_bucket(Bucket=BUCKET)
+            except Exception as e:
+                if "BucketAlreadyOwnedByYou" not in str(e):
+                    raise
+            for n in range(self.args.bucket_objects):
+                s3.put_object(Bucket=BUCKET, Key=f"bench/object-{n:07d}", Body=b"x" * 1024)
+        finally:
+            self.counter.paused = False
+
+    # -- runners -------------------------------------------------------------
+
+    def _ops(self, operation):
+        return self.args.delete_rounds if operation == "s3.delete_bucket" else self.args.ops
+
+    def run_helpers(self, operation, level, prefix):
+        def one(i):
+            started = time.perf_counter()
+            try:
+                ok = self._record(operation, i, self.helper_call(operation, prefix, i))
+            except Exception:
+                ok = False
+            return time.perf_counter() - started, ok
+
+        if operation == "s3.delete_bucket":
+            samples = []
+            for i in range(self._ops(operation)):
+                self._seed_bucket()
+                samples.append(one(i))
+            return samples
+        with ThreadPoolExecutor(max_workers=level) as pool:
+            return list(pool.map(one, range(self._ops(operation))))
+
+    async def run_tools(self, sessions, operation, prefix):
+        async def one(session, i):
+            name, arguments = self.tool_call(operation, prefix, i)
+            started = time.perf_counter()
+            try:
+                result = await session.call_tool(name, arguments)
+                text = "".join(getattr(part, "text", "") for part in result.content)
+                ok = not result.isError and self._record(operation, i, json.loads(text))
+            except Exception:
+                ok = False
+            return time.perf_counter() - started, ok
+
+        if operation == "s3.delete_bucket":
+            samples = []
+            for i in range(self._ops(operation)):
+                await asyncio.to_thread(self._seed_bucket)
+                samples.append(await one(sessions[0], i))
+            return samples
+
+        pending = iter(range(self._ops(operation)))
+        samples = []
+
+        async def caller(session):
+            for i in pending:
+                samples.append(await one(session, i))
+
+        await asyncio.gather(*(caller(session) for session in sessions))
+        return samples
+
+    # -- one (layer, operation, level) result ---------------------------------
+
+    def operations(self):
+        return [operation for group in self.args.groups for operation in GROUPS[group]]
+
+    def _prepare(self, operation, level):
+        self.counter.take()
+        if operation == "s3.delete_bucket":
+            import config
+
+            os.environ["S3_EMPTY_MAX_WORKERS"] = str(level)
+            config.reload()
+        return time.perf_counter()
+
+    def helpers_layer(self, level):
+        self.instances = [None] * self.args.ops
+        prefix = f"bench-helpers-c{level}-{self.args.run_id}"
+        results = []
+        for operation in self.operations():
+            started = self._prepare(operation, level)
+            samples = self.run_helpers(operation, level, prefix)
+            results.append(summarize("helpers", operation, level, samples,
+                                     time.perf_counter() - started, self.counter.take()))
+        return results
+
+    async def tools_layer(self, level):
+        from mcp.shared.memory import create_connected_server_and_client_session
+        import server
+
+        mcp, _ = server.build_server(self.args.groups)
+        self.instances = [None] * self.args.ops
+        prefix = f"bench-tools-c{level}-{self.args.run_id}"
+        results = []
+        async with AsyncExitStack() as stack:
+            # mcp handles one session's requests in order, so each concurrent caller gets its own.
+            sessions = [await stack.enter_async_context(create_connected_server_and_client_session(mcp._mcp_server))
+                        for _ in range(level)]
+            for operation in self.operations():
+                started = self._prepare(operation, level)
+                samples = await self.run_tools(sessions, operation, prefix)
+                results.append(summarize("tools", operation, level, samples,
+                                         time.perf_counter() - started, self.counter.take()))
+        return results
+
+
+def summarize(layer, operation, level, samples, wall, calls):
+    times = sorted(elapsed for elapsed, _ in samples)
+    if operation == "s3.delete_bucket":
+        # Deletes run one at a time with the bucket seeding in between; leave the seeding out.
+        wall = sum(times)
+    result = {
+        "layer": layer,
+        "operation": operation,
+        "concurrency": level,
+        "ops": len(samples),
+        "errors": sum(1 for _, ok in samples if not ok),
+        "p50_ms": round(statistics.median(times) * 1000, 2),
+        "p95_ms": round(percentile(times, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(times, 0.99) * 1000, 2),
+        "ops_per_s": round(len(samples) / wall, 1) if wall else None,
+        "api_calls_per_op": round(sum(calls.values()) / len(samples), 3),
+        "api_calls": dict(sorted(calls.items())),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(f"{layer:<8} {operation:<17} {level:>4} {result['ops']:>5} {result['errors']:>4} "
+          f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} "
+          f"{result['ops_per_s']:>8} {result['api_calls_per_op']:>7} {result['peak_rss_mb']:>8}")
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """
+    (regressions, slowdowns) against baseline.
+
+    Regressions are more API calls or more errors per operation; both are
+    deterministic against the stub. Slowdowns are p50s beyond tolerance.
+    Tail percentiles are reported but not compared, because a few samples
+    decide them.
+    """
+    previous = {tuple(r[field] for field in KEY_FIELDS): r for r in baseline["results"]}
+    regressions, slowdowns = [], []
+    for result in results:
+        before = previous.get(tuple(result[field] for field in KEY_FIELDS))
+        if before is None:
+            continue
+        label = "/".join(str(result[field]) for field in KEY_FIELDS)
+        if result["api_calls_per_op"] > before["api_calls_per_op"] + 1e-9:
+            regressions.append(f"{label}: API calls/op {before['api_calls_per_op']} -> {result['api_calls_per_op']}")
+        if result["errors"] > before["errors"]:
+            regressions.append(f"{label}: errors {before['errors']} -> {result['errors']}")
+        # 2 ms of slack keeps scheduler noise on short stub calls out.
+        if result["p50_ms"] > before["p50_ms"] * (1 + tolerance) + 2:
+            slowdowns.append(f"{label}: p50 {before['p50_ms']} -> {result['p50_ms']} ms")
+    return regressions, slowdowns
+
+
+def _levels(text):
+    return [int(level) for level in text.split(",") if level.strip()]
+
+
+def _groups(text):
+    groups = [group.strip() for group in text.split(",") if group.strip()]
+    unknown = set(groups) - GROUPS.keys()
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown group(s): {', '.join(sorted(unknown))}")
+    return groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=_levels, default=[1, 4, 16], help="comma-separated levels (default 1,4,16)")
+    parser.add_argument("--ops", type=int, default=64, help="operations per (layer, operation, level)")
+    parser.add_argument("--groups", type=_groups, default=list(GROUPS), help="ec2,s3,lambda (default all)")
+    parser.add_argument("--layers", default="helpers,tools", help="helpers,tools (default both)")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="stub latency per API call (default 10)")
+    parser.add_argument("--endpoint-url", help="use a local AWS emulator instead of the in-process stub")
+    parser.add_argument("--bucket-objects", type=int, default=2000, help="objects in the bucket each delete empties")
+    parser.add_argument("--delete-rounds", type=int, default=3, help="bucket deletes per level")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="baseline to compare with; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown vs the baseline (default 0.25)")
+    parser.add_argument("--gate-latency", action="store_true",
+                        help="also exit 1 on p50 slowdowns (for a quiet machine with its own baseline)")
+    args = parser.parse_args()
+    args.run_id = format(int(time.time()), "x")
+    layers = [layer.strip() for layer in args.layers.split(",") if layer.strip()]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        suite = Suite(args, _environment(args, workdir))
+        print(f"backend: {args.endpoint_url or f'in-process stub, {args.latency_ms:g} ms per call'}")
+        print(f"{'layer':<8} {'operation':<17} {'conc':>4} {'ops':>5} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} "
+              f"{'p99 ms':>9} {'ops/s':>8} {'calls':>7} {'rss MB':>8}")
+        results = []
+        for level in args.concurrency:
+            if "helpers" in layers:
+                results += suite.helpers_layer(level)
+            if "tools" in layers:
+                results += asyncio.run(suite.tools_layer(level))
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "backend": args.endpoint_url or "stub",
+        "latency_ms": None if args.endpoint_url else args.latency_ms,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"saved {len(results)} results to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if (baseline["backend"], baseline["latency_ms"]) != (report["backend"], report["latency_ms"]):
+            print(f"warning: the baseline was recorded against {baseline['backend']} "
+                  f"(latency_ms={baseline['latency_ms']}), this run against {report['backend']} "
+                  f"(latency_ms={report['latency_ms']})")
+        regressions, slowdowns = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        for slowdown in slowdowns:
+            print(f"{'REGRESSION' if args.gate_latency else 'slower'} {slowdown}")
+        if regressions or (slowdowns and args.gate_latency):
+            sys.exit(1)
+        print(f"no API call or error regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+In-process stand-in for the EC2, S3 and Lambda APIs the helpers call.
+
+install() is a client_pool hook. It answers every API call from the
+before-call event with a response built from FakeAWS's in-memory state,
+so botocore builds and validates the request and runs the after-call
+handlers (metrics, tracing), but nothing is sent or signed. Each call
+sleeps for latency_ms to stand in for the network and service time.
+
+Requests reach FakeAWS with the caller's parameters, which are stashed by
+a before-parameter-build handler; the serialized request dict is ignored.
+Throttling and retries are not simulated, because retry.py's handlers run
+on the send path that the stub skips.
+"""
+import base64
+import hashlib
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+
+PAGE_SIZE = 1000
+
+
+class StubError(Exception):
+    def __init__(self, status, code, message=""):
+        super().__init__(f"{code}: {message}")
+        self.status, self.code, self.message = status, code, message
+
+
+class FakeAWS:
+    """In-memory EC2 instances, S3 buckets and Lambda functions, behind one lock."""
+
+    def __init__(self, latency_ms=10.0):
+        self.latency = latency_ms / 1000
+        self.instances = {}
+        self.client_tokens = {}
+        self.buckets = {}
+        self.bucket_regions = {}
+        self.functions = {}
+        self._lock = threading.Lock()
+
+    # -- client_pool hook -------------------------------------------------
+
+    def install(self, client, account="default"):
+        service = client.meta.service_model.service_name
+
+        def stash_params(params, context, **kwargs):
+            context["stub_params"] = dict(params)
+
+        def answer(model, context, **kwargs):
+            return self.call(service, model.name, context.get("stub_params", {}))
+
+        client.meta.events.register("before-parameter-build", stash_params)
+        client.meta.events.register("before-call", answer)
+
+    def call(self, service, operation, params):
+        """(http response, parsed response) for one API call, the pair botocore expects from before-call."""
+        from botocore.awsrequest import AWSResponse
+
+        if self.latency:
+            time.sleep(self.latency)
+        handler = getattr(self, f"_{service}_{operation}", None)
+        try:
+            if handler is None:
+                raise StubError(400, "NotImplemented", f"{service}.{operation} is not stubbed")
+            with self._lock:
+                status, parsed = 200, handler(**params)
+        except StubError as e:
+            status, parsed = e.status, {"Error": {"Code": e.code, "Message": e.message}}
+        parsed["ResponseMetadata"] = {"RequestId": secrets.token_hex(8), "HTTPStatusCode": status}
+        return AWSResponse("https://aws-stub.invalid/", status, {}, None), parsed
+
+    # -- setup helpers (not API calls) -------------------------------------
+
+    def seed_bucket(self, name, objects):
+        with self._lock:
+            self.buckets[name] = {f"bench/object-{n:07d}": 1024 for n in range(objects)}
+
+    # -- EC2 ---------------------------------------------------------------
+
+    def _ec2_RunInstances(self, MinCount, MaxCount, ClientToken=None, InstanceType="m1.small", **params):
+        if ClientToken in self.client_tokens:
+            ids = self.client_tokens[ClientToken]
+        else:
+            ids = [f"i-{secrets.token_hex(9)[:17]}" for _ in range(MaxCount)]
+            for instance_id in ids:
+                self.instances[instance_id] = {"InstanceId": instance_id, "InstanceType": InstanceType,
+                                               "State": "pending", "Tags": params.get("TagSpecifications", [])}
+            if ClientToken:
+                self.client_tokens[ClientToken] = ids
+        return {"Instances": [self._ec2_instance(instance_id) for instance_id in ids]}
+
+    def _ec2_instance(self, instance_id):
+        instance = self.instances[instance_id]
+        return {"InstanceId": instance_id, "InstanceType": instance["InstanceType"],
+                "State": {"Name": instance["State"]}, "Tags": []}
+
+    def _ec2_transition(self, key, instance_ids, allowed, target):
+        changes = []
+        for instance_id in instance_ids:
+            instance = self.instances.get(instance_id)
+            if instance is None:
+                raise StubError(400, "InvalidInstanceID.NotFound", f"The instance ID '{instance_id}' does not exist")
+            previous = instance["State"]
+            if previous not in allowed:
+                raise StubError(400, "IncorrectInstanceState", f"{instance_id} is {previous}")
+            instance["State"] = target
+            changes.append({"InstanceId": instance_id, "PreviousState": {"Name": previous},
+                            "CurrentState": {"Name": target}})
+        return {key: changes}
+
+    def _ec2_StopInstances(self, InstanceIds, **params):
+        return self._ec2_transition("StoppingInstances", InstanceIds, ("pending", "running", "stopped"), "stopped")
+
+    def _ec2_StartInstances(self, InstanceIds, **params):
+        return self._ec2_transition("StartingInstances", InstanceIds, ("stopped", "running"), "running")
+
+    def _ec2_TerminateInstances(self, InstanceIds, **params):
+        return self._ec2_transition("TerminatingInstances", InstanceIds,
+                                    ("pending", "running", "stopped", "terminated"), "terminated")
+
+    def _ec2_DescribeInstances(self, InstanceIds=(), **params):
+        ids = InstanceIds or list(self.instances)
+        return {"Reservations": [{"Instances": [self._ec2_instance(i) for i in ids if i in self.instances]}]}
+
+    # -- S3 ----------------------------------------------------------------
+
+    def _bucket(self, name):
+        if name not in self.buckets:
+            raise StubError(404, "NoSuchBucket", name)
+        return self.buckets[name]
+
+    def _s3_CreateBucket(self, Bucket, **params):
+        if Bucket in self.buckets:
+            raise StubError(409, "BucketAlreadyOwnedByYou", Bucket)
+        self.buckets[Bucket] = {}
+        self.bucket_regions[Bucket] = params.get("CreateBucketConfiguration", {}).get("LocationConstraint")
+        return {"Location": f"/{Bucket}"}
+
+    def _s3_DeleteBucket(self, Bucket, **params):
+        if self._bucket(Bucket):
+            raise StubError(409, "BucketNotEmpty", Bucket)
+        del self.buckets[Bucket]
+        return {}
+
+    def _s3_ListBuckets(self, **params):
+        now = datetime.now(timezone.utc)
+        return {"Buckets": [{"Name": name, "CreationDate": now} for name in self.buckets]}
+
+    def _s3_GetBucketVersioning(self, Bucket, **params):
+        self._bucket(Bucket)
+        return {}
+
+    def _s3_ListObjectsV2(self, Bucket, ContinuationToken="", MaxKeys=PAGE_SIZE, Prefix="", StartAfter="",
+                          **params):
+        # As in S3, a page continues after the last key returned, so deleting
+        # listed keys while paging does not make the listing skip any.
+        after = max(ContinuationToken, StartAfter)
+        keys = sorted(key for key in self._bucket(Bucket) if key.startswith(Prefix) and key > after)
+        page = keys[:MaxKeys]
+        now = datetime.now(timezone.utc)
+        response = {"KeyCount": len(page), "IsTruncated": len(keys) > MaxKeys,
+                    "Contents": [{"Key": key, "Size": self.buckets[Bucket][key], "LastModified": now}
+                                 for key in page]}
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1]
+        return response
+
+    def _s3_DeleteObjects(self, Bucket, Delete, **params):
+        objects = self._bucket(Bucket)
+        for obj in Delete["Objects"]:
+            objects.pop(obj["Key"], None)
+        return {} if Delete.get("Quiet") else {"Deleted": [{"Key": obj["Key"]} for obj in Delete["Objects"]]}
+
+    def _s3_PutObject(self, Bucket, Key, Body=b"", **params):
+        self._bucket(Bucket)[Key] = len(Body) if isinstance(Body, (bytes, str)) else 0
+        return {"ETag": '"stub"'}
+
+    # -- Lambda ------------------------------------------------------------
+
+    def _function(self, name):
+        if name not in self.functions:
+            raise StubError(404, "ResourceNotFoundException", f"Function not found: {name}")
+        return self.functions[name]
+
+    @staticmethod
+    def _sha256(code):
+        return base64.b64encode(hashlib.sha256(code.get("ZipFile", b"")).digest()).decode()
+
+    def _lambda_GetFunctionConfiguration(self, FunctionName, **params):
+        return dict(self._function(FunctionName))
+
+    def _lambda_CreateFunction(self, FunctionName, Code, Runtime=None, Handler=None, **params):
+        if FunctionName in self.functions:
+            raise StubError(409, "ResourceConflictException", f"Function already exist: {FunctionName}")
+        self.functions[FunctionName] = {"FunctionName": FunctionName, "Runtime": Runtime, "Handler": Handler,
+                                        "CodeSha256": self._sha256(Code), "Version": "1"}
+        return dict(self.functions[FunctionName])
+
+    def _lambda_UpdateFunctionCode(self, FunctionName, **code):
+        function = self._function(FunctionName)
+        function.update(CodeSha256=self._sha256(code), Version=str(int(function["Version"]) + 1))
+        return dict(function)
+
+    def _lambda_DeleteFunction(self, FunctionName, **params):
+        self._function(FunctionName)
+        del self.functions[FunctionName]
+        return {}
+
+    def _lambda_ListFunctions(self, **params):
+        return {"Functions": [dict(function) for function in self.functions.values()]}
@@ -0,0 +1,104 @@
+"""
+File I/O and time per settings read: load_dotenv() + os.getenv vs config.py.
+
+Replays the settings a create-instance tool call reads, the way the helpers
+used to (load_dotenv() on every call, then os.getenv) and through the
+config snapshot. File opens are counted with an audit hook and os.stat
+calls by wrapping os.stat. Exits non-zero if the config path opens any file.
+
+    uv run benchmarks/config_reads.py --calls 10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import config  # noqa: E402
+
+SETTINGS = ["AMI_ID", "INSTANCE_TYPE", "KEY_NAME", "SECURITY_GROUP_IDS", "AWS_REGION"]
+ENV_FILE = "\n".join([
+    "AMI_ID=ami-0123456789abcdef0",
+    "INSTANCE_TYPE=t3.micro",
+    "KEY_NAME=bench",
+    "SECURITY_GROUP_IDS=sg-01234567,sg-89abcdef",
+    "AWS_REGION=us-east-1",
+    *(f"UNUSED_SETTING_{n}=value-{n}" for n in range(30)),
+]) + "\n"
+
+
+class Counter:
+    def __init__(self):
+        self.opens = 0
+        self.stats = 0
+        self.active = False
+        sys.addaudithook(self._audit)
+        real_stat = os.stat
+
+        def stat(*args, **kwargs):
+            if self.active:
+                self.stats += 1
+            return real_stat(*args, **kwargs)
+
+        os.stat = stat
+
+    def _audit(self, event, args):
+        if self.active and event == "open":
+            self.opens += 1
+
+    def measure(self, fn, calls):
+        self.opens = self.stats = 0
+        self.active = True
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        elapsed = time.perf_counter() - started
+        self.active = False
+        return elapsed / calls, self.opens / calls, self.stats / calls
+
+
+def dotenv_per_call(path):
+    from dotenv import load_dotenv
+
+    def call():
+        load_dotenv(path)
+        return [os.getenv(name) for name in SETTINGS]
+    return call
+
+
+def snapshot():
+    return [config.get(name) for name in SETTINGS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, ".env")
+        with open(path, "w") as f:
+            f.write(ENV_FILE)
+        os.environ["MCP_AWS_ENV_FILE"] = path
+        config.reload()
+        counter = Counter()
+        results = {
+            "load_dotenv": counter.measure(dotenv_per_call(path), args.calls),
+            "config": counter.measure(snapshot, args.calls),
+        }
+
+    print(f"{'path':<12} {'calls':>7} {'us/call':>9} {'opens/call':>11} {'stats/call':>11}")
+    for label, (seconds, opens, stats) in results.items():
+        print(f"{label:<12} {args.calls:>7} {seconds * 1e6:>9.2f} {opens:>11.4f} {stats:>11.4f}")
+    before, after = results["load_dotenv"][0], results["config"][0]
+    print(f"config is {before / after:.0f}x faster per call")
+    if results["config"][1]:
+        print("config opened files on the hot path")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Many agents on one warm HTTP server vs one stdio process per agent.
+
+Starts server.py --transport http once, then opens --sessions concurrent
+MCP sessions against it; each initialises, lists tools and calls
+inventory_cache_stats. The same number of sessions is then run over stdio,
+where every session spawns (and cold-starts) its own server process.
+
+    uv run benchmarks/http_sessions.py --sessions 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+try:
+    from mcp.client.streamable_http import streamablehttp_client
+except ImportError:  # mcp releases before streamable HTTP
+    streamablehttp_client = None
+    from mcp.client.sse import sse_client
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def _session(transport):
+    started = time.perf_counter()
+    async with transport as streams:
+        async with ClientSession(*streams[:2]) as session:
+            await session.initialize()
+            await session.list_tools()
+            await session.call_tool("inventory_cache_stats", {})
+    return time.perf_counter() - started
+
+
+def _http_transport(port):
+    if streamablehttp_client is not None:
+        return streamablehttp_client(f"http://127.0.0.1:{port}/mcp")
+    return sse_client(f"http://127.0.0.1:{port}/sse")
+
+
+def _stdio_transport():
+    return stdio_client(StdioServerParameters(
+        command=sys.executable, args=[os.path.join(ROOT_DIR, "server.py")], cwd=ROOT_DIR,
+    ))
+
+
+async def run(label, make_transport, sessions):
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(_session(make_transport()) for _ in range(sessions)))
+    wall = time.perf_counter() - started
+    print(f"{label:<6} {sessions:>8} {wall:>8.2f} {statistics.median(latencies) * 1000:>10.1f} "
+          f"{max(latencies) * 1000:>10.1f}")
+
+
+def _wait_healthy(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("HTTP server did not become healthy")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT_DIR, "server.py"), "--transport", "http",
+         "--port", str(args.port)],
+        cwd=ROOT_DIR, stdout=subprocess.DEVNULL,
+    )
+    try:
+        _wait_healthy(args.port)
+        print(f"{'mode':<6} {'sessions':>8} {'wall s':>8} {'p50 ms':>10} {'max ms':>10}")
+        await run("http", lambda: _http_transport(args.port), args.sessions)
+    finally:
+        server.terminate()
+        server.wait()
+    await run("stdio", _stdio_transport, args.sessions)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
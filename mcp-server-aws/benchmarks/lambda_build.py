@@ -0,0 +1,107 @@
+"""
+Cold vs warm Lambda package builds.
+
+Generates a synthetic package (a vendored dependency tree plus a small source
+directory, --size-mb in total), then times:
+
+    cold      empty build cache
+    no-op     nothing changed
+    one-file  one source file edited
+    zipfile   the same tree zipped with the standard zipfile module, for reference
+
+    uv run benchmarks/lambda_build.py --size-mb 50
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import lambda_packager  # noqa: E402
+
+_WORDS = [b"import", b"def", b"return", b"self", b"lambda", b"boto3", b"client", b"region",
+          b"for", b"in", b"if", b"None", b"True", b"yield", b"class", b"async"]
+
+
+def _python_like(rng, size):
+    """Compressible text, roughly like library source."""
+    out = bytearray()
+    while len(out) < size:
+        out += b" ".join(rng.choice(_WORDS) for _ in range(12)) + b"\n"
+    return bytes(out[:size])
+
+
+def make_tree(root, size_mb, seed=0):
+    """Write vendor/ (~size_mb, 3/4 text, 1/4 binary) and src/; returns (src, vendor)."""
+    rng = random.Random(seed)
+    vendor = os.path.join(root, "vendor")
+    src = os.path.join(root, "src")
+    budget = size_mb * 1024 * 1024
+    written = index = 0
+    while written < budget:
+        package = os.path.join(vendor, f"pkg{index % 40:02d}", f"mod{index % 7}")
+        os.makedirs(package, exist_ok=True)
+        size = rng.randint(4 * 1024, 96 * 1024)
+        if index % 4 == 3:
+            data = rng.randbytes(size)
+            name = f"ext{index}.so"
+        else:
+            data = _python_like(rng, size)
+            name = f"module{index}.py"
+        with open(os.path.join(package, name), "wb") as f:
+            f.write(data)
+        written += size
+        index += 1
+
+    os.makedirs(src, exist_ok=True)
+    for i in range(20):
+        with open(os.path.join(src, f"handler{i}.py"), "wb") as f:
+            f.write(_python_like(rng, 8 * 1024))
+    return src, vendor
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def zipfile_build(output, roots):
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zf:
+        for root in roots:
+            for arcname, path in lambda_packager._walk(root):
+                zf.write(path, arcname)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=50, help="Synthetic tree size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ["LAMBDA_BUILD_CACHE"] = os.path.join(workdir, "cache")
+        src, vendor = make_tree(os.path.join(workdir, "tree"), args.size_mb)
+
+        cold, first = timed(lambda_packager.build_package, src, dependencies_dir=vendor)
+        noop, second = timed(lambda_packager.build_package, src, dependencies_dir=vendor)
+        with open(os.path.join(src, "handler0.py"), "ab") as f:
+            f.write(b"# edited\n")
+        one_file, third = timed(lambda_packager.build_package, src, dependencies_dir=vendor)
+        reference, _ = timed(zipfile_build, os.path.join(workdir, "reference.zip"), [vendor, src])
+
+        print(f"{first['files']} files, {first['zip_bytes'] / 1024 / 1024:.1f} MB zipped")
+        print(f"{'build':<10} {'seconds':>8} {'files read':>11} {'zip written':>12}")
+        for label, seconds, result in [("cold", cold, first), ("no-op", noop, second),
+                                       ("one-file", one_file, third)]:
+            print(f"{label:<10} {seconds:>8.3f} {result['changed_files']:>11} "
+                  f"{str(result['rebuilt']):>12}")
+        print(f"{'zipfile':<10} {reference:>8.3f} {first['files']:>11} {'True':>12}")
+
+
+if __name__ == "__main__":
+    main()
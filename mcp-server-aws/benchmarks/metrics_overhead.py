@@ -0,0 +1,76 @@
+"""
+Per-call cost of the Prometheus instrumentation in metrics.py.
+
+Times a no-op async tool with and without metrics.instrument(), and the
+botocore after-call handler that counts AWS API calls, then fails if either
+adds more than the budget (--budget-us, default 5 microseconds) per call.
+Nothing touches AWS.
+
+    uv run benchmarks/metrics_overhead.py --calls 200000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import metrics  # noqa: E402
+
+
+async def _noop():
+    return {"ok": True}
+
+
+async def _per_call(tool, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        await tool()
+    return (time.perf_counter() - started) / calls
+
+
+def _after_call_handler():
+    """The handler metrics.install() registers, taken off a stand-in client."""
+    handlers = {}
+    client = SimpleNamespace(meta=SimpleNamespace(
+        service_model=SimpleNamespace(service_name="ec2"),
+        events=SimpleNamespace(register=lambda event, handler: handlers.setdefault(event, handler)),
+    ))
+    metrics.install(client)
+    return handlers["after-call"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--budget-us", type=float, default=5.0)
+    args = parser.parse_args()
+
+    bare = asyncio.run(_per_call(_noop, args.calls))
+    wrapped = asyncio.run(_per_call(metrics.instrument("bench_noop", _noop), args.calls))
+    tool_us = (wrapped - bare) * 1e6
+
+    after_call = _after_call_handler()
+    model, parsed = SimpleNamespace(name="DescribeInstances"), {}
+    started = time.perf_counter()
+    for _ in range(args.calls):
+        after_call(http_response=None, parsed=parsed, model=model)
+    api_us = (time.perf_counter() - started) / args.calls * 1e6
+
+    started = time.perf_counter()
+    metrics.render()
+    render_ms = (time.perf_counter() - started) * 1000
+
+    print(f"{'tool call overhead':<22} {tool_us:>7.2f} us  (bare {bare * 1e6:.2f} us, instrumented {wrapped * 1e6:.2f} us)")
+    print(f"{'AWS API call hook':<22} {api_us:>7.2f} us")
+    print(f"{'scrape (render)':<22} {render_ms:>7.2f} ms")
+    if max(tool_us, api_us) > args.budget_us:
+        print(f"Over budget of {args.budget_us:g} us per call")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Multipart S3 transfer throughput vs concurrency.
+
+Runs against a local S3-compatible stand-in so no AWS account (or bill) is
+involved, e.g. MinIO or moto's server mode:
+
+    docker run -p 9000:9000 minio/minio server /data     # or: moto_server -p 9000
+    uv run benchmarks/s3_transfer.py --endpoint-url http://localhost:9000 --size-mb 512
+
+For every concurrency level the same file is uploaded and downloaded once and
+MB/s is printed for both directions.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--endpoint-url", default="http://localhost:9000")
+    parser.add_argument("--bucket", default="mcp-transfer-bench")
+    parser.add_argument("--size-mb", type=int, default=512)
+    parser.add_argument("--part-size-mb", type=float, default=8)
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32",
+                        help="Comma-separated concurrency levels")
+    args = parser.parse_args()
+
+    # Picked up by botocore for every S3 client, pooled ones included.
+    os.environ["AWS_ENDPOINT_URL_S3"] = args.endpoint_url
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "minioadmin")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "minioadmin")
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+
+    from client_pool import get_client
+    import s3_transfer
+
+    s3 = get_client("s3")
+    try:
+        s3.create_bucket(Bucket=args.bucket)
+    except Exception as e:
+        if "BucketAlreadyOwnedByYou" not in str(e):
+            raise
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, "artifact.bin")
+        with open(source, "wb") as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1024 * 1024))
+
+        print(f"{args.size_mb} MB, {args.part_size_mb:g} MB parts, endpoint {args.endpoint_url}")
+        print(f"{'concurrency':>11} {'upload MB/s':>12} {'download MB/s':>14} {'parts':>6}")
+        for level in levels:
+            key = f"bench/{level}.bin"
+            up = s3_transfer.upload_file(source, args.bucket, key, args.part_size_mb, level)
+            down = s3_transfer.download_file(args.bucket, key, os.path.join(workdir, "copy.bin"),
+                                             args.part_size_mb, level)
+            print(f"{level:>11} {up['mb_per_s']:>12} {down['mb_per_s']:>14} {up['parts']:>6}")
+            s3.delete_object(Bucket=args.bucket, Key=key)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Memory and startup footprint: one consolidated server vs one process per service.
+
+Starts each layout over stdio, waits until every process has answered
+list_tools, then reads the resident set size of the server processes from
+/proc (Linux only). Each layout is measured twice:
+
+    lazy    the default; helpers (and boto3) not imported until a tool call
+    warm    MCP_AWS_LAZY_IMPORTS=0, i.e. the steady state after the first calls
+
+    uv run benchmarks/server_footprint.py --runs 3
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from contextlib import AsyncExitStack
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAYOUTS = {
+    # The four servers as they were deployed before consolidation.
+    "separate": [["aws.py", "--toolsets", "ec2"], ["aws-ec2.py"], ["aws1.py"], ["aws_lambda.py"]],
+    "consolidated": [["server.py", "--toolsets", "all"]],
+}
+
+
+def _server_rss_kb():
+    """Total VmRSS of this process's child Python processes running a script under ROOT_DIR."""
+    total = 0
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            if ppid != os.getpid():
+                continue
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                if ROOT_DIR.encode() not in f.read():
+                    continue
+            with open(f"/proc/{pid}/status") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+        except (OSError, StopIteration, IndexError, ValueError):
+            continue
+    return total
+
+
+async def _open(stack, argv, env):
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=[os.path.join(ROOT_DIR, argv[0]), *argv[1:]],
+        cwd=ROOT_DIR,
+        env=env,
+    )
+    read, write = await stack.enter_async_context(stdio_client(params))
+    session = await stack.enter_async_context(ClientSession(read, write))
+    await session.initialize()
+    return len((await session.list_tools()).tools)
+
+
+async def measure(layout, env):
+    """(seconds until every server listed its tools, tool count, RSS MB)."""
+    async with AsyncExitStack() as stack:
+        started = time.perf_counter()
+        counts = await asyncio.gather(*(_open(stack, argv, env) for argv in LAYOUTS[layout]))
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(0.2)
+        return elapsed, sum(counts), _server_rss_kb() / 1024
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    if not os.path.isdir("/proc"):
+        sys.exit("RSS is read from /proc; run this on Linux.")
+
+    print(f"{'layout':<13} {'imports':<6} {'procs':>5} {'tools':>5} {'startup ms':>11} {'RSS MB':>8}")
+    for lazy in ("1", "0"):
+        env = dict(os.environ, MCP_AWS_LAZY_IMPORTS=lazy, MCP_AWS_PREWARM="0")
+        for layout in LAYOUTS:
+            results = [await measure(layout, env) for _ in range(args.runs)]
+            startup = statistics.median(r[0] for r in results)
+            rss = statistics.median(r[2] for r in results)
+            print(f"{layout:<13} {'lazy' if lazy == '1' else 'warm':<6} {len(LAYOUTS[layout]):>5} "
+                  f"{results[0][1]:>5} {startup * 1000:>11.1f} {rss:>8.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""
+Startup budget check for the AWS MCP servers.
+
+Spawns each server over stdio, measures the wall time from process launch to
+the first list_tools response and exits non-zero if any server is over budget.
+
+    uv run benchmarks/startup_budget.py                 # all servers, 1.0 s budget
+    uv run benchmarks/startup_budget.py aws-ec2.py --budget 0.8 --runs 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVERS = ["server.py", "aws.py", "aws-ec2.py", "aws1.py", "aws_lambda.py"]
+
+
+async def time_to_list_tools(script, env=None):
+    """Seconds from spawning `script` to its first list_tools response."""
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=[os.path.join(ROOT_DIR, script)],
+        cwd=ROOT_DIR,
+        env=env,
+    )
+    started = time.perf_counter()
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            tools = await session.list_tools()
+            elapsed = time.perf_counter() - started
+    return elapsed, len(tools.tools)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("servers", nargs="*", default=SERVERS)
+    parser.add_argument("--budget", type=float,
+                        default=float(os.getenv("MCP_AWS_STARTUP_BUDGET", "1.0")),
+                        help="max seconds to first list_tools (median of runs)")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    env = dict(os.environ, MCP_AWS_LAZY_IMPORTS="1", MCP_AWS_PREWARM="0")
+    failed = []
+    for script in args.servers:
+        timings = []
+        for _ in range(args.runs):
+            elapsed, tool_count = await time_to_list_tools(script, env)
+            timings.append(elapsed)
+        median = statistics.median(timings)
+        status = "ok" if median <= args.budget else "OVER BUDGET"
+        print(f"{script:<16} {tool_count:>3} tools  median {median * 1000:7.1f} ms  "
+              f"max {max(timings) * 1000:7.1f} ms  [{status}]")
+        if median > args.budget:
+            failed.append(script)
+
+    if failed:
+        print(f"Startup budget of {args.budget:.2f}s exceeded by: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+"""
+Bytes and tokens per tool response over a recorded agent session.
+
+`record` starts server.py over stdio, replays a scripted session (the calls
+an agent makes to create, stop, start and terminate an instance and to
+create, list and delete a bucket, plus a call that fails) and writes every
+response to a JSONL file. Point it at a local stand-in so nothing real is
+touched, e.g. moto's server mode:
+
+    moto_server -p 5000 &
+    uv run benchmarks/tool_response_size.py record after.jsonl --endpoint-url http://localhost:5000
+
+Record the same session on the commit before a change (e.g. from a
+`git worktree` checkout) and compare the two:
+
+    uv run benchmarks/tool_response_size.py compare before.jsonl after.jsonl
+
+Tokens are counted with tiktoken (o200k_base) when it is installed and
+estimated as bytes / 4 otherwise.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MISSING_INSTANCE = "i-0123456789abcdef0"
+
+# (tool, arguments); "{instance_id}" is filled from the create call's response.
+SESSION = [
+    ("initiate_aws_ec2_instance", {}),
+    ("stop_aws_ec2_instance", {"instance_id": "{instance_id}"}),
+    ("start_aws_ec2_instance", {"instance_id": "{instance_id}"}),
+    ("terminate_aws_ec2_instance", {"instance_id": "{instance_id}"}),
+    ("terminate_aws_ec2_instance", {"instance_id": MISSING_INSTANCE}),
+    ("initiate_s3_bucket_creation", {}),
+    ("initiate_s3_bucket_creation", {}),
+    ("list_s3_objects", {"page_size": 10}),
+    ("initiate_s3_bucket_deletion", {}),
+]
+
+
+def _text(result):
+    return "".join(getattr(part, "text", "") for part in result.content)
+
+
+async def record(path, endpoint_url):
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    env = dict(os.environ)
+    if endpoint_url:
+        env.update(AWS_ENDPOINT_URL=endpoint_url, AWS_ACCESS_KEY_ID="testing",
+                   AWS_SECRET_ACCESS_KEY="testing")
+    env.setdefault("AWS_REGION", "us-east-1")
+    env.setdefault("AMI_ID", "ami-12c6146b")
+    env.setdefault("S3_BUCKET_NAME", "mcp-response-size-bench")
+    params = StdioServerParameters(command=sys.executable, cwd=ROOT_DIR, env=env,
+                                   args=[os.path.join(ROOT_DIR, "server.py"), "--toolsets", "ec2,s3"])
+
+    instance_id = MISSING_INSTANCE
+    async with stdio_client(params) as streams:
+        async with ClientSession(*streams) as session:
+            await session.initialize()
+            with open(path, "w") as out:
+                for tool, arguments in SESSION:
+                    arguments = {name: value.format(instance_id=instance_id) if isinstance(value, str) else value
+                                 for name, value in arguments.items()}
+                    text = _text(await session.call_tool(tool, arguments))
+                    if tool == "initiate_aws_ec2_instance":
+                        found = re.search(r"i-[0-9a-f]{8,17}", text)
+                        instance_id = found.group(0) if found else instance_id
+                    out.write(json.dumps({"tool": tool, "arguments": arguments, "response": text}) + "\n")
+                    print(f"{tool}: {text[:100]}")
+
+
+def _token_counter():
+    try:
+        import tiktoken
+    except ImportError:
+        return lambda text: len(text.encode()) // 4, "bytes/4 estimate"
+    encoding = tiktoken.get_encoding("o200k_base")
+    return lambda text: len(encoding.encode(text)), "tiktoken o200k_base"
+
+
+def _totals(path, count_tokens):
+    totals = defaultdict(lambda: {"calls": 0, "bytes": 0, "tokens": 0})
+    with open(path) as f:
+        for line in f:
+            entry = json.loads(line)
+            row = totals[entry["tool"]]
+            row["calls"] += 1
+            row["bytes"] += len(entry["response"].encode())
+            row["tokens"] += count_tokens(entry["response"])
+    return totals
+
+
+def _change(before, after):
+    return f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+
+
+def compare(before_path, after_path):
+    count_tokens, method = _token_counter()
+    before, after = _totals(before_path, count_tokens), _totals(after_path, count_tokens)
+    print(f"tokens: {method}")
+    print(f"{'tool':<30} {'calls':>5} {'bytes':>13} {'tokens':>13} {'change':>7}")
+    for tool in sorted(set(before) | set(after)):
+        b, a = before.get(tool, defaultdict(int)), after.get(tool, defaultdict(int))
+        print(f"{tool:<30} {a['calls']:>5} {b['bytes']:>6}>{a['bytes']:<6} "
+              f"{b['tokens']:>6}>{a['tokens']:<6} {_change(b['tokens'], a['tokens']):>7}")
+    b_bytes, a_bytes = (sum(r["bytes"] for r in t.values()) for t in (before, after))
+    b_tokens, a_tokens = (sum(r["tokens"] for r in t.values()) for t in (before, after))
+    print(f"{'total':<30} {'':>5} {b_bytes:>6}>{a_bytes:<6} {b_tokens:>6}>{a_tokens:<6} "
+          f"{_change(b_tokens, a_tokens):>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    recorder = commands.add_parser("record", help="replay the scripted session and save responses")
+    recorder.add_argument("output")
+    recorder.add_argument("--endpoint-url", help="AWS endpoint of a local stand-in (e.g. moto_server)")
+    comparer = commands.add_parser("compare", help="per-tool bytes and tokens of two recordings")
+    comparer.add_argument("before")
+    comparer.add_argument("after")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        asyncio.run(record(args.output, args.endpoint_url))
+    else:
+        compare(args.before, args.after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Process-wide boto3 client pool shared by every AWS helper module.
+
+Clients are created lazily on first use and cached by (service, region,
+profile, role), so repeated MCP tool calls reuse the same botocore endpoint
+and its warm HTTPS connection pool instead of building a new session per call.
+boto3 itself is only imported when the first client is requested.
+
+use_target() points every get_client call in a context at another region
+or an assumed-role account; that is how one helper call fans out across
+regions and accounts without threading a region through every function.
+
+Tuning (environment variables):
+    AWS_MAX_POOL_CONNECTIONS  connections kept per client (default 50)
+    AWS_TCP_KEEPALIVE         enable TCP keep-alive on pooled sockets (default true)
+    AWS_CONNECT_TIMEOUT       connect timeout in seconds (default 10)
+    AWS_READ_TIMEOUT          read timeout in seconds (default 60)
+    AWS_ASSUME_ROLE_DURATION  assumed-role credential lifetime (default 3600)
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+
+import config
+import retry
+
+_lock = threading.Lock()
+_sessions = {}
+_clients = {}
+
+_client_hooks = [retry.install]
+
+# (region, role_arn) set by use_target(); None means "use the default".
+_target = contextvars.ContextVar("aws_target", default=(None, None))
+
+
+def add_client_hook(hook):
+    """
+    Call hook(client, account) on every client the pool creates from now on.
+
+    Used to attach botocore event handlers (retries, metrics, tracing)
+    once per client rather than per call.
+    """
+    _client_hooks.append(hook)
+
+
+def default_region():
+    return config.get("AWS_REGION") or config.get("AWS_DEFAULT_REGION") or "us-east-1"
+
+
+def client_config():
+    """botocore Config applied to every pooled client."""
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=config.get_int("AWS_MAX_POOL_CONNECTIONS", 50),
+        tcp_keepalive=config.get_bool("AWS_TCP_KEEPALIVE", True),
+        connect_timeout=config.get_float("AWS_CONNECT_TIMEOUT", 10.0),
+        read_timeout=config.get_float("AWS_READ_TIMEOUT", 60.0),
+        # Retries are handled by retry.py, which every pooled client gets.
+        retries={"mode": "standard", "total_max_attempts": 1},
+    )
+
+
+def _session(profile, role_arn=None):
+    # boto3 sessions are not thread-safe, so they are only touched under _lock.
+    session = _sessions.get((profile, role_arn))
+    if session is None:
+        import boto3
+
+        if role_arn:
+            session = boto3.session.Session(
+                botocore_session=_assumed_role_session(role_arn, profile)
+            )
+        else:
+            session = boto3.session.Session(profile_name=profile)
+        _sessions[(profile, role_arn)] = session
+    return session
+
+
+def _assumed_role_session(role_arn, profile):
+    """
+    botocore session whose credentials come from sts:AssumeRole.
+
+    The credentials are fetched on first use and cached until shortly before
+    they expire, then refreshed in place, so pooled clients stay valid.
+    """
+    from botocore.credentials import DeferredRefreshableCredentials
+    from botocore.session import get_session
+
+    def refresh():
+        # Runs inside the caller's use_target(); reset it so the STS call
+        # uses the base credentials rather than the role being assumed.
+        with use_target():
+            sts = get_client("sts", profile=profile)
+        credentials = sts.assume_role(
+            RoleArn=role_arn,
+            RoleSessionName=config.get("AWS_ASSUME_ROLE_SESSION_NAME", "mcp-aws"),
+            DurationSeconds=config.get_int("AWS_ASSUME_ROLE_DURATION", 3600),
+        )["Credentials"]
+        return {
+            "access_key": credentials["AccessKeyId"],
+            "secret_key": credentials["SecretAccessKey"],
+            "token": credentials["SessionToken"],
+            "expiry_time": credentials["Expiration"].isoformat(),
+        }
+
+    botocore_session = get_session()
+    botocore_session._credentials = DeferredRefreshableCredentials(
+        refresh_using=refresh, method="sts-assume-role"
+    )
+    return botocore_session
+
+
+@contextmanager
+def use_target(region: str = None, role_arn: str = None):
+    """
+    Route get_client calls in this context to region and/or an assumed role.
+
+    Helpers call get_client(service) without a region; inside this block
+    they transparently talk to the target instead of the default account
+    and region. The target follows run_blocking into worker threads.
+    """
+    token = _target.set((region, role_arn))
+    try:
+        yield
+    finally:
+        _target.reset(token)
+
+
+def current_target():
+    """(region, role_arn) that get_client uses when none is passed explicitly."""
+    region, role_arn = _target.get()
+    return region or default_region(), role_arn
+
+
+def get_client(service: str, region: str = None, profile: str = None, role_arn: str = None):
+    """
+    Return the shared client for (service, region, profile, role), creating it on first use.
+
+    :param service: boto3 service name (ec2, s3, lambda, ...)
+    :param region: AWS region; defaults to the use_target region, then
+        AWS_REGION / AWS_DEFAULT_REGION
+    :param profile: named AWS profile; None uses the default credential chain
+    :param role_arn: IAM role to assume; defaults to the use_target role
+    """
+    target_region, target_role = current_target()
+    key = (service, region or target_region, profile, role_arn or target_role)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _session(profile, key[3]).client(
+                    service, region_name=key[1], config=client_config()
+                )
+                account = key[3].split(":")[4] if key[3] else profile or "default"
+                for hook in _client_hooks:
+                    hook(client, account)
+                _clients[key] = client
+    return client
+
+
+def clear():
+    """Close and drop every pooled client (e.g. after credentials rotate)."""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+        _sessions.clear()
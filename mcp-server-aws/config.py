@@ -0,0 +1,239 @@
+"""
+Settings from .env plus the process environment, as one immutable snapshot.
+
+The .env file is parsed once, merged with os.environ (the environment wins,
+as with load_dotenv) and frozen into a Config. current() hands out that
+snapshot; the only file access after the first load is an os.stat of the
+.env at most every MCP_AWS_CONFIG_CHECK_INTERVAL seconds, and the file is
+parsed again only if its mtime or size changed. A tool call that reads
+settings therefore does no file I/O.
+
+    import config
+    region = config.get("AWS_REGION", "us-east-1")
+    workers = config.get_int("EC2_BULK_MAX_WORKERS", 16)
+
+Values of the settings in TYPES are validated when the snapshot is built,
+so a bad value fails at startup (or is rejected on reload, keeping the
+previous snapshot) instead of in the middle of a tool call. Values read
+from .env are also exported to os.environ for boto3 and child processes,
+without overriding variables that were already set.
+
+    MCP_AWS_ENV_FILE               .env to read (default: the nearest .env
+                                   in this directory or above it)
+    MCP_AWS_CONFIG_CHECK_INTERVAL  seconds between .env mtime checks (default 2; 0 checks on every read)
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+TRUE = ("1", "true", "yes", "on")
+FALSE = ("0", "false", "no", "off")
+
+
+class ConfigError(ValueError):
+    """A setting has a value that cannot be converted to its type."""
+
+
+def _bool(value):
+    lowered = value.strip().lower()
+    if lowered in TRUE:
+        return True
+    if lowered in FALSE:
+        return False
+    raise ValueError(f"expected one of {', '.join(TRUE + FALSE)}")
+
+
+def _list(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+# Settings checked when a snapshot is built. Anything else is read as a
+# string, or converted by the typed getter that asks for it.
+TYPES = {
+    **dict.fromkeys([
+        "AWS_MAX_POOL_CONNECTIONS", "AWS_ASSUME_ROLE_DURATION", "AWS_MAX_ATTEMPTS",
+        "AWS_FANOUT_MAX_WORKERS", "MCP_AWS_MAX_CONCURRENCY",
+        "EC2_FLEET_BATCH_SIZE", "EC2_FLEET_MAX_WORKERS", "EC2_BULK_CHUNK_SIZE", "EC2_BULK_MAX_WORKERS",
+        "LAMBDA_INLINE_ZIP_LIMIT", "LAMBDA_DEPLOY_MAX_WORKERS",
+        "S3_EMPTY_MAX_WORKERS", "S3_EMPTY_QUEUE_DEPTH", "S3_TRANSFER_CONCURRENCY",
+        "MCP_AWS_IDEMPOTENCY_WINDOW", "MCP_AWS_HTTP_PORT", "MCP_AWS_HTTP_WORKERS",
+        "MCP_AWS_HTTP_MAX_CONNECTIONS", "MCP_AWS_HTTP_KEEPALIVE", "MCP_AWS_HTTP_DRAIN_TIMEOUT",
+        "MCP_AWS_METRICS_PORT", "MCP_AGENT_BATCH_CONCURRENCY",
+    ], int),
+    **dict.fromkeys([
+        "AWS_CONNECT_TIMEOUT", "AWS_READ_TIMEOUT", "AWS_RETRY_BASE_DELAY", "AWS_RETRY_MAX_DELAY",
+        "AWS_RATE_LIMIT", "AWS_RATE_BURST", "EC2_WAIT_MIN_INTERVAL", "EC2_WAIT_MAX_INTERVAL",
+        "MCP_AWS_TOOL_TIMEOUT", "MCP_AWS_IDEMPOTENCY_TTL", "MCP_AWS_INVENTORY_TTL",
+        "S3_TRANSFER_PART_SIZE_MB", "S3_EMPTY_CHECKPOINT_INTERVAL",
+        "MCP_AGENT_PING_TIMEOUT", "MCP_AWS_CONFIG_CHECK_INTERVAL",
+    ], float),
+    **dict.fromkeys([
+        "AWS_TCP_KEEPALIVE", "MCP_AWS_LAZY_IMPORTS", "MCP_AWS_PREWARM", "MCP_AWS_METRICS",
+        "MCP_AWS_HTTP_STATELESS", "MCP_AWS_HTTP_JSON_RESPONSE", "MCP_AGENT_FAST_PATH",
+    ], _bool),
+    **dict.fromkeys(["SECURITY_GROUP_IDS", "MCP_AWS_TOOLSETS"], _list),
+}
+# Per-service overrides such as MCP_AWS_MAX_CONCURRENCY_EC2.
+TYPED_PREFIXES = {"MCP_AWS_MAX_CONCURRENCY_": int}
+
+
+@dataclass(frozen=True)
+class Config:
+    """One immutable view of the settings. Empty values count as unset."""
+
+    values: MappingProxyType
+    env_file: str = None
+    # (st_mtime_ns, st_size) of env_file when it was read; None if there was none.
+    stamp: tuple = None
+    loaded_at: float = field(default_factory=time.time)
+
+    def get(self, name, default=None):
+        value = self.values.get(name)
+        return default if value in (None, "") else value
+
+    def _typed(self, name, convert, default):
+        value = self.values.get(name)
+        if value in (None, ""):
+            return default
+        try:
+            return convert(value)
+        except ValueError as e:
+            source = f" (from {self.env_file})" if self.env_file else ""
+            raise ConfigError(f"{name}={value!r}{source} is not a valid {convert.__name__.strip('_')}: {e}") from None
+
+    def get_int(self, name, default=None):
+        return self._typed(name, int, default)
+
+    def get_float(self, name, default=None):
+        return self._typed(name, float, default)
+
+    def get_bool(self, name, default=False):
+        return self._typed(name, _bool, default)
+
+    def get_list(self, name, default=()):
+        return self._typed(name, _list, list(default))
+
+    def validate(self):
+        """Raise ConfigError for the first setting whose value does not fit TYPES."""
+        for name in self.values:
+            convert = TYPES.get(name) or next(
+                (t for prefix, t in TYPED_PREFIXES.items() if name.startswith(prefix)), None)
+            if convert is not None:
+                self._typed(name, convert, None)
+        return self
+
+
+_lock = threading.Lock()
+_snapshot = None
+_next_check = 0.0
+# (path, stamp) of a .env that failed validation, so it is not parsed again until it changes.
+_rejected = None
+# Variables this module exported from .env, with the value it set; a reload
+# may change or remove them unless something else has overwritten them since.
+_exported = {}
+
+
+def env_file():
+    """Path of the .env to read, or None if there is none."""
+    path = os.environ.get("MCP_AWS_ENV_FILE")
+    if path:
+        return path
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(directory, ".env")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read(path):
+    from dotenv import dotenv_values
+
+    # dotenv_values gives None for a line without "=", which is skipped.
+    return {key: value for key, value in dotenv_values(path).items() if value is not None}
+
+
+def _build(path, stamp):
+    file_values = _read(path) if stamp is not None else {}
+    environment = {key: value for key, value in os.environ.items() if _exported.get(key) != value}
+    snapshot = Config(MappingProxyType({**file_values, **environment}), path, stamp).validate()
+    for key in _exported.keys() - file_values.keys() - environment.keys():
+        os.environ.pop(key, None)
+    _exported.clear()
+    for key, value in file_values.items():
+        if key not in environment:
+            os.environ[key] = value
+            _exported[key] = value
+    return snapshot
+
+
+def _refresh(force=False):
+    global _snapshot, _next_check, _rejected
+    with _lock:
+        if not force and _snapshot is not None and time.monotonic() < _next_check:
+            return _snapshot
+        path = env_file()
+        stamp = _stamp(path)
+        changed = _snapshot is None or (path, stamp) not in ((_snapshot.env_file, _snapshot.stamp), _rejected)
+        if force or changed:
+            try:
+                _snapshot = _build(path, stamp)
+            except ConfigError as e:
+                if _snapshot is None:
+                    raise
+                _rejected = (path, stamp)
+                logger.error("Keeping the previous settings: %s", e)
+            else:
+                _rejected = None
+                logger.debug("Loaded settings from %s", path or "the environment")
+        _next_check = time.monotonic() + _snapshot.get_float("MCP_AWS_CONFIG_CHECK_INTERVAL", 2.0)
+        return _snapshot
+
+
+def current():
+    """The current snapshot; re-reads .env only if it changed since the last check."""
+    snapshot = _snapshot
+    if snapshot is None or time.monotonic() >= _next_check:
+        snapshot = _refresh()
+    return snapshot
+
+
+def reload():
+    """Rebuild the snapshot now, e.g. after changing os.environ in-process."""
+    return _refresh(force=True)
+
+
+def get(name, default=None):
+    return current().get(name, default)
+
+
+def get_int(name, default=None):
+    return current().get_int(name, default)
+
+
+def get_float(name, default=None):
+    return current().get_float(name, default)
+
+
+def get_bool(name, default=False):
+    return current().get_bool(name, default)
+
+
+def get_list(name, default=()):
+    return current().get_list(name, default)
@@ -0,0 +1,82 @@
+"""
+Bounded executor for the blocking boto3 helpers behind the async FastMCP tools.
+
+Every AWS tool hands its helper call to run_blocking(), which runs it on a
+per-service thread pool so a slow run_instances never stalls the event loop
+(and with it every other in-flight tool call on the server). The pool size is
+the concurrency limit for that service; extra calls queue.
+
+    MCP_AWS_MAX_CONCURRENCY          worker threads per service (default 16)
+    MCP_AWS_MAX_CONCURRENCY_<SVC>    override for one service, e.g. ..._EC2=32
+    MCP_AWS_TOOL_TIMEOUT             seconds before a tool call gives up
+                                     (default 300, 0 disables)
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+_lock = threading.Lock()
+_executors = {}
+
+_DEFAULT = object()
+
+
+def concurrency_limit(service: str) -> int:
+    default = config.get_int("MCP_AWS_MAX_CONCURRENCY", 16)
+    return max(1, config.get_int(f"MCP_AWS_MAX_CONCURRENCY_{service.upper()}", default))
+
+
+def default_timeout():
+    timeout = config.get_float("MCP_AWS_TOOL_TIMEOUT", 300.0)
+    return timeout if timeout > 0 else None
+
+
+def _executor(service):
+    executor = _executors.get(service)
+    if executor is None:
+        with _lock:
+            executor = _executors.get(service)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=concurrency_limit(service),
+                    thread_name_prefix=f"aws-{service}",
+                )
+                _executors[service] = executor
+    return executor
+
+
+async def run_blocking(service: str, func, *args, timeout=_DEFAULT, **kwargs):
+    """
+    Run func(*args, **kwargs) on the `service` pool and await its result.
+
+    Context variables are carried into the worker thread. If the awaiting
+    tool call is cancelled or times out, a call that has not started yet is
+    dropped from the queue; one already talking to AWS finishes in the
+    background and its result is discarded.
+
+    :param timeout: seconds to wait; defaults to MCP_AWS_TOOL_TIMEOUT, None waits forever
+    :raises TimeoutError: if the call does not finish within timeout
+    """
+    if timeout is _DEFAULT:
+        timeout = default_timeout()
+
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    future = loop.run_in_executor(_executor(service), call)
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        name = getattr(func, "__name__", repr(func))
+        raise TimeoutError(f"{service} call {name} timed out after {timeout:g}s") from None
+
+
+def shutdown(wait: bool = True):
+    """Stop every service pool; queued calls that have not started are cancelled."""
+    with _lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=wait, cancel_futures=True)
+        _executors.clear()
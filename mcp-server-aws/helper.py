@@ -1,30 +1,30 @@
-import boto3
-import sys
-from dotenv import load_dotenv
-import os
+from client_pool import get_client
+import config
+from idempotency import derive_key, run_once
+from inventory import INSTANCES, inventory
 
-def create_ec2_instance():
+def create_ec2_instance(idempotency_key=None):
     """
     This function creates an EC2 instance in AWS.
 
     Ensure you have your AWS credentials configured properly (either via
     environment variables, a configuration file, or an IAM role).  You will
     also need to specify the correct AMI ID, instance type, and security group.
-    """
-
-    # Load properties from .env file
 
-    load_dotenv()  # Load environment variables from .env file
+    Args:
+        idempotency_key (str): Optional caller key; repeated calls with the
+            same key and parameters return the same instance.
+    """
 
-    # Retrieve properties from the environment
-    ami_id = os.getenv('AMI_ID', '<your value>')  # Default value if not set
-    instance_type = os.getenv('INSTANCE_TYPE', '<your value>')
-    key_name = os.getenv('KEY_NAME', '<your value>')
-    security_group_ids = os.getenv('SECURITY_GROUP_IDS', '<your value>').split(',')
-    region_name = os.getenv('AWS_REGION', '<your value>')
+    # Retrieve properties from .env and the environment (see config.py)
+    ami_id = config.get('AMI_ID', '<your value>')  # Default value if not set
+    instance_type = config.get('INSTANCE_TYPE', '<your value>')
+    key_name = config.get('KEY_NAME', '<your value>')
+    security_group_ids = config.get('SECURITY_GROUP_IDS', '<your value>').split(',')
+    region_name = config.get('AWS_REGION', '<your value>')
 
-    # Update the EC2 client with the region from the .env file
-    ec2 = boto3.client('ec2', region_name=region_name)
+    # Reuse the pooled EC2 client for the region from the .env file
+    ec2 = get_client('ec2', region_name)
     # Initialize the EC2 client using boto3
      # Change to your desired region
 
@@ -44,39 +44,57 @@ def create_ec2_instance():
     #  * TagSpecifications:  Optional tags to apply to the instance.  Tags
     #     are key-value pairs that can help you organize and manage your
     #     AWS resources.
-    try:
-        response = ec2.run_instances(
-            ImageId=ami_id,  # Example: Ubuntu 20.04 (replace with your desired AMI)
-            InstanceType=instance_type,          # Example
-            MinCount=1,
-            MaxCount=1,
-            KeyName=key_name,    # Replace with your key pair name
-            SecurityGroupIds=list(security_group_ids),  # Replace with your security group ID
-            TagSpecifications=[
-                {
-                    'ResourceType': 'instance',
-                    'Tags': [
-                        {
-                            'Key': 'Name',
-                            'Value': 'MyPyEc2Instance-mcp'
-                        },
-                        {
-                            'Key': 'Environment',
-                            'Value': 'Staging'
-                        }
-                    ]
-                }
-            ]
-        )
 
-        # Extract the instance ID from the response
-        instance_id = response['Instances'][0]['InstanceId']
-        print(f"EC2 instance created with ID: {instance_id}")
-        return instance_id  # Return the Instance ID
+    # Identical requests (same parameters and idempotency_key) share one
+    # ClientToken, so a retried tool call returns the first instance instead
+    # of launching another one.
+    client_token = derive_key('ec2.RunInstances', {
+        'ImageId': ami_id,
+        'InstanceType': instance_type,
+        'KeyName': key_name,
+        'SecurityGroupIds': security_group_ids,
+        'Region': region_name,
+    }, idempotency_key)
+
+    def launch():
+        try:
+            response = ec2.run_instances(
+                ImageId=ami_id,  # Example: Ubuntu 20.04 (replace with your desired AMI)
+                InstanceType=instance_type,          # Example
+                MinCount=1,
+                MaxCount=1,
+                ClientToken=client_token,  # Dedupes retried requests
+                KeyName=key_name,    # Replace with your key pair name
+                SecurityGroupIds=list(security_group_ids),  # Replace with your security group ID
+                TagSpecifications=[
+                    {
+                        'ResourceType': 'instance',
+                        'Tags': [
+                            {
+                                'Key': 'Name',
+                                'Value': 'MyPyEc2Instance-mcp'
+                            },
+                            {
+                                'Key': 'Environment',
+                                'Value': 'Staging'
+                            }
+                        ]
+                    }
+                ]
+            )
+
+            # Extract the instance ID from the response
+            instance_id = response['Instances'][0]['InstanceId']
+            inventory.invalidate(INSTANCES, region_name)
+            print(f"EC2 instance created with ID: {instance_id}")
+            return instance_id  # Return the Instance ID
+
+        except Exception as e:
+            print(f"Error creating EC2 instance: {e}")
+            return None # Return None in case of Error
+
+    return run_once(client_token, launch)
 
-    except Exception as e:
-        print(f"Error creating EC2 instance: {e}")
-        return None # Return None in case of Error
 
 def terminate_ec2_instance(instance_id):
     """
@@ -84,12 +102,14 @@ def terminate_ec2_instance(instance_id):
 
     Args:
         instance_id (str): The ID of the EC2 instance to terminate.
+
+    Returns:
+        bool: True if the termination request was accepted.
     """
 
-    load_dotenv()
-    region_name = os.getenv('AWS_REGION', '<your value>')
+    region_name = config.get('AWS_REGION', '<your value>')
     # Initialize the EC2 client
-    ec2 = boto3.client('ec2', region_name=region_name)
+    ec2 = get_client('ec2', region_name)
 
     try:
         # Terminate the instance
@@ -97,6 +117,11 @@ def terminate_ec2_instance(instance_id):
             InstanceIds=[instance_id]
         )
 
+        inventory.record_instance_states(region_name, {
+            instance['InstanceId']: instance['CurrentState']['Name']
+            for instance in response['TerminatingInstances']
+        })
+
         # Print the termination status
         print(f"Terminating instance: {instance_id}")
         for instance in response['TerminatingInstances']:
@@ -104,9 +129,11 @@ def terminate_ec2_instance(instance_id):
             print(f"  Previous State: {instance['PreviousState']['Name']}")
             print(f"  Current State: {instance['CurrentState']['Name']}")
 
+        return True
+
     except Exception as e:
         print(f"Error terminating instance {instance_id}: {e}")
-        sys.exit(1)
+        return False
 
 if __name__ == "__main__":
     # Example usage
@@ -1,18 +1,41 @@
-import boto3
+import contextvars
+import json
+import logging
 import os
-from dotenv import load_dotenv
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from client_pool import get_client
+import config
+from idempotency import derive_key, run_once
+from inventory import BUCKETS, inventory
+from results import failure, succeeded, success
+import listing
+import s3_transfer
 
-# Load environment variables from .env file
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-def create_s3_bucket():
-    bucket_name = os.getenv('S3_BUCKET_NAME', '')
-    region = os.getenv('AWS_REGION', 'us-east-1')
+# delete_objects accepts at most 1,000 keys per call.
+DELETE_BATCH_SIZE = 1000
+
+def _error_code(e):
+    return getattr(e, 'response', {}).get('Error', {}).get('Code')
+
+def create_s3_bucket(idempotency_key=None):
+    bucket_name = config.get('S3_BUCKET_NAME', '')
+    region = config.get('AWS_REGION', 'us-east-1')
 
     if not bucket_name:
-        return "S3_BUCKET_NAME not set in environment."
+        return failure("S3_BUCKET_NAME not set in environment.")
+
+    # Concurrent or retried identical requests share one create_bucket call.
+    key = derive_key('s3.CreateBucket', {'Bucket': bucket_name, 'Region': region}, idempotency_key)
+    return run_once(key, _create_bucket, bucket_name, region,
+                    remember=succeeded)
 
-    s3 = boto3.client('s3', region_name=region)
+def _create_bucket(bucket_name, region):
+    s3 = get_client('s3', region)
 
     try:
         if region == 'us-east-1':
@@ -22,21 +45,290 @@ def create_s3_bucket():
                 Bucket=bucket_name,
                 CreateBucketConfiguration={'LocationConstraint': region}
             )
-        return f"S3 bucket '{bucket_name}' created successfully."
+        inventory.invalidate(BUCKETS)
+        return success(bucket=bucket_name, region=region, created=True)
     except Exception as e:
-        return f"Error creating S3 bucket: {e}"
+        if _error_code(e) == 'BucketAlreadyOwnedByYou':
+            return success(bucket=bucket_name, region=region, created=False)
+        logger.error("Error creating S3 bucket %s: %s", bucket_name, e)
+        return failure(e, bucket=bucket_name)
+
+def _checkpoint_dir():
+    return os.path.expanduser(config.get('S3_EMPTY_CHECKPOINT_DIR', '~/.cache/mcp-aws/s3-empty'))
+
+def _checkpoint_path(bucket_name):
+    return os.path.join(_checkpoint_dir(), f"{bucket_name}.json")
+
+def _load_checkpoint(bucket_name):
+    try:
+        with open(_checkpoint_path(bucket_name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_checkpoint(bucket_name, checkpoint):
+    os.makedirs(_checkpoint_dir(), exist_ok=True)
+    tmp = _checkpoint_path(bucket_name) + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, _checkpoint_path(bucket_name))
+
+def _clear_checkpoint(bucket_name):
+    try:
+        os.remove(_checkpoint_path(bucket_name))
+    except OSError:
+        pass
+
+def _object_batches(s3, bucket_name, versioned, start_after=None):
+    """
+    Yield lists of up to DELETE_BATCH_SIZE {'Key', 'VersionId'} dicts.
 
-def delete_s3_bucket():
-    bucket_name = os.getenv('S3_BUCKET_NAME', '')
-    region = os.getenv('AWS_REGION', 'us-east-1')
+    Versioned (or once-versioned) buckets are listed with list_object_versions
+    so every version and delete marker goes; others with list_objects_v2,
+    starting after start_after. Pages are pulled lazily, so listing only runs
+    as far ahead as the deleters let it.
+    """
+    if versioned:
+        pages = s3.get_paginator('list_object_versions').paginate(Bucket=bucket_name)
+        objects = ({'Key': o['Key'], 'VersionId': o['VersionId']}
+                   for page in pages
+                   for o in page.get('Versions', []) + page.get('DeleteMarkers', []))
+    else:
+        extra = {'StartAfter': start_after} if start_after else {}
+        pages = s3.get_paginator('list_objects_v2').paginate(Bucket=bucket_name, **extra)
+        objects = ({'Key': o['Key']} for page in pages for o in page.get('Contents', []))
+
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == DELETE_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def empty_s3_bucket(bucket_name, region=None, on_progress=None):
+    """
+    Delete every object (and version) in bucket_name.
+
+    A single lister streams pages into a bounded queue and S3_EMPTY_MAX_WORKERS
+    threads drain it with delete_objects calls of 1,000 keys, so memory stays
+    at a few batches however large the bucket is. on_progress(summary) is
+    called after every batch.
+
+    Progress is checkpointed under S3_EMPTY_CHECKPOINT_DIR every
+    S3_EMPTY_CHECKPOINT_INTERVAL seconds by one writer thread, never by the
+    deleters. For unversioned buckets the checkpoint keeps the last key below
+    which every batch was deleted without errors, and a rerun lists from
+    there (StartAfter). Versioned buckets are listed from the start again;
+    deleted versions drop out of the listing, so little is listed twice.
+
+    :return: dict with deleted, failed, errors (a sample), runs and elapsed_s
+    """
+    s3 = get_client('s3', region)
+    started = time.monotonic()
+    checkpoint = _load_checkpoint(bucket_name)
+    versioned = s3.get_bucket_versioning(Bucket=bucket_name).get('Status') in ('Enabled', 'Suspended')
+    summary = {
+        'bucket': bucket_name,
+        'deleted': checkpoint.get('deleted', 0),
+        'failed': 0,
+        'errors': [],
+        'runs': checkpoint.get('runs', 0) + 1,
+    }
+    # Batches finish out of order: start_after only moves past a batch once
+    # it and every batch listed before it were deleted without errors.
+    resume = {'start_after': None if versioned else checkpoint.get('start_after'), 'next': 0}
+    finished = {}
+    lock = threading.Lock()
+    max_workers = max(1, config.get_int('S3_EMPTY_MAX_WORKERS', 8))
+    # Listed-but-not-yet-deleted batches held in memory, per worker.
+    queue_depth = max(1, config.get_int('S3_EMPTY_QUEUE_DEPTH', 2))
+    batches = queue.Queue(maxsize=max_workers * queue_depth)
+    done = object()
+    stopped = threading.Event()
+
+    def save_checkpoint():
+        with lock:
+            state = {'deleted': summary['deleted'], 'runs': summary['runs']}
+            if resume['start_after']:
+                state['start_after'] = resume['start_after']
+        try:
+            _save_checkpoint(bucket_name, state)
+        except OSError as e:
+            logger.warning("Could not write checkpoint for %s: %s", bucket_name, e)
+
+    def checkpointer():
+        interval = config.get_float('S3_EMPTY_CHECKPOINT_INTERVAL', 5.0)
+        while not stopped.wait(interval):
+            save_checkpoint()
+
+    def report():
+        with lock:
+            snapshot = dict(summary, errors=list(summary['errors']),
+                            elapsed_s=round(time.monotonic() - started, 1))
+        logger.info("Emptying %s: %d deleted, %d failed", bucket_name, snapshot['deleted'], snapshot['failed'])
+        if on_progress:
+            try:
+                on_progress(snapshot)
+            except Exception as e:
+                # A dead listener must not stop the deleters and stall the lister.
+                logger.warning("Progress callback failed: %s", e)
+
+    def delete_worker():
+        while (item := batches.get()) is not done:
+            sequence, batch = item
+            try:
+                response = s3.delete_objects(Bucket=bucket_name,
+                                             Delete={'Objects': batch, 'Quiet': True})
+                errors = response.get('Errors', [])
+            except Exception as e:
+                errors = [{'Key': obj['Key'], 'Code': _error_code(e) or str(e)} for obj in batch]
+            with lock:
+                summary['deleted'] += len(batch) - len(errors)
+                summary['failed'] += len(errors)
+                room = 20 - len(summary['errors'])
+                summary['errors'].extend(
+                    {'key': err['Key'], 'code': err.get('Code')} for err in errors[:max(0, room)]
+                )
+                finished[sequence] = None if errors else batch[-1]['Key']
+                while finished.get(resume['next']) is not None:
+                    resume['start_after'] = finished.pop(resume['next'])
+                    resume['next'] += 1
+            report()
+
+    writer = threading.Thread(target=checkpointer, name=f"s3-empty-checkpoint-{bucket_name}", daemon=True)
+    writer.start()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            workers = [pool.submit(contextvars.copy_context().run, delete_worker)
+                       for _ in range(max_workers)]
+            try:
+                for item in enumerate(_object_batches(s3, bucket_name, versioned, resume['start_after'])):
+                    batches.put(item)
+            finally:
+                for _ in workers:
+                    batches.put(done)
+            for worker in workers:
+                worker.result()
+    finally:
+        stopped.set()
+        writer.join()
+        save_checkpoint()
+
+    summary['elapsed_s'] = round(time.monotonic() - started, 1)
+    return summary
+
+def delete_s3_bucket(force=False, on_progress=None):
+    """
+    Delete the S3_BUCKET_NAME bucket.
+
+    With force=True the bucket is emptied first (see empty_s3_bucket); it is
+    only deleted once every object and version is gone.
+    """
+    bucket_name = config.get('S3_BUCKET_NAME', '')
+    region = config.get('AWS_REGION', 'us-east-1')
 
     if not bucket_name:
-        return "S3_BUCKET_NAME not set in environment."
+        return failure("S3_BUCKET_NAME not set in environment.")
 
-    s3 = boto3.client('s3', region_name=region)
+    s3 = get_client('s3', region)
 
     try:
+        if force:
+            emptied = empty_s3_bucket(bucket_name, region, on_progress)
+            if emptied['failed']:
+                return failure(
+                    f"{emptied['failed']} objects could not be removed; run again to resume.",
+                    bucket=bucket_name, deleted_objects=emptied['deleted'],
+                    failed_objects=emptied['failed'], sample_errors=emptied['errors'][:3],
+                )
         s3.delete_bucket(Bucket=bucket_name)
-        return f"S3 bucket '{bucket_name}' deleted successfully."
+        _clear_checkpoint(bucket_name)
+        inventory.invalidate(BUCKETS)
+        if force:
+            return success(bucket=bucket_name, deleted_objects=emptied['deleted'],
+                           elapsed_s=emptied['elapsed_s'])
+        return success(bucket=bucket_name)
+    except Exception as e:
+        logger.error("Error deleting S3 bucket %s: %s", bucket_name, e)
+        if _error_code(e) == 'BucketNotEmpty' and force:
+            # Something below the checkpointed StartAfter is still there (e.g.
+            # written during the run); the next run must list from the start.
+            _clear_checkpoint(bucket_name)
+        if _error_code(e) == 'BucketNotEmpty' and not force:
+            return failure("Bucket is not empty; retry with force=True to empty it first.",
+                           bucket=bucket_name, code='BucketNotEmpty')
+        return failure(e, bucket=bucket_name)
+
+class TransferPathError(ValueError):
+    """A transfer file_path resolves outside MCP_AWS_TRANSFER_DIR."""
+
+def transfer_path(file_path):
+    """
+    file_path resolved (symlinks included) under MCP_AWS_TRANSFER_DIR, default the working directory.
+
+    The transfer tools take paths from MCP clients, possibly over HTTP, so
+    they may not read or write anything outside that directory.
+    """
+    root = os.path.realpath(os.path.expanduser(config.get('MCP_AWS_TRANSFER_DIR') or os.getcwd()))
+    path = os.path.realpath(os.path.join(root, file_path))
+    if os.path.commonpath([root, path]) != root or path == root:
+        raise TransferPathError(f"{file_path} is outside the transfer directory {root} (MCP_AWS_TRANSFER_DIR).")
+    return path
+
+def _transfer(fn, direction, bucket_name, key, *args, **kwargs):
+    if not bucket_name:
+        return failure("S3_BUCKET_NAME not set in environment.")
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        logger.error("S3 %s of %s failed: %s", direction, key, e)
+        return failure(e, bucket=bucket_name, key=key)
+    logger.info("S3 %s of %s: %d bytes in %ss (%s MB/s)", direction, key, result['bytes'],
+                result['seconds'], result['mb_per_s'])
+    return success(**result)
+
+def upload_s3_object(file_path, key=None, bucket_name=None, part_size_mb=None, concurrency=None):
+    key = key or os.path.basename(file_path)
+    bucket_name = bucket_name or config.get('S3_BUCKET_NAME', '')
+    try:
+        file_path = transfer_path(file_path)
+    except TransferPathError as e:
+        return failure(e, bucket=bucket_name, key=key)
+    return _transfer(s3_transfer.upload_file, 'upload', bucket_name, key,
+                     file_path, bucket_name, key, part_size_mb, concurrency,
+                     config.get('AWS_REGION', 'us-east-1'))
+
+def download_s3_object(key, file_path=None, bucket_name=None, part_size_mb=None, concurrency=None):
+    file_path = file_path or os.path.basename(key)
+    bucket_name = bucket_name or config.get('S3_BUCKET_NAME', '')
+    try:
+        file_path = transfer_path(file_path)
+    except TransferPathError as e:
+        return failure(e, bucket=bucket_name, key=key)
+    return _transfer(s3_transfer.download_file, 'download', bucket_name, key,
+                     bucket_name, key, file_path, part_size_mb, concurrency,
+                     config.get('AWS_REGION', 'us-east-1'))
+
+def list_s3_objects(bucket_name=None, **kwargs):
+    """One cursor-paged page of objects; see listing.list_s3_objects."""
+    bucket_name = bucket_name or config.get('S3_BUCKET_NAME', '')
+    if not bucket_name:
+        return failure("S3_BUCKET_NAME not set in environment.")
+    try:
+        return success(**listing.list_s3_objects(bucket_name, region=config.get('AWS_REGION', 'us-east-1'),
+                                                 **kwargs))
+    except Exception as e:  # ClientError, or InvalidCursor for a stale or foreign cursor
+        return failure(e, bucket=bucket_name)
+
+def aggregate_s3_objects(bucket_name=None, **kwargs):
+    """Counts and sizes grouped by prefix; see listing.aggregate_s3_objects."""
+    bucket_name = bucket_name or config.get('S3_BUCKET_NAME', '')
+    if not bucket_name:
+        return failure("S3_BUCKET_NAME not set in environment.")
+    try:
+        return success(**listing.aggregate_s3_objects(bucket_name, region=config.get('AWS_REGION', 'us-east-1'),
+                                                      **kwargs))
     except Exception as e:
-        return f"Error deleting S3 bucket: {e}"
+        return failure(e, bucket=bucket_name)
@@ -1,177 +1,544 @@
-import boto3
+import contextvars
 
-import os
+import hashlib
 
-import sys
+import logging
 
-from botocore.exceptions import ClientError
+import re
 
-from dotenv import load_dotenv
- 
-# Load environment variables from .env if available
+import time
 
-load_dotenv()
- 
-# Initialize AWS clients dynamically (can expand for other services)
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-aws_clients = {
+from botocore.exceptions import ClientError
 
-    "ec2": boto3.client(
+import config
 
-        "ec2", region_name=os.getenv("AWS_REGION", "us-east-1")
+from client_pool import default_region, get_client, use_target
 
-    ),
+from idempotency import derive_key, run_once, sub_key
 
-    "s3": boto3.client(
+from inventory import BUCKETS, FUNCTIONS, INSTANCES, inventory
 
-        "s3", region_name=os.getenv("AWS_REGION", "us-east-1")
+from results import configure_logging, failure, succeeded, success
 
-    ),
+import listing
+ 
+logger = logging.getLogger(__name__)
+ 
+# Services handled by perform_aws_action; clients come from the shared pool.
 
-    "lambda": boto3.client(
+SUPPORTED_SERVICES = ("ec2", "s3", "lambda")
 
-        "lambda", region_name=os.getenv("AWS_REGION", "us-east-1")
 
-    ),
+def _run_instances_params(**kwargs):
+    """Build the common run_instances parameters from kwargs, falling back to env."""
+    ami_id = kwargs.get("ImageId", config.get("AMI_ID"))
+    instance_type = kwargs.get("InstanceType", config.get("INSTANCE_TYPE", "t2.micro"))
+    key_name = kwargs.get("KeyName", config.get("KEY_NAME"))
+    security_group_ids = kwargs.get("SecurityGroupIds", config.get_list("SECURITY_GROUP_IDS"))
+    security_group_ids = [sg for sg in security_group_ids if sg]
 
-}
- 
- 
-def create_ec2_instance(**kwargs):
+    if not ami_id or not key_name or not security_group_ids:
+        logger.error("Missing required EC2 parameters (AMI_ID, KEY_NAME, SECURITY_GROUP_IDS).")
+        return None
 
-    """Create an EC2 instance with dynamic parameters or defaults from env."""
+    return {
+        "ImageId": ami_id,
+        "InstanceType": instance_type,
+        "KeyName": key_name,
+        "SecurityGroupIds": security_group_ids,
+        "TagSpecifications": [
+            {
+                "ResourceType": "instance",
+                "Tags": [
+                    {"Key": "Name", "Value": kwargs.get("Name", "MyPyEc2Instance-mcp")},
+                    {"Key": "Environment", "Value": kwargs.get("Environment", "Staging")},
+                ],
+            }
+        ],
+    }
 
-    ec2 = aws_clients["ec2"]
- 
-    ami_id = kwargs.get("ImageId", os.getenv("AMI_ID"))
 
-    instance_type = kwargs.get("InstanceType", os.getenv("INSTANCE_TYPE", "t2.micro"))
+def create_ec2_instance(**kwargs):
+    """
+    Create an EC2 instance with dynamic parameters or defaults from env.
 
-    key_name = kwargs.get("KeyName", os.getenv("KEY_NAME"))
+    The request is idempotent: it is sent with a ClientToken derived from the
+    parameters (plus IdempotencyKey, if given), and identical concurrent or
+    repeated calls share one run_instances call and its instance ID.
+    """
+    caller_key = kwargs.pop("IdempotencyKey", None)
+    params = _run_instances_params(**kwargs)
+    if params is None:
+        return failure("Missing required EC2 parameters (AMI_ID, KEY_NAME, SECURITY_GROUP_IDS).")
+    client_token = derive_key("ec2.RunInstances", params, caller_key)
+    return run_once(client_token, _run_instance, params, client_token, remember=succeeded)
 
-    security_group_ids = kwargs.get(
+ 
 
-        "SecurityGroupIds", os.getenv("SECURITY_GROUP_IDS", "").split(",")
+def _run_instance(params, client_token):
 
-    )
- 
-    if not ami_id or not key_name or not security_group_ids:
+    ec2 = get_client("ec2")
 
-        print("Missing required EC2 parameters (AMI_ID, KEY_NAME, SECURITY_GROUP_IDS).")
+    started = time.perf_counter()
 
-        return None
- 
     try:
 
         response = ec2.run_instances(
+            MinCount=1, MaxCount=1, ClientToken=client_token, **params
+        )
 
-            ImageId=ami_id,
+        instance = response["Instances"][0]
 
-            InstanceType=instance_type,
+        inventory.invalidate(INSTANCES)
 
-            MinCount=1,
+        logger.info("EC2 instance created with ID: %s", instance["InstanceId"])
 
-            MaxCount=1,
+        return success(
+            instance_id=instance["InstanceId"],
+            state=instance["State"]["Name"],
+            instance_type=instance["InstanceType"],
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+        )
 
-            KeyName=key_name,
+    except ClientError as e:
 
-            SecurityGroupIds=list(security_group_ids),
+        logger.error("Error creating EC2 instance: %s", e)
 
-            TagSpecifications=[
+        return failure(e)
 
-                {
+ 
 
-                    "ResourceType": "instance",
+def _record_transitions(instances, region: str = None):
+    """Write the CurrentState from a state-change response through to the inventory."""
+    inventory.record_instance_states(
+        region, {i["InstanceId"]: i["CurrentState"]["Name"] for i in instances}
+    )
 
-                    "Tags": [
 
-                        {"Key": "Name", "Value": kwargs.get("Name", "MyPyEc2Instance-mcp")},
+def _change_instance_state(verb, call, response_key, instance_id):
+    """Run one start/stop/terminate call and return the instance's state transition."""
+
+    started = time.perf_counter()
+
+    try:
 
-                        {"Key": "Environment", "Value": kwargs.get("Environment", "Staging")},
+        response = call(InstanceIds=[instance_id])
 
-                    ],
+        _record_transitions(response[response_key])
 
-                }
+        instance = response[response_key][0]
 
-            ],
+        logger.info(
+            "%s instance %s: %s -> %s", verb, instance_id,
+            instance["PreviousState"]["Name"], instance["CurrentState"]["Name"],
+        )
 
+        return success(
+            instance_id=instance["InstanceId"],
+            previous_state=instance["PreviousState"]["Name"],
+            state=instance["CurrentState"]["Name"],
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
         )
 
-        instance_id = response["Instances"][0]["InstanceId"]
+    except ClientError as e:
 
-        print(f"EC2 instance created with ID: {instance_id}")
+        logger.error("Error %s instance %s: %s", verb.lower(), instance_id, e)
 
-        return instance_id
+        return failure(e, instance_id=instance_id)
 
-    except ClientError as e:
+ 
 
-        print(f"Error creating EC2 instance: {e}")
+def terminate_ec2_instance(instance_id: str):
+
+    """Terminate an EC2 instance by ID; returns its state transition or the error."""
+
+    return _change_instance_state(
+        "Terminating", get_client("ec2").terminate_instances, "TerminatingInstances", instance_id
+    )
 
-        return None
  
+
+def stop_ec2_instance(instance_id: str):
+
+    """Stop an EC2 instance by ID; returns its state transition or the error."""
+
+    return _change_instance_state(
+        "Stopping", get_client("ec2").stop_instances, "StoppingInstances", instance_id
+    )
+
  
-def terminate_ec2_instance(instance_id: str):
 
-    """Terminate an EC2 instance by ID."""
+def start_ec2_instance(instance_id: str):
+
+    """Start an EC2 instance by ID; returns its state transition or the error."""
+
+    return _change_instance_state(
+        "Starting", get_client("ec2").start_instances, "StartingInstances", instance_id
+    )
 
-    ec2 = aws_clients["ec2"]
  
-    try:
 
-        response = ec2.terminate_instances(InstanceIds=[instance_id])
+def _map_in_context(pool, fn, items):
+    """pool.map that carries the caller's context (e.g. use_target) into the workers."""
+    futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+    return (future.result() for future in futures)
 
-        print(f"Terminating instance: {instance_id}")
 
-        for instance in response["TerminatingInstances"]:
+# run_instances error codes that mean "no room here", so the batch should
+# move on to the next placement or instance type instead of failing.
+CAPACITY_ERROR_CODES = {
+    "InsufficientInstanceCapacity",
+    "InsufficientHostCapacity",
+    "InsufficientReservedInstanceCapacity",
+    "InsufficientCapacity",
+    "Unsupported",
+}
 
-            print(f"  Instance ID: {instance['InstanceId']}")
 
-            print(f"  Previous State: {instance['PreviousState']['Name']}")
+def _fleet_placements(subnet_ids=None, availability_zones=None):
+    """Return (label, run_instances overrides) for each requested placement."""
+    if subnet_ids:
+        return [(subnet_id, {"SubnetId": subnet_id}) for subnet_id in subnet_ids]
+    if availability_zones:
+        return [(az, {"Placement": {"AvailabilityZone": az}}) for az in availability_zones]
+    return [("default", {})]
 
-            print(f"  Current State: {instance['CurrentState']['Name']}")
 
-        return True
+def _fleet_batches(count, placements, instance_types, batch_size):
+    """
+    Split count into batches spread round-robin over the placements.
 
-    except ClientError as e:
+    Each batch carries its own fallback order: every instance type in its
+    home placement first, then every instance type in the other placements.
+    """
+    per_placement = [0] * len(placements)
+    for i in range(count):
+        per_placement[i % len(placements)] += 1
+
+    batches = []
+    for home, total in enumerate(per_placement):
+        rotated = placements[home:] + placements[:home]
+        candidates = [(p, t) for p in rotated for t in instance_types]
+        while total > 0:
+            size = min(total, batch_size)
+            batches.append((size, candidates))
+            total -= size
+    return batches
+
+
+def _launch_fleet_batch(base_params, fleet_key, index, count, candidates):
+    """Launch up to count instances, walking candidates on capacity errors."""
+    ec2 = get_client("ec2")
+    batch = {
+        "placement": candidates[0][0][0],
+        "requested": count,
+        "instance_ids": [],
+        "attempts": [],
+    }
+    remaining = count
+
+    for step, ((label, overrides), instance_type) in enumerate(candidates):
+        if remaining <= 0:
+            break
+        params = dict(base_params, InstanceType=instance_type, **overrides)
+        attempt = {"placement": label, "instance_type": instance_type, "requested": remaining}
+        try:
+            # MinCount=1 lets EC2 hand back partial capacity; the shortfall
+            # is retried against the next candidate.
+            # A token per (batch, step) lets a retried fleet request replay the
+            # same launches instead of creating new instances.
+            response = ec2.run_instances(
+                MinCount=1,
+                MaxCount=remaining,
+                ClientToken=sub_key(fleet_key, index, step),
+                **params,
+            )
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code", "")
+            attempt["error"] = code
+            batch["attempts"].append(attempt)
+            if code in CAPACITY_ERROR_CODES:
+                continue
+            batch["error"] = str(e)
+            break
+
+        launched = [instance["InstanceId"] for instance in response["Instances"]]
+        attempt["launched"] = len(launched)
+        batch["attempts"].append(attempt)
+        batch["instance_ids"].extend(launched)
+        remaining -= len(launched)
+
+    if remaining > 0 and "error" not in batch:
+        batch["error"] = f"Insufficient capacity for {remaining} instance(s) in all placements."
+    return batch
+
+
+def create_ec2_fleet(
+    count: int,
+    subnet_ids=None,
+    availability_zones=None,
+    instance_types=None,
+    batch_size: int = None,
+    **kwargs,
+):
+    """
+    Launch count EC2 instances as concurrent, batched run_instances calls.
 
-        print(f"Error terminating instance {instance_id}: {e}")
+    The count is spread over subnet_ids (or availability_zones); a batch that
+    hits a capacity error falls back to the other instance types and
+    placements. Remaining kwargs are the same as for create_ec2_instance,
+    including IdempotencyKey: a repeated request returns the same fleet.
+    batch_size defaults to EC2_FLEET_BATCH_SIZE.
 
-        return False
- 
+    :return: dict with requested/launched counts, all instance IDs and the
+        per-batch attempts and errors
+    """
+    caller_key = kwargs.pop("IdempotencyKey", None)
+    base_params = _run_instances_params(**kwargs)
+    if base_params is None:
+        return {"ok": False, "requested": count, "launched": 0, "instance_ids": [], "batches": [],
+                "errors": ["Missing required EC2 parameters (AMI_ID, KEY_NAME, SECURITY_GROUP_IDS)."]}
+
+    instance_types = instance_types or [base_params["InstanceType"]]
+    if batch_size is None:
+        batch_size = config.get_int("EC2_FLEET_BATCH_SIZE", 50)
+    placements = _fleet_placements(subnet_ids, availability_zones)
+    batches = _fleet_batches(count, placements, instance_types, max(1, batch_size))
+    fleet_key = derive_key(
+        "ec2.Fleet", {"count": count, "batches": batches, "params": base_params}, caller_key
+    )
+    # Only a fully launched fleet is replayed; a partial one is retried (with
+    # the same ClientTokens, so batches that did launch are not duplicated).
+    return run_once(
+        fleet_key, _launch_fleet, count, base_params, fleet_key, batches,
+        remember=lambda result: not result["errors"],
+    )
 
-def stop_ec2_instance(instance_id: str):
-    """Stop an EC2 instance by ID."""
-    ec2 = aws_clients["ec2"]
+
+def _launch_fleet(count, base_params, fleet_key, batches):
+    max_workers = config.get_int("EC2_FLEET_MAX_WORKERS", 16)
+    with ThreadPoolExecutor(max_workers=max(1, min(len(batches), max_workers))) as pool:
+        results = list(_map_in_context(
+            pool,
+            lambda indexed: _launch_fleet_batch(base_params, fleet_key, *indexed),
+            [(index, *batch) for index, batch in enumerate(batches)],
+        ))
+
+    instance_ids = [i for batch in results for i in batch["instance_ids"]]
+    if instance_ids:
+        inventory.invalidate(INSTANCES)
+    logger.info("EC2 fleet launched %d/%d instances in %d batches", len(instance_ids), count, len(batches))
+    return {
+        "ok": len(instance_ids) == count,
+        "requested": count,
+        "launched": len(instance_ids),
+        "instance_ids": instance_ids,
+        "batches": results,
+        "errors": [batch["error"] for batch in results if "error" in batch],
+    }
+
+
+# describe_instances allows at most 200 values per filter.
+DESCRIBE_FILTER_CHUNK = 200
+
+
+def describe_instance_states(instance_ids, region: str = None):
+    """
+    Return {instance_id: state} for instance_ids with as few describe calls as possible.
+
+    IDs are passed as an instance-id filter rather than InstanceIds, so an ID
+    that EC2 does not know yet (right after launch) is simply missing from the
+    result instead of failing the whole call. Observed states are written
+    through to the inventory cache.
+    """
+    ec2 = get_client("ec2", region)
+    paginator = ec2.get_paginator("describe_instances")
+    states = {}
+    for start in range(0, len(instance_ids), DESCRIBE_FILTER_CHUNK):
+        chunk = list(instance_ids[start:start + DESCRIBE_FILTER_CHUNK])
+        for page in paginator.paginate(Filters=[{"Name": "instance-id", "Values": chunk}]):
+            for reservation in page["Reservations"]:
+                for instance in reservation["Instances"]:
+                    states[instance["InstanceId"]] = instance["State"]["Name"]
+    inventory.record_instance_states(region, states)
+    return states
+
+
+def list_ec2_instances(*args, **kwargs):
+    """One cursor-paged page of instances; see listing.list_ec2_instances."""
     try:
-        response = ec2.stop_instances(InstanceIds=[instance_id])
-        print(f"Stopping instance: {instance_id}")
-        for instance in response["StoppingInstances"]:
-            print(f"  Instance ID: {instance['InstanceId']}")
-            print(f"  Previous State: {instance['PreviousState']['Name']}")
-            print(f"  Current State: {instance['CurrentState']['Name']}")
-        return True
-    except ClientError as e:
-        print(f"Error stopping instance {instance_id}: {e}")
-        return False
+        return success(**listing.list_ec2_instances(*args, **kwargs))
+    except Exception as e:  # ClientError, or InvalidCursor for a stale or foreign cursor
+        return failure(e)
 
 
-def start_ec2_instance(instance_id: str):
-    """Start an EC2 instance by ID."""
-    ec2 = aws_clients["ec2"]
+def aggregate_ec2_instances(*args, **kwargs):
+    """Instance counts grouped by state, type, AZ or tag; see listing.aggregate_ec2_instances."""
     try:
-        response = ec2.start_instances(InstanceIds=[instance_id])
-        print(f"Starting instance: {instance_id}")
-        for instance in response["StartingInstances"]:
-            print(f"  Instance ID: {instance['InstanceId']}")
-            print(f"  Previous State: {instance['PreviousState']['Name']}")
-            print(f"  Current State: {instance['CurrentState']['Name']}")
-        return True
-    except ClientError as e:
-        print(f"Error starting instance {instance_id}: {e}")
-        return False
+        return success(**listing.aggregate_ec2_instances(*args, **kwargs))
+    except Exception as e:  # ClientError, or ValueError for an unknown group_by
+        return failure(e)
+
+
+# Bulk state changes: action -> (client method, response key).
+BULK_ACTIONS = {
+    "stop": ("stop_instances", "StoppingInstances"),
+    "start": ("start_instances", "StartingInstances"),
+    "terminate": ("terminate_instances", "TerminatingInstances"),
+}
+
+_INSTANCE_ID_RE = re.compile(r"i-[0-9a-f]+")
+
+
+def _group_ids_by_region(instance_ids, home_region):
+    """Group IDs by region; an ID may be qualified as 'region:i-...'."""
+    by_region = {}
+    for qualified in instance_ids:
+        region, _, instance_id = qualified.rpartition(":")
+        by_region.setdefault(region or home_region, []).append(instance_id)
+    return by_region
 
 
-def perform_aws_action(service: str, action: str, **kwargs):
+def _instance_ids_for_tags(region: str, tags: dict):
+    """Return the IDs of non-terminated instances in region matching every tag."""
+    paginator = get_client("ec2", region).get_paginator("describe_instances")
+    filters = [{"Name": f"tag:{key}", "Values": [value]} for key, value in tags.items()]
+    filters.append({
+        "Name": "instance-state-name",
+        "Values": ["pending", "running", "stopping", "stopped"],
+    })
+    return [
+        instance["InstanceId"]
+        for page in paginator.paginate(Filters=filters)
+        for reservation in page["Reservations"]
+        for instance in reservation["Instances"]
+    ]
+
+
+def _bulk_action_chunk(action: str, region: str, instance_ids):
+    """
+    Apply action to one chunk of IDs in one region.
+
+    EC2 rejects the whole call when any ID in it is unknown or in the wrong
+    state; those IDs are named in the error, so they are split out as
+    failures and the rest of the chunk is retried.
+    """
+    method, response_key = BULK_ACTIONS[action]
+    ec2 = get_client("ec2", region)
+    transitions, failures = {}, {}
+    pending = list(instance_ids)
+
+    while pending:
+        try:
+            response = getattr(ec2, method)(InstanceIds=pending)
+        except ClientError as e:
+            named = set(_INSTANCE_ID_RE.findall(str(e))) & set(pending)
+            failed = named if named and len(named) < len(pending) else pending
+            for instance_id in failed:
+                failures[instance_id] = {"region": region, "error": str(e)}
+            pending = [i for i in pending if i not in failed]
+            continue
+
+        for instance in response[response_key]:
+            transitions[instance["InstanceId"]] = {
+                "region": region,
+                "previous_state": instance["PreviousState"]["Name"],
+                "current_state": instance["CurrentState"]["Name"],
+            }
+        break
+
+    return transitions, failures
+
+
+def bulk_instance_action(
+    action: str,
+    instance_ids=None,
+    tags=None,
+    regions=None,
+    chunk_size: int = None,
+):
+    """
+    Stop, start or terminate many EC2 instances in as few API calls as possible.
+
+    :param action: stop, start or terminate
+    :param instance_ids: IDs, optionally region-qualified as 'us-west-2:i-...'
+    :param tags: tag filters {key: value}; matching instances in `regions` are added
+    :param regions: regions searched for tag matches (default: AWS_REGION)
+    :param chunk_size: IDs per API call (default: EC2_BULK_CHUNK_SIZE)
+    :return: dict with per-instance state transitions and failures
+    """
+    if action not in BULK_ACTIONS:
+        return failure(f"Unsupported bulk action '{action}'.", action=action)
+
+    home_region = default_region()
+    by_region = _group_ids_by_region(instance_ids or [], home_region)
+    failures = {}
+
+    if tags:
+        for region in regions or [home_region]:
+            try:
+                matched = _instance_ids_for_tags(region, tags)
+            except ClientError as e:
+                failures[f"{region}:tags"] = {"region": region, "error": str(e)}
+                continue
+            known = set(by_region.get(region, []))
+            by_region.setdefault(region, []).extend(i for i in matched if i not in known)
+
+    if chunk_size is None:
+        chunk_size = config.get_int("EC2_BULK_CHUNK_SIZE", 1000)
+    chunks = [
+        (region, ids[start:start + chunk_size])
+        for region, ids in by_region.items()
+        for start in range(0, len(ids), max(1, chunk_size))
+    ]
+    transitions = {}
+    if chunks:
+        max_workers = config.get_int("EC2_BULK_MAX_WORKERS", 16)
+        with ThreadPoolExecutor(max_workers=max(1, min(len(chunks), max_workers))) as pool:
+            for chunk_transitions, chunk_failures in _map_in_context(
+                pool, lambda chunk: _bulk_action_chunk(action, *chunk), chunks
+            ):
+                transitions.update(chunk_transitions)
+                failures.update(chunk_failures)
+
+    for region in by_region:
+        inventory.record_instance_states(region, {
+            instance_id: transition["current_state"]
+            for instance_id, transition in transitions.items()
+            if transition["region"] == region
+        })
+
+    logger.info("Bulk %s: %d succeeded, %d failed in %d API calls across %d regions",
+                action, len(transitions), len(failures), len(chunks), len(by_region))
+    return {
+        "ok": not failures,
+        "action": action,
+        "requested": sum(len(ids) for ids in by_region.values()),
+        "succeeded": len(transitions),
+        "failed": len(failures),
+        "transitions": transitions,
+        "failures": failures,
+    }
+
+
+def stop_ec2_instances(instance_ids=None, tags=None, regions=None):
+    """Stop many EC2 instances by ID and/or tag filters."""
+    return bulk_instance_action("stop", instance_ids, tags, regions)
+
+
+def start_ec2_instances(instance_ids=None, tags=None, regions=None):
+    """Start many EC2 instances by ID and/or tag filters."""
+    return bulk_instance_action("start", instance_ids, tags, regions)
+
+
+def terminate_ec2_instances(instance_ids=None, tags=None, regions=None):
+    """Terminate many EC2 instances by ID and/or tag filters."""
+    return bulk_instance_action("terminate", instance_ids, tags, regions)
+
+
+def perform_aws_action(service: str, action: str, raise_errors: bool = False, **kwargs):
 
     """
 
@@ -181,17 +548,19 @@ def perform_aws_action(service: str, action: str, **kwargs):
 
     :param action: Action to perform (create, terminate, deploy, etc.)
 
+    :param raise_errors: re-raise ClientError instead of returning it as a message
+
     :param kwargs: Service-specific parameters
 
-    :return: Result or error message
+    :return: success()/failure() result dict (fleets return their own summary)
 
     """
 
-    client = aws_clients.get(service.lower())
+    if service.lower() not in SUPPORTED_SERVICES:
 
-    if not client:
+        return failure(f"Service '{service}' is not supported.")
 
-        return f"Service '{service}' is not supported."
+    client = get_client(service.lower())
  
     try:
 
@@ -207,9 +576,31 @@ def perform_aws_action(service: str, action: str, **kwargs):
 
                 if not instance_id:
 
-                    return "InstanceId is required to terminate EC2 instance."
+                    return failure("InstanceId is required to terminate EC2 instance.")
 
                 return terminate_ec2_instance(instance_id)
+
+            elif action.lower() == "create_fleet":
+
+                count = kwargs.pop("Count", None)
+
+                if not count:
+
+                    return failure("Count is required to create an EC2 fleet.")
+
+                return create_ec2_fleet(
+
+                    int(count),
+
+                    subnet_ids=kwargs.pop("SubnetIds", None),
+
+                    availability_zones=kwargs.pop("AvailabilityZones", None),
+
+                    instance_types=kwargs.pop("InstanceTypes", None),
+
+                    **kwargs,
+
+                )
  
         elif service.lower() == "s3":
 
@@ -219,11 +610,11 @@ def perform_aws_action(service: str, action: str, **kwargs):
 
                 if not bucket_name:
 
-                    return "BucketName is required to create S3 bucket."
+                    return failure("BucketName is required to create S3 bucket.")
 
-                client.create_bucket(Bucket=bucket_name)
+                key = derive_key("s3.CreateBucket", {"Bucket": bucket_name}, kwargs.get("IdempotencyKey"))
 
-                return f"S3 bucket '{bucket_name}' created successfully."
+                return run_once(key, _create_bucket, client, bucket_name, remember=succeeded)
  
         elif service.lower() == "lambda":
 
@@ -241,41 +632,136 @@ def perform_aws_action(service: str, action: str, **kwargs):
 
                 if not all([function_name, role, code]):
 
-                    return "FunctionName, Role, and Code are required to deploy Lambda."
+                    return failure("FunctionName, Role, and Code are required to deploy Lambda.")
 
-                client.create_function(
+                params = dict(FunctionName=function_name, Runtime=runtime, Role=role,
+                              Handler=handler, Code=code)
 
-                    FunctionName=function_name,
+                key = derive_key("lambda.CreateFunction", _without_blobs(params), kwargs.get("IdempotencyKey"))
 
-                    Runtime=runtime,
+                return run_once(key, _create_function, client, params, remember=succeeded)
+ 
+        return failure(f"Action '{action}' not supported for service '{service}'.")
+ 
+    except ClientError as e:
 
-                    Role=role,
+        if raise_errors:
 
-                    Handler=handler,
+            raise
 
-                    Code=code,
+        return failure(e)
 
-                )
 
-                return f"Lambda function '{function_name}' deployed successfully."
- 
-        return f"Action '{action}' not supported for service '{service}'."
- 
-    except ClientError as e:
+def _create_bucket(client, bucket_name):
+    region = client.meta.region_name
+    if region == "us-east-1":
+        client.create_bucket(Bucket=bucket_name)
+    else:
+        # Outside us-east-1, S3 requires the region to be named explicitly.
+        client.create_bucket(Bucket=bucket_name,
+                             CreateBucketConfiguration={"LocationConstraint": region})
+    inventory.invalidate(BUCKETS)
+    return success(bucket=bucket_name)
+
+
+def _create_function(client, params):
+    client.create_function(**params)
+    inventory.invalidate(FUNCTIONS)
+    return success(function=params["FunctionName"])
+
+
+def _without_blobs(params):
+    """params with inline zip bytes replaced by their SHA-256, for derive_key."""
+    code = params.get("Code")
+    if isinstance(code, dict) and isinstance(code.get("ZipFile"), bytes):
+        code = dict(code, ZipFile=hashlib.sha256(code["ZipFile"]).hexdigest())
+    return dict(params, Code=code)
+
 
-        return f"AWS ClientError: {e}"
+def _account_of(role_arn):
+    # arn:aws:iam::<account-id>:role/<name>
+    return role_arn.split(":")[4] if role_arn else "default"
+
+
+def _fanout_target(service, action, region, role_arn, kwargs):
+    """Run perform_aws_action against one (account, region) and time it."""
+    started = time.perf_counter()
+    result, error = None, None
+    try:
+        with use_target(region, role_arn):
+            result = perform_aws_action(service, action, raise_errors=True, **dict(kwargs))
+        if isinstance(result, dict) and not result.get("ok", True):
+            error = result.get("error") or "; ".join(result.get("errors", [])) or f"{service} {action} failed."
+    except Exception as e:  # one bad target must not sink the others
+        error = f"{type(e).__name__}: {e}"
+    return {
+        "account": _account_of(role_arn),
+        "role_arn": role_arn,
+        "region": region,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "result": result,
+        "error": error,
+    }
+
+
+def fanout_targets(regions=None, role_arns=None):
+    """Every (region, role_arn) pair; None role means the default account."""
+    return [
+        (region, role_arn)
+        for role_arn in (role_arns or [None])
+        for region in (regions or [default_region()])
+    ]
+
+
+def iter_aws_action_fanout(service: str, action: str, regions=None, role_arns=None, **kwargs):
+    """
+    Run one perform_aws_action across regions x assumed-role accounts concurrently.
+
+    Yields one result dict per target (account, region, latency_ms, result,
+    error) as soon as that target finishes, so callers can stream them.
+    Assumed-role credentials are cached in client_pool until they expire.
+    """
+    targets = fanout_targets(regions, role_arns)
+    max_workers = config.get_int("AWS_FANOUT_MAX_WORKERS", 16)
+    with ThreadPoolExecutor(max_workers=max(1, min(len(targets), max_workers))) as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run,
+                        _fanout_target, service, action, region, role_arn, kwargs)
+            for region, role_arn in targets
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def perform_aws_action_fanout(service: str, action: str, regions=None, role_arns=None, **kwargs):
+    """Collect iter_aws_action_fanout into one merged response."""
+    started = time.perf_counter()
+    results = list(iter_aws_action_fanout(service, action, regions, role_arns, **kwargs))
+    failed = sum(1 for r in results if r["error"])
+    return {
+        "ok": not failed,
+        "service": service,
+        "action": action,
+        "targets": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "results": results,
+    }
  
  
 if __name__ == "__main__":
 
     # Test example for EC2
 
-    instance_id = create_ec2_instance()
+    configure_logging()
+
+    created = create_ec2_instance()
 
-    if instance_id:
+    if created["ok"]:
 
-        terminate_ec2_instance(instance_id)
+        terminate_ec2_instance(created["instance_id"])
 
     else:
 
-        print("No instance created; cannot terminate.")
+        logger.error("No instance created; cannot terminate.")
@@ -1,42 +1,209 @@
-import boto3
+import base64
+import contextvars
+import hashlib
+import logging
 import os
-from dotenv import load_dotenv
+import time
+from concurrent.futures import ThreadPoolExecutor
+from client_pool import get_client
+import config
+from idempotency import derive_key, run_once
+from inventory import FUNCTIONS, inventory
+from lambda_packager import build_package
+from results import failure, succeeded, success
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-def create_lambda_function():
-    lambda_client = boto3.client('lambda', region_name=os.getenv('AWS_REGION'))
+# Lambda rejects zips above this size unless they are deployed from S3.
+DIRECT_UPLOAD_LIMIT = 50 * 1024 * 1024
+_HASH_CHUNK = 1024 * 1024
+_LOOKUP = object()
 
-    function_name = os.getenv('LAMBDA_FUNCTION_NAME')
-    role_arn = os.getenv('LAMBDA_ROLE_ARN')
-    handler = os.getenv('LAMBDA_HANDLER', 'lambda_function.lambda_handler')
-    runtime = os.getenv('LAMBDA_RUNTIME', 'python3.12')
-    zip_path = os.getenv('LAMBDA_ZIP_PATH', 'function.zip')
+class PackageTooLarge(ValueError):
+    """The zip is over Lambda's direct upload limit and there is no staging bucket."""
 
+def _error_code(e):
+    return getattr(e, 'response', {}).get('Error', {}).get('Code')
+
+def code_sha256(zip_path):
+    """Base64 SHA-256 of zip_path, the format Lambda reports as CodeSha256."""
+    digest = hashlib.sha256()
+    with open(zip_path, 'rb') as f:
+        while chunk := f.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return base64.b64encode(digest.digest()).decode()
+
+def _deployed_sha256(lambda_client, function_name):
+    """CodeSha256 of the deployed function, or None if it does not exist."""
     try:
+        return lambda_client.get_function_configuration(FunctionName=function_name)['CodeSha256']
+    except Exception as e:
+        if _error_code(e) == 'ResourceNotFoundException':
+            return None
+        raise
+
+def _code_location(zip_path, function_name, sha256, staging_bucket):
+    """Code argument for create/update: inline bytes, or a content-addressed S3 object."""
+    size = os.path.getsize(zip_path)
+    # Zips up to this size are sent inline; bigger ones are staged in S3 and
+    # streamed from disk so the package is never held in memory.
+    inline_limit = config.get_int('LAMBDA_INLINE_ZIP_LIMIT', 10 * 1024 * 1024)
+    if size <= inline_limit or not staging_bucket:
+        if size > inline_limit:
+            logger.warning("%s is %.1f MiB but LAMBDA_STAGING_BUCKET is not set; reading it into memory "
+                           "to upload inline", zip_path, size / 1024 / 1024)
         with open(zip_path, 'rb') as f:
-            zipped_code = f.read()
-
-        response = lambda_client.create_function(
-            FunctionName=function_name,
-            Runtime=runtime,
-            Role=role_arn,
-            Handler=handler,
-            Code={'ZipFile': zipped_code},
-            Publish=True,
-            Timeout=15,
-            MemorySize=128,
-        )
-        return f"Lambda function '{function_name}' created successfully."
+            return {'ZipFile': f.read()}
+
+    s3 = get_client('s3')
+    key = f"lambda-staging/{function_name}/{base64.b64decode(sha256).hex()}.zip"
+    try:
+        s3.head_object(Bucket=staging_bucket, Key=key)
+    except Exception as e:
+        if _error_code(e) not in ('404', 'NoSuchKey', 'NotFound'):
+            raise
+        # upload_file streams the file in multipart chunks from disk.
+        s3.upload_file(zip_path, staging_bucket, key)
+    return {'S3Bucket': staging_bucket, 'S3Key': key}
+
+def deploy_lambda_function(function_name=None, zip_path=None, staging_bucket=None,
+                           deployed_sha256=_LOOKUP):
+    """
+    Deploy zip_path to function_name, doing as little work as possible.
+
+    Skips the upload entirely when the local SHA-256 matches the deployed
+    CodeSha256, calls update_function_code when the function exists and
+    create_function otherwise. Zips larger than LAMBDA_INLINE_ZIP_LIMIT are
+    staged in staging_bucket (LAMBDA_STAGING_BUCKET) instead of being sent
+    inline; without a staging bucket, a zip over Lambda's 50 MiB direct
+    upload limit fails before anything is read or sent.
+
+    deployed_sha256 lets batch callers pass a CodeSha256 they already know
+    (None for "does not exist") to save the lookup.
+
+    Returns a dict with ok, function, action (skipped/updated/created/failed),
+    code_sha256 and elapsed_ms, plus error and code on failure.
+    """
+    function_name = function_name or config.get('LAMBDA_FUNCTION_NAME')
+    zip_path = zip_path or config.get('LAMBDA_ZIP_PATH', 'function.zip')
+    staging_bucket = staging_bucket or config.get('LAMBDA_STAGING_BUCKET')
+    started = time.perf_counter()
+    result = {'ok': True, 'function': function_name}
+
+    try:
+        size = os.path.getsize(zip_path)
+        if size > DIRECT_UPLOAD_LIMIT and not staging_bucket:
+            raise PackageTooLarge(
+                f"{zip_path} is {size / 1024 / 1024:.1f} MiB, over Lambda's "
+                f"{DIRECT_UPLOAD_LIMIT // 1024 // 1024} MiB direct upload limit; "
+                "set LAMBDA_STAGING_BUCKET to deploy it from S3.")
+        lambda_client = get_client('lambda', config.get('AWS_REGION'))
+        local_sha = code_sha256(zip_path)
+        result['code_sha256'] = local_sha
+        if deployed_sha256 is _LOOKUP:
+            deployed_sha256 = _deployed_sha256(lambda_client, function_name)
+
+        if deployed_sha256 == local_sha:
+            result['action'] = 'skipped'
+        else:
+            code = _code_location(zip_path, function_name, local_sha, staging_bucket)
+            if deployed_sha256 is None:
+                lambda_client.create_function(
+                    FunctionName=function_name,
+                    Runtime=config.get('LAMBDA_RUNTIME', 'python3.12'),
+                    Role=config.get('LAMBDA_ROLE_ARN'),
+                    Handler=config.get('LAMBDA_HANDLER', 'lambda_function.lambda_handler'),
+                    Code=code,
+                    Publish=True,
+                    Timeout=15,
+                    MemorySize=128,
+                )
+                result['action'] = 'created'
+            else:
+                lambda_client.update_function_code(FunctionName=function_name, Publish=True, **code)
+                result['action'] = 'updated'
+            inventory.invalidate(FUNCTIONS)
     except Exception as e:
-        return f"Error creating Lambda function: {e}"
+        result.update(failure(e), action='failed')
+
+    result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+def deploy_lambda_functions(functions, staging_bucket=None):
+    """
+    Deploy many functions concurrently.
+
+    functions is a list of {'function_name': ..., 'zip_path': ...}. The
+    deployed CodeSha256 of every function comes from one list_functions
+    pass instead of a lookup per function, and unchanged ones are skipped.
+    A malformed entry fails on its own; the rest of the batch still deploys.
+    """
+    started = time.perf_counter()
+    deployed = {f['name']: f['code_sha256'] for f in inventory.get(FUNCTIONS, refresh=True)}
+
+    def deploy(index, spec):
+        name = spec.get('function_name') if isinstance(spec, dict) else None
+        if not name or not isinstance(name, str):
+            # Without this check a missing name would fall back to LAMBDA_FUNCTION_NAME.
+            return failure(f"functions[{index}] has no function_name.", index=index, action='failed')
+        return deploy_lambda_function(name, spec.get('zip_path'), staging_bucket,
+                                      deployed_sha256=deployed.get(name))
+
+    max_workers = config.get_int('LAMBDA_DEPLOY_MAX_WORKERS', 16)
+    with ThreadPoolExecutor(max_workers=max(1, min(len(functions), max_workers))) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, deploy, index, spec)
+                   for index, spec in enumerate(functions)]
+        results = [future.result() for future in futures]
+
+    summary = {'ok': all(r['ok'] for r in results)}
+    summary.update({action: sum(1 for r in results if r['action'] == action)
+                    for action in ('created', 'updated', 'skipped', 'failed')})
+    summary['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    summary['results'] = results
+    return summary
+
+def build_and_deploy_lambda_function(source_dir, function_name=None, requirements_file=None,
+                                     staging_bucket=None):
+    """
+    Build source_dir (+ requirements_file) into a reproducible zip and deploy it.
+
+    Unchanged sources rebuild to a byte-identical zip, so the deploy step
+    sees a matching CodeSha256 and skips the upload.
+    """
+    try:
+        build = build_package(source_dir, requirements_file)
+    except Exception as e:
+        return failure(f"Build failed: {e}", action='failed',
+                       function=function_name or config.get('LAMBDA_FUNCTION_NAME'))
+    result = deploy_lambda_function(function_name, build['zip_path'], staging_bucket)
+    result['build'] = build
+    return result
+
+def create_lambda_function(idempotency_key=None):
+    function_name = config.get('LAMBDA_FUNCTION_NAME')
+    zip_path = config.get('LAMBDA_ZIP_PATH', 'function.zip')
+
+    try:
+        stat = os.stat(zip_path)
+    except OSError as e:
+        return failure(e, function=function_name)
+
+    # Concurrent or retried identical requests share one deployment.
+    key = derive_key('lambda.CreateFunction', {
+        'FunctionName': function_name,
+        'ZipPath': zip_path,
+        'Size': stat.st_size,
+        'MTime': stat.st_mtime_ns,
+    }, idempotency_key)
+    return run_once(key, deploy_lambda_function, function_name, zip_path, remember=succeeded)
 
 def delete_lambda_function():
-    lambda_client = boto3.client('lambda', region_name=os.getenv('AWS_REGION'))
-    function_name = os.getenv('LAMBDA_FUNCTION_NAME')
+    lambda_client = get_client('lambda', config.get('AWS_REGION'))
+    function_name = config.get('LAMBDA_FUNCTION_NAME')
 
     try:
         lambda_client.delete_function(FunctionName=function_name)
-        return f"Lambda function '{function_name}' deleted successfully."
+        inventory.invalidate(FUNCTIONS)
+        return success(function=function_name)
     except Exception as e:
-        return f"Error deleting Lambda function: {e}" 
+        return failure(e, function=function_name)
@@ -0,0 +1,134 @@
+"""
+Idempotent create calls for the AWS tools.
+
+An LLM agent that times out on a tool call tends to call it again, and
+without protection every retry launches another billed resource. Create
+helpers therefore:
+
+  * derive a key from the request parameters plus an optional caller key
+    (derive_key), which doubles as the EC2 ClientToken, so AWS itself
+    dedupes a retry that reaches it;
+  * run the call through run_once(), which merges identical concurrent calls
+    into one in-flight request and replays a successful result for a while.
+
+Without a caller key, identical requests count as retries of one another
+as long as each arrives within MCP_AWS_IDEMPOTENCY_WINDOW seconds of the
+previous one (a sliding window kept in this process); after a quiet period
+the same request gets a new key. A caller that did not run the call itself
+(it joined one in flight, or got a remembered result) receives the result
+marked "replayed": true, so a deliberate second create is not mistaken for
+a new resource.
+
+    MCP_AWS_IDEMPOTENCY_TTL     seconds a successful result is replayed (default 600)
+    MCP_AWS_IDEMPOTENCY_WINDOW  quiet seconds after which a request without a caller key is new (default 600)
+"""
+import hashlib
+import json
+import secrets
+import threading
+import time
+from concurrent.futures import Future
+
+from client_pool import current_target
+import config
+
+_lock = threading.Lock()
+_inflight = {}
+_results = {}
+_stats = {"executed": 0, "coalesced": 0, "replayed": 0}
+# request hash -> (random scope, monotonic time last seen) for requests without a caller key.
+_auto_scopes = {}
+
+
+def _auto_scope(request: str) -> str:
+    """Scope shared by repeats of request while each follows the last within the window."""
+    now = time.monotonic()
+    window = config.get_float("MCP_AWS_IDEMPOTENCY_WINDOW", 600.0)
+    with _lock:
+        scope, last_seen = _auto_scopes.get(request, (None, 0.0))
+        if scope is None or now - last_seen > window:
+            scope = f"auto:{secrets.token_hex(8)}"
+        _auto_scopes[request] = (scope, now)
+        for stale in [r for r, (_, seen) in _auto_scopes.items() if now - seen > window]:
+            del _auto_scopes[stale]
+    return scope
+
+
+def derive_key(operation: str, params: dict, caller_key: str = None) -> str:
+    """
+    64-character hex key for operation + params (+ caller_key).
+
+    The use_target() region/role is part of the key, so the same request
+    fanned out to several regions is not collapsed into one. The key is
+    valid as an EC2 ClientToken (max 64 ASCII characters).
+    """
+    request = json.dumps(
+        {"operation": operation, "params": params, "target": current_target()},
+        sort_keys=True,
+        default=str,
+    )
+    scope = caller_key if caller_key is not None else _auto_scope(request)
+    return hashlib.sha256(json.dumps([request, scope]).encode()).hexdigest()
+
+
+def sub_key(key: str, *parts) -> str:
+    """Derived key for one sub-request (e.g. a fleet batch attempt) of key."""
+    return hashlib.sha256(":".join([key, *map(str, parts)]).encode()).hexdigest()
+
+
+def _succeeded(result):
+    return result is not None and result is not False
+
+
+def _replayed(result):
+    """A dict result marked as shared from another call."""
+    return {**result, "replayed": True} if isinstance(result, dict) else result
+
+
+def run_once(key: str, fn, *args, remember=_succeeded, **kwargs):
+    """
+    Call fn(*args, **kwargs) at most once per key at a time.
+
+    Callers arriving while the call is in flight wait for it and share its
+    result (or exception). A result for which remember(result) is true is
+    replayed to later callers for MCP_AWS_IDEMPOTENCY_TTL seconds. Shared
+    and replayed dict results carry "replayed": True.
+    """
+    now = time.monotonic()
+    with _lock:
+        cached = _results.get(key)
+        if cached is not None and cached[0] > now:
+            _stats["replayed"] += 1
+            return _replayed(cached[1])
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = Future()
+            _stats["executed"] += 1
+        else:
+            _stats["coalesced"] += 1
+
+    if not owner:
+        return _replayed(future.result())
+
+    try:
+        result = fn(*args, **kwargs)
+    except BaseException as e:
+        with _lock:
+            _inflight.pop(key, None)
+        future.set_exception(e)
+        raise
+
+    with _lock:
+        _inflight.pop(key, None)
+        if remember(result):
+            _results[key] = (now + config.get_float("MCP_AWS_IDEMPOTENCY_TTL", 600.0), result)
+        for stale in [k for k, (expires, _) in _results.items() if expires <= now]:
+            del _results[stale]
+    future.set_result(result)
+    return result
+
+
+def stats():
+    with _lock:
+        return dict(_stats, cached_results=len(_results), in_flight=len(_inflight))
@@ -0,0 +1,191 @@
+"""
+In-process TTL cache of EC2 instances, S3 buckets and Lambda functions.
+
+Agents ask "what is running?" before nearly every action. The read-only MCP
+tools answer from this cache, which is filled by paginated describe/list
+calls and kept current by the mutating helpers: state changes are written
+through, creates and deletes invalidate the affected listing.
+
+    MCP_AWS_INVENTORY_TTL  seconds a cached listing stays fresh (default 60)
+"""
+import threading
+import time
+
+from client_pool import current_target, get_client
+import config
+
+INSTANCES = "instances"
+BUCKETS = "buckets"
+FUNCTIONS = "functions"
+
+# S3 bucket listings are account-wide rather than per region.
+GLOBAL = "global"
+
+# Instances that still cost money or can come back; terminated ones are skipped.
+LIVE_INSTANCE_STATES = ["pending", "running", "shutting-down", "stopping", "stopped"]
+
+
+def _tags(resource):
+    return {tag["Key"]: tag["Value"] for tag in resource.get("Tags", [])}
+
+
+def _load_instances(region):
+    paginator = get_client("ec2", region).get_paginator("describe_instances")
+    items, calls = {}, 0
+    for page in paginator.paginate(
+        Filters=[{"Name": "instance-state-name", "Values": LIVE_INSTANCE_STATES}]
+    ):
+        calls += 1
+        for reservation in page["Reservations"]:
+            for instance in reservation["Instances"]:
+                tags = _tags(instance)
+                items[instance["InstanceId"]] = {
+                    "instance_id": instance["InstanceId"],
+                    "name": tags.get("Name"),
+                    "state": instance["State"]["Name"],
+                    "instance_type": instance["InstanceType"],
+                    "availability_zone": instance.get("Placement", {}).get("AvailabilityZone"),
+                    "private_ip": instance.get("PrivateIpAddress"),
+                    "launch_time": instance["LaunchTime"].isoformat(),
+                    "tags": tags,
+                }
+    return items, calls
+
+
+def _load_buckets(region):
+    paginator = get_client("s3").get_paginator("list_buckets")
+    items, calls = {}, 0
+    for page in paginator.paginate():
+        calls += 1
+        for bucket in page["Buckets"]:
+            items[bucket["Name"]] = {
+                "name": bucket["Name"],
+                "created": bucket["CreationDate"].isoformat(),
+                "region": bucket.get("BucketRegion"),
+            }
+    return items, calls
+
+
+def _load_functions(region):
+    paginator = get_client("lambda", region).get_paginator("list_functions")
+    items, calls = {}, 0
+    for page in paginator.paginate():
+        calls += 1
+        for function in page["Functions"]:
+            items[function["FunctionName"]] = {
+                "name": function["FunctionName"],
+                "runtime": function.get("Runtime"),
+                "memory_mb": function.get("MemorySize"),
+                "timeout_s": function.get("Timeout"),
+                "code_sha256": function.get("CodeSha256"),
+                "last_modified": function.get("LastModified"),
+            }
+    return items, calls
+
+
+_LOADERS = {
+    INSTANCES: _load_instances,
+    BUCKETS: _load_buckets,
+    FUNCTIONS: _load_functions,
+}
+
+
+class _Entry:
+    __slots__ = ("items", "loaded_at", "api_calls")
+
+    def __init__(self, items, api_calls):
+        self.items = items
+        self.loaded_at = time.monotonic()
+        self.api_calls = api_calls
+
+
+class InventoryCache:
+    """TTL cache of {id: summary} listings keyed by (kind, region, role)."""
+
+    def __init__(self, ttl: float = None):
+        # None follows MCP_AWS_INVENTORY_TTL, so a changed .env applies to the next lookup.
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._entries = {}
+        self._counters = {"hits": 0, "misses": 0, "api_calls": 0,
+                          "api_calls_saved": 0, "invalidations": 0}
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return config.get_float("MCP_AWS_INVENTORY_TTL", 60.0)
+
+    def _key(self, kind, region):
+        # Listings are per account too, so the use_target() role is part of the key.
+        target_region, role_arn = current_target()
+        return (kind, GLOBAL if kind == BUCKETS else region or target_region, role_arn)
+
+    def _fresh(self, entry):
+        return entry is not None and time.monotonic() - entry.loaded_at < self.ttl
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                self._counters[name] += value
+
+    def get(self, kind: str, region: str = None, refresh: bool = False):
+        """
+        Return the cached listing for kind/region, loading it on a miss.
+
+        Concurrent misses for the same key share one load.
+
+        :param kind: INSTANCES, BUCKETS or FUNCTIONS
+        :param refresh: bypass the cache and reload from AWS
+        :return: list of summary dicts
+        """
+        key = self._key(kind, region)
+        entry = self._entries.get(key)
+        if not refresh and self._fresh(entry):
+            self._count(hits=1, api_calls_saved=entry.api_calls)
+            return list(entry.items.values())
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            entry = self._entries.get(key)
+            if not refresh and self._fresh(entry):
+                self._count(hits=1, api_calls_saved=entry.api_calls)
+                return list(entry.items.values())
+            items, calls = _LOADERS[kind](key[1])
+            entry = _Entry(items, calls)
+            self._entries[key] = entry
+            self._count(misses=1, api_calls=calls)
+        return list(entry.items.values())
+
+    def invalidate(self, kind: str, region: str = None):
+        """Drop the listing for kind/region so the next read reloads it."""
+        if self._entries.pop(self._key(kind, region), None) is not None:
+            self._count(invalidations=1)
+
+    def record_instance_states(self, region: str, states: dict):
+        """Write through {instance_id: state} from a start/stop/terminate response."""
+        key = self._key(INSTANCES, region)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            items = dict(entry.items)
+            for instance_id, state in states.items():
+                if instance_id in items:
+                    items[instance_id] = dict(items[instance_id], state=state)
+            # Swap in a new dict so readers never see a half-applied update.
+            entry.items = items
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["ttl_seconds"] = self.ttl
+        stats["cached_listings"] = len(self._entries)
+        return stats
+
+
+inventory = InventoryCache()
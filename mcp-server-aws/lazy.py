@@ -0,0 +1,57 @@
+"""
+Deferred imports for the MCP servers.
+
+The servers only need FastMCP to register their tool schemas; the helper
+modules pull in boto3/botocore, which dominates startup time.
+lazy_import() hands back a proxy that imports the real module on first
+attribute access, i.e. on the first tool call that needs it.
+
+    MCP_AWS_LAZY_IMPORTS=0  import helpers eagerly at startup
+    MCP_AWS_PREWARM=1       import helpers in a background thread once the
+                            server is up, so the first tool call is warm too
+"""
+import importlib
+import threading
+
+import config
+
+
+class LazyModule:
+    """Module proxy that imports `name` the first time an attribute is read."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        # import_module is thread-safe, so concurrent first calls are fine.
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """Return module `name`, deferred unless MCP_AWS_LAZY_IMPORTS=0."""
+    if not config.get_bool("MCP_AWS_LAZY_IMPORTS", True):
+        return importlib.import_module(name)
+    return LazyModule(name)
+
+
+def prewarm(*modules):
+    """Load lazy modules in a daemon thread when MCP_AWS_PREWARM=1."""
+    if not config.get_bool("MCP_AWS_PREWARM", False):
+        return
+
+    def _warm():
+        for module in modules:
+            if isinstance(module, LazyModule):
+                module._load()
+
+    threading.Thread(target=_warm, name="mcp-aws-prewarm", daemon=True).start()
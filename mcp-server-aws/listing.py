@@ -0,0 +1,264 @@
+"""
+Bounded, cursor-paged listings of S3 objects and EC2 instances.
+
+Buckets with millions of keys and accounts with thousands of instances must
+not end up as one giant tool response in the agent's context. These helpers:
+
+  * push filters to AWS (key prefix; instance state, type and tags), so
+    nothing is fetched only to be thrown away;
+  * return one page of compact items plus an opaque next_cursor, which wraps
+    the AWS continuation token together with a fingerprint of the filters
+    so it cannot be replayed against a different query;
+  * offer aggregate_* variants that stream every page once and return only
+    counts and sizes grouped by prefix, state, type or tag.
+"""
+import base64
+import hashlib
+import json
+from collections import defaultdict
+
+from client_pool import get_client
+
+MAX_S3_PAGE = 1000
+MAX_EC2_PAGE = 1000
+MIN_EC2_PAGE = 5
+DEFAULT_TOP_GROUPS = 50
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _fingerprint(kind, filters):
+    return hashlib.sha256(json.dumps([kind, filters], sort_keys=True).encode()).hexdigest()[:16]
+
+
+def encode_cursor(kind, filters, token):
+    if not token:
+        return None
+    payload = json.dumps({"f": _fingerprint(kind, filters), "t": token}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(kind, filters, cursor):
+    """AWS continuation token inside cursor; raises InvalidCursor if it belongs to another query."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise InvalidCursor("Cursor is not valid.") from None
+    if payload.get("f") != _fingerprint(kind, filters):
+        raise InvalidCursor("Cursor was issued for a different listing or filters.")
+    return payload["t"]
+
+
+def _ec2_filters(states=None, instance_types=None, tags=None):
+    filters = []
+    if states:
+        filters.append({"Name": "instance-state-name", "Values": list(states)})
+    if instance_types:
+        filters.append({"Name": "instance-type", "Values": list(instance_types)})
+    for key, value in sorted((tags or {}).items()):
+        if value in (None, "", "*"):
+            filters.append({"Name": "tag-key", "Values": [key]})
+        else:
+            filters.append({"Name": f"tag:{key}", "Values": [value]})
+    return filters
+
+
+def _instance_summary(instance):
+    tags = {tag["Key"]: tag["Value"] for tag in instance.get("Tags", [])}
+    return {
+        "instance_id": instance["InstanceId"],
+        "name": tags.get("Name"),
+        "state": instance["State"]["Name"],
+        "instance_type": instance["InstanceType"],
+        "availability_zone": instance.get("Placement", {}).get("AvailabilityZone"),
+        "private_ip": instance.get("PrivateIpAddress"),
+        "launch_time": instance["LaunchTime"].isoformat(),
+        "tags": tags,
+    }
+
+
+def list_s3_objects(bucket, prefix="", delimiter=None, page_size=100, cursor=None, region=None):
+    """
+    One page of objects under prefix.
+
+    With delimiter (usually "/"), keys below the next delimiter are rolled up
+    into common_prefixes, like a directory listing.
+
+    :return: dict with items, common_prefixes, count and next_cursor (None on the last page)
+    """
+    filters = {"bucket": bucket, "prefix": prefix or "", "delimiter": delimiter}
+    kwargs = {"Bucket": bucket, "Prefix": prefix or "",
+              "MaxKeys": max(1, min(int(page_size), MAX_S3_PAGE))}
+    if delimiter:
+        kwargs["Delimiter"] = delimiter
+    token = decode_cursor("s3", filters, cursor)
+    if token:
+        kwargs["ContinuationToken"] = token
+
+    page = get_client("s3", region).list_objects_v2(**kwargs)
+    items = [
+        {
+            "key": obj["Key"],
+            "size": obj["Size"],
+            "last_modified": obj["LastModified"].isoformat(),
+            "storage_class": obj.get("StorageClass"),
+        }
+        for obj in page.get("Contents", [])
+    ]
+    return {
+        "items": items,
+        "common_prefixes": [p["Prefix"] for p in page.get("CommonPrefixes", [])],
+        "count": len(items),
+        "next_cursor": encode_cursor("s3", filters, page.get("NextContinuationToken")),
+    }
+
+
+def list_ec2_instances(states=None, instance_types=None, tags=None, page_size=50, cursor=None,
+                       region=None):
+    """
+    One page of instances matching the filters, evaluated by EC2.
+
+    :param tags: {key: value}; a value of None, "" or "*" matches any instance with the key
+    :return: dict with items, count and next_cursor (None on the last page)
+    """
+    filters = _ec2_filters(states, instance_types, tags)
+    kwargs = {"MaxResults": max(MIN_EC2_PAGE, min(int(page_size), MAX_EC2_PAGE))}
+    if filters:
+        kwargs["Filters"] = filters
+    token = decode_cursor("ec2", {"filters": filters, "region": region}, cursor)
+    if token:
+        kwargs["NextToken"] = token
+
+    page = get_client("ec2", region).describe_instances(**kwargs)
+    items = [_instance_summary(instance)
+             for reservation in page["Reservations"]
+             for instance in reservation["Instances"]]
+    return {
+        "items": items,
+        "count": len(items),
+        "next_cursor": encode_cursor("ec2", {"filters": filters, "region": region},
+                                     page.get("NextToken")),
+    }
+
+
+def _top(groups, top, rank):
+    """Largest `top` groups by `rank`, plus everything else folded into one "(other)" row."""
+    ranked = sorted(groups.items(), key=lambda item: (-item[1][rank], item[0]))
+    rows = [dict(group=name, **totals) for name, totals in ranked[:top]]
+    rest = ranked[top:]
+    if rest:
+        other = {field: sum(totals[field] for _, totals in rest) for field in rest[0][1]}
+        rows.append(dict(group="(other)", groups=len(rest), **other))
+    return rows
+
+
+def _prefix_group(key, prefix, depth, delimiter):
+    parts = key[len(prefix):].split(delimiter)
+    if len(parts) <= depth:
+        # The object sits directly at this level rather than under a sub-prefix.
+        return prefix + delimiter.join(parts[:-1]) + (delimiter if len(parts) > 1 else "") \
+            or "(top level)"
+    return prefix + delimiter.join(parts[:depth]) + delimiter
+
+
+def aggregate_s3_objects(bucket, prefix="", depth=1, delimiter="/", top=DEFAULT_TOP_GROUPS,
+                         max_objects=None, region=None):
+    """
+    Object count and total bytes under prefix, grouped by sub-prefix, in one streaming pass.
+
+    :param depth: how many delimiter-separated levels below prefix to group by
+    :param max_objects: stop after this many objects and mark the result truncated
+    :return: dict with totals, by_prefix (largest `top` groups) and by_storage_class
+    """
+    prefix = prefix or ""
+    paginator = get_client("s3", region).get_paginator("list_objects_v2")
+    groups = defaultdict(lambda: {"count": 0, "bytes": 0})
+    classes = defaultdict(lambda: {"count": 0, "bytes": 0})
+    count = total_bytes = pages = 0
+    truncated = False
+
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix,
+                                   PaginationConfig={"PageSize": MAX_S3_PAGE}):
+        pages += 1
+        for obj in page.get("Contents", []):
+            size = obj["Size"]
+            group = groups[_prefix_group(obj["Key"], prefix, max(1, int(depth)), delimiter)]
+            group["count"] += 1
+            group["bytes"] += size
+            storage = classes[obj.get("StorageClass", "STANDARD")]
+            storage["count"] += 1
+            storage["bytes"] += size
+            count += 1
+            total_bytes += size
+        if max_objects and count >= max_objects:
+            truncated = bool(page.get("IsTruncated"))
+            break
+
+    return {
+        "bucket": bucket,
+        "prefix": prefix,
+        "objects": count,
+        "bytes": total_bytes,
+        "by_prefix": _top(groups, top, "bytes"),
+        "by_storage_class": dict(classes),
+        "pages": pages,
+        "truncated": truncated,
+    }
+
+
+INSTANCE_GROUPS = ("state", "instance_type", "availability_zone")
+
+
+def _instance_group(instance, group_by):
+    if group_by.startswith("tag:"):
+        wanted = group_by[4:]
+        return next((tag["Value"] for tag in instance.get("Tags", []) if tag["Key"] == wanted),
+                    "(untagged)")
+    if group_by == "state":
+        return instance["State"]["Name"]
+    if group_by == "instance_type":
+        return instance["InstanceType"]
+    return instance.get("Placement", {}).get("AvailabilityZone") or "(unknown)"
+
+
+def aggregate_ec2_instances(group_by="state", states=None, instance_types=None, tags=None,
+                            top=DEFAULT_TOP_GROUPS, region=None):
+    """
+    Instance counts and vCPUs grouped by state, type, AZ or a tag ("tag:<key>").
+
+    :return: dict with instances, vcpus and groups (largest `top` first)
+    """
+    if group_by not in INSTANCE_GROUPS and not group_by.startswith("tag:"):
+        raise ValueError(f"group_by must be one of {', '.join(INSTANCE_GROUPS)} or 'tag:<key>'.")
+    filters = _ec2_filters(states, instance_types, tags)
+    paginator = get_client("ec2", region).get_paginator("describe_instances")
+    groups = defaultdict(lambda: {"count": 0, "vcpus": 0})
+    count = vcpus = pages = 0
+
+    kwargs = {"PaginationConfig": {"PageSize": MAX_EC2_PAGE}}
+    if filters:
+        kwargs["Filters"] = filters
+    for page in paginator.paginate(**kwargs):
+        pages += 1
+        for reservation in page["Reservations"]:
+            for instance in reservation["Instances"]:
+                cpu = instance.get("CpuOptions", {})
+                instance_vcpus = cpu.get("CoreCount", 0) * cpu.get("ThreadsPerCore", 1)
+                group = groups[_instance_group(instance, group_by)]
+                group["count"] += 1
+                group["vcpus"] += instance_vcpus
+                count += 1
+                vcpus += instance_vcpus
+
+    return {
+        "group_by": group_by,
+        "instances": count,
+        "vcpus": vcpus,
+        "groups": _top(groups, top, "count"),
+        "pages": pages,
+    }
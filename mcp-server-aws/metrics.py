@@ -0,0 +1,280 @@
+"""
+Prometheus metrics for the AWS MCP server, without a client library.
+
+Every registered tool is timed (see toolsets.Toolset.register) and every
+pooled boto3 client reports its API calls through a botocore "after-call"
+handler (installed with client_pool.add_client_hook). Retry and throttle
+counters are read from retry.stats() when scraped, so they cost nothing
+per call.
+
+    mcp_tool_duration_seconds{tool}                  histogram of tool call latency
+    mcp_tool_in_flight{tool}                         tool calls currently running
+    mcp_tool_errors_total{tool,error}                raised exception type, or the
+                                                     AWS error code of an ok=false result
+    aws_api_calls_total{service,operation}           API calls (after retries)
+    aws_api_errors_total{service,operation,code}     API calls that returned an error
+    aws_api_attempts_total{operation}                attempts, retries included
+                                                     (operation is "service.Operation")
+    aws_api_retries_total{operation}
+    aws_api_throttles_total{operation}
+    aws_api_gave_up_total                            calls that ran out of attempts
+    aws_api_throttled_seconds_total                  backoff slept after throttles
+    aws_api_rate_limited_seconds_total               time spent waiting on the rate limiter
+
+Over HTTP the metrics are served at /metrics next to /mcp. A stdio server
+can expose them on a port of its own with MCP_AWS_METRICS_PORT.
+
+    MCP_AWS_METRICS         0 to leave tools and clients uninstrumented (default 1)
+    MCP_AWS_METRICS_PORT    serve /metrics on this port when running over stdio (default off)
+    MCP_AWS_METRICS_HOST    bind address for MCP_AWS_METRICS_PORT (default 127.0.0.1)
+"""
+import bisect
+import functools
+import threading
+import time
+
+from client_pool import add_client_hook
+import config
+import retry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Tool calls range from a cached listing (milliseconds) to emptying a bucket (minutes).
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_registry = []
+
+
+def enabled():
+    return config.get_bool("MCP_AWS_METRICS", True)
+
+
+def _escape(value):
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Metric:
+    """A metric family; labels(*values) returns the child that holds the value."""
+
+    def __init__(self, kind, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._children = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = _Histogram(self.buckets) if self.kind == "histogram" else _Value()
+                    self._children[values] = child
+        return child
+
+    def samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in sorted(children):
+            if self.kind != "histogram":
+                yield self.name, _labels(self.labelnames, values), child.value
+                continue
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield (f"{self.name}_bucket",
+                       _labels(self.labelnames, values, f'le="{_number(bound)}"'), cumulative)
+            yield f"{self.name}_sum", _labels(self.labelnames, values), total
+            yield f"{self.name}_count", _labels(self.labelnames, values), cumulative
+
+
+class CollectedMetric:
+    """A metric whose values are read from collect() -> {label values: value} at scrape time."""
+
+    def __init__(self, kind, name, documentation, labelnames, collect):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        _registry.append(self)
+
+    def samples(self):
+        for values, value in sorted(self.collect().items()):
+            yield self.name, _labels(self.labelnames, values), value
+
+
+def counter(name, documentation, labelnames=()):
+    return Metric("counter", name, documentation, labelnames)
+
+
+def gauge(name, documentation, labelnames=()):
+    return Metric("gauge", name, documentation, labelnames)
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return Metric("histogram", name, documentation, labelnames, buckets)
+
+
+def render() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(f"{name}{labels} {_number(value)}" for name, labels, value in metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+TOOL_DURATION = histogram("mcp_tool_duration_seconds", "MCP tool call latency.", ["tool"])
+TOOL_IN_FLIGHT = gauge("mcp_tool_in_flight", "MCP tool calls currently running.", ["tool"])
+TOOL_ERRORS = counter("mcp_tool_errors_total",
+                      "Failed MCP tool calls by exception type or AWS error code.", ["tool", "error"])
+AWS_CALLS = counter("aws_api_calls_total", "AWS API calls, after retries.", ["service", "operation"])
+AWS_ERRORS = counter("aws_api_errors_total", "AWS API calls that returned an error.",
+                     ["service", "operation", "code"])
+
+
+def _per_operation(field):
+    return lambda: {(op,): counts[field] for op, counts in retry.stats()["by_operation"].items()}
+
+
+def _retry_total(field):
+    return lambda: {(): retry.stats()[field]}
+
+
+CollectedMetric("counter", "aws_api_attempts_total", "AWS API attempts, retries included.",
+                ["operation"], _per_operation("attempts"))
+CollectedMetric("counter", "aws_api_retries_total", "AWS API retries.",
+                ["operation"], _per_operation("retries"))
+CollectedMetric("counter", "aws_api_throttles_total", "Throttled AWS API attempts.",
+                ["operation"], _per_operation("throttles"))
+CollectedMetric("counter", "aws_api_gave_up_total", "AWS API calls that ran out of attempts.",
+                [], _retry_total("gave_up"))
+CollectedMetric("counter", "aws_api_throttled_seconds_total", "Backoff slept after throttling.",
+                [], _retry_total("throttled_seconds"))
+CollectedMetric("counter", "aws_api_rate_limited_seconds_total",
+                "Time spent waiting on the client-side rate limiter.", [], _retry_total("rate_limited_seconds"))
+
+
+def _result_error(result):
+    """AWS error code (or "failed") of an ok=false tool result, else None."""
+    if isinstance(result, dict) and result.get("ok") is False:
+        return result.get("code") or "failed"
+    return None
+
+
+def instrument(name, fn):
+    """Wrap the async tool fn so its latency, concurrency and errors are recorded as `name`."""
+    duration = TOOL_DURATION.labels(name)
+    in_flight = TOOL_IN_FLIGHT.labels(name)
+
+    @functools.wraps(fn)
+    async def tool(*args, **kwargs):
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as e:
+            TOOL_ERRORS.labels(name, type(e).__name__).inc()
+            raise
+        finally:
+            duration.observe(time.perf_counter() - started)
+            in_flight.dec()
+        error = _result_error(result)
+        if error:
+            TOOL_ERRORS.labels(name, error).inc()
+        return result
+    return tool
+
+
+def install(client, account="default"):
+    """client_pool hook: count every API call the client makes, and its errors."""
+    service = client.meta.service_model.service_name
+
+    def after_call(http_response, parsed, model, **kwargs):
+        AWS_CALLS.labels(service, model.name).inc()
+        code = parsed.get("Error", {}).get("Code") if isinstance(parsed, dict) else None
+        if code:
+            AWS_ERRORS.labels(service, model.name, code).inc()
+
+    client.meta.events.register("after-call", after_call)
+
+
+if enabled():
+    add_client_hook(install)
+
+
+def serve(port, host="127.0.0.1"):
+    """Serve /metrics from a daemon thread (for servers not running over HTTP)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=httpd.serve_forever, name="metrics", daemon=True).start()
+    return httpd
@@ -1,58 +1,94 @@
+import argparse
 import asyncio
 import os
 import shutil
-from apply_env import apply_env
+import sys
 
+# Settings come from the server's config.py (../.env plus the environment).
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from agents import Agent, Runner, gen_trace_id, trace
-from agents.mcp import MCPServer, MCPServerStdio
+from agents import gen_trace_id  # noqa: E402
+from batch import run_batch  # noqa: E402
+import config  # noqa: E402
+from mcp_tracing import server_env  # noqa: E402
+from router import FastPathResult  # noqa: E402
+from session import AgentSession  # noqa: E402
 
-async def run(mcp_server: MCPServer,user_input: str):
-    agent = Agent(
-        name="Assistant",
-        instructions="Use the mcp server and its tools to instanciate an AWS EC2 instance.",
-        mcp_servers=[mcp_server],
-    )
+INSTRUCTIONS = "Use the mcp server and its tools to instanciate an AWS EC2 instance."
 
-    message = user_input
-    print(f"Running: {message}")
-    result = await Runner.run(starting_agent=agent, input=message)
+
+def server_params():
+    root_dir = os.path.dirname(os.getcwd())
+    return {
+        "command": "uv",
+        "args": [
+            "--directory",
+            root_dir,
+            "run",
+            "aws.py",],
+        "env": server_env(),
+    }
+
+
+async def run(session: AgentSession, user_input: str):
+    trace_id = gen_trace_id()
+    print(f"View trace: https://platform.openai.com/traces/trace?trace_id={trace_id}\n")
+    print(f"Running: {user_input}")
+    result = await session.run(user_input, trace_id)
+    if isinstance(result, FastPathResult):
+        print(f"[fast path: {result.tool} in {result.latency_ms} ms]")
     print(result.final_output)
-    
 
-    
-   
 
-async def main(query:str):  
+async def main():
+    # One event loop and one warm MCP server for the whole interactive session.
+    session = AgentSession("AWS ec2 agent", server_params(), INSTRUCTIONS)
+    await session.connect()
+    try:
+        while True:
+            user_input = (await asyncio.to_thread(input, "Enter your command (or type 'exit' to quit): ")).strip()
+            if user_input.lower() == "exit":
+                print("Exiting...")
+                break
+            elif user_input:
+                try:
+                    await run(session, user_input)
+                except Exception as e:
+                    # Keep the session (and the warm server) for the next command.
+                    print(f"Error: {e}")
+    finally:
+        await session.close()
+        if session.router is not None:
+            print(f"Router: {session.router.stats()}")
 
-    root_dir = os.path.dirname(os.getcwd())
-    async with MCPServerStdio(
-        name="AWS ec2 agent",        
-        params={
-            "command": "uv",
-            "args": [
-                "--directory", 
-                root_dir,
-                "run",
-                "aws.py",],
-        },
-    ) as server:
-        trace_id = gen_trace_id()
-        with trace(workflow_name="MCP aws Example", trace_id=trace_id):
-            print(f"View trace: https://platform.openai.com/traces/trace?trace_id={trace_id}\n")
-            await run(server,user_input=query)
+
+async def batch(path, output_path, concurrency):
+    source = sys.stdin if path == "-" else open(path)
+    output = sys.stdout if output_path == "-" else open(output_path, "w")
+    try:
+        await run_batch(source, output, "AWS ec2 agent", server_params(), INSTRUCTIONS, concurrency)
+    finally:
+        for f in (source, output):
+            if f not in (sys.stdin, sys.stdout):
+                f.close()
 
 
 if __name__ == "__main__":
-    apply_env()
-    # Let's make sure the user has npx installed
+    parser = argparse.ArgumentParser(description="AWS agent")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="run the commands in FILE (one per line, '-' for stdin) instead of prompting")
+    parser.add_argument("--output", default="-", help="JSON lines results for --batch (default stdout)")
+    parser.add_argument("--concurrency", type=int,
+                        help="commands in flight for --batch (default MCP_AGENT_BATCH_CONCURRENCY or 4)")
+    args = parser.parse_args()
+
+    # Exports .env (OPENAI_API_KEY, AWS credentials) to os.environ for the SDKs.
+    config.current()
+    # Let's make sure the user has uv installed
     if not shutil.which("uv"):
-        raise RuntimeError("npx is not installed. Please install it with `npm install -g npx`.")
-
-    while True:
-        user_input = input("Enter your command (or type 'exit' to quit): ").strip()
-        if user_input.lower() == "exit":
-            print("Exiting...")
-            break
-        else:
-            asyncio.run(main(user_input))
\ No newline at end of file
+        raise RuntimeError("uv is not installed. Please install it with `pip install uv`.")
+
+    if args.batch:
+        asyncio.run(batch(args.batch, args.output, args.concurrency))
+    else:
+        asyncio.run(main())
@@ -0,0 +1,125 @@
+"""
+Batch mode: run a file of commands through the agent concurrently.
+
+Every worker owns one warm AgentSession (its own MCP server process), so
+commands run in parallel without sharing a connection and no command pays
+for a server start. Results are written as JSON lines as soon as each
+command finishes:
+
+    {"index": 3, "command": "stop instance i-0abc", "route": "fast", "status": "ok",
+     "latency_ms": 41.2, "tool_calls": 1, "output": "...", "trace_id": "trace_..."}
+
+route is "fast" when the router (router.py) called the tool directly and
+"model" when the command went through Runner.run.
+
+Lines that are empty or start with "#" are skipped. A summary with
+throughput and latency percentiles goes to stderr at the end.
+
+    MCP_AGENT_BATCH_CONCURRENCY   commands (and server sessions) in flight (default 4)
+"""
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from agents import gen_trace_id
+
+import config
+from router import FastPathResult
+from session import AgentSession
+
+
+def _tool_calls(result):
+    if isinstance(result, FastPathResult):
+        return 1
+    return sum(1 for item in result.new_items if getattr(item, "type", None) == "tool_call_item")
+
+
+async def _commands(source, queue, workers):
+    """Feed (index, command) pairs from source into queue, then one None per worker."""
+    index = 0
+    while line := await asyncio.to_thread(source.readline):
+        command = line.strip()
+        if command and not command.startswith("#"):
+            index += 1
+            await queue.put((index, command))
+    for _ in range(workers):
+        await queue.put(None)
+
+
+async def _worker(session, queue, write, latencies):
+    while (item := await queue.get()) is not None:
+        index, command = item
+        trace_id = gen_trace_id()
+        started = time.perf_counter()
+        record = {"index": index, "command": command}
+        try:
+            result = await session.run(command, trace_id)
+            fast = isinstance(result, FastPathResult)
+            record.update(route="fast" if fast else "model",
+                          status="error" if fast and result.is_error else "ok",
+                          tool_calls=_tool_calls(result), output=str(result.final_output))
+        except Exception as e:
+            record.update(status="error", tool_calls=None, error=f"{type(e).__name__}: {e}")
+        elapsed = time.perf_counter() - started
+        latencies.append((elapsed, record["status"]))
+        record.update(latency_ms=round(elapsed * 1000, 1), trace_id=trace_id)
+        write(record)
+
+
+def _summary(latencies, wall, restarts, router):
+    times = sorted(elapsed for elapsed, _ in latencies)
+    failed = sum(1 for _, status in latencies if status != "ok")
+    summary = {
+        "commands": len(times),
+        "succeeded": len(times) - failed,
+        "failed": failed,
+        "wall_s": round(wall, 2),
+        "commands_per_s": round(len(times) / wall, 3) if wall else None,
+        "server_restarts": restarts,
+        "router": router.stats(),
+    }
+    if times:
+        summary.update(
+            p50_ms=round(statistics.median(times) * 1000, 1),
+            p95_ms=round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1000, 1),
+            max_ms=round(times[-1] * 1000, 1),
+        )
+    return summary
+
+
+async def run_batch(source, output, name, params, instructions, concurrency=None):
+    """
+    Run every command in source (a text file object) and write JSON lines to output.
+
+    :return: the summary dict (also printed to stderr)
+    """
+    concurrency = max(1, concurrency or config.get_int("MCP_AGENT_BATCH_CONCURRENCY", 4))
+    sessions = [AgentSession(f"{name} #{n}", params, instructions) for n in range(concurrency)]
+    started = time.perf_counter()
+    await sessions[0].connect()
+    for session in sessions[1:]:
+        # One router for the batch, so its stats cover every command.
+        session.router = sessions[0].router
+    await asyncio.gather(*(session.connect() for session in sessions[1:]))
+    print(f"{concurrency} MCP sessions ready in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    def write(record):
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    latencies = []
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(
+            _commands(source, queue, concurrency),
+            *(_worker(session, queue, write, latencies) for session in sessions),
+        )
+    finally:
+        await asyncio.gather(*(session.close() for session in sessions))
+    summary = _summary(latencies, time.perf_counter() - started,
+                       sum(session.restarts for session in sessions), sessions[0].router)
+    print(json.dumps(summary), file=sys.stderr)
+    return summary
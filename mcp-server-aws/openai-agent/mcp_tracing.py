@@ -0,0 +1,65 @@
+"""
+Agent side of the end-to-end trace (see ../tracing.py).
+
+TracedMCPServerStdio opens a client span around every tool call and sends
+its W3C traceparent in the request's `_meta`, where the AWS MCP server picks
+it up and parents its tool and botocore spans to it. turn() opens the root
+span of one agent turn under the Agents SDK trace_id, so the local trace and
+the one on platform.openai.com share an ID.
+"""
+import os
+import sys
+from contextlib import contextmanager
+
+from agents import trace
+from agents.mcp import MCPServerStdio
+from mcp import types
+from mcp.client.stdio import get_default_environment
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import config  # noqa: E402
+import tracing  # noqa: E402
+
+os.environ.setdefault("MCP_AWS_TRACE_SERVICE", "aws-agent")
+config.reload()
+
+
+def server_env():
+    """Environment for the server process: the MCP defaults plus the trace exporter settings."""
+    return {**get_default_environment(), **tracing.environment()}
+
+
+@contextmanager
+def turn(trace_id, user_input, workflow_name="MCP aws Example"):
+    """Agents SDK trace plus the local root span for one turn."""
+    with trace(workflow_name=workflow_name, trace_id=trace_id):
+        # gen_trace_id() returns "trace_<32 hex>", the same shape as a W3C trace ID.
+        with tracing.span("agent.turn", attributes={"agent.input": user_input},
+                          trace_id=trace_id.removeprefix("trace_")) as span:
+            yield span
+
+
+class TracedMCPServerStdio(MCPServerStdio):
+    """MCPServerStdio that propagates trace context to the server on every tool call."""
+
+    async def connect(self):
+        with tracing.span("mcp.spawn", tracing.CLIENT, {"mcp.server": self.name}):
+            await super().connect()
+
+    async def call_tool(self, tool_name, arguments):
+        if not self.session:
+            return await super().call_tool(tool_name, arguments)
+        with tracing.span(f"tools/call {tool_name}", tracing.CLIENT,
+                          {"mcp.tool.name": tool_name}) as span:
+            request = types.ClientRequest(types.CallToolRequest(
+                method="tools/call",
+                params=types.CallToolRequestParams(
+                    name=tool_name, arguments=arguments, _meta={"traceparent": span.traceparent},
+                ),
+            ))
+            result = await self.session.send_request(request, types.CallToolResult)
+            if result.isError:
+                span.set_error("tool returned isError")
+            return result
@@ -0,0 +1,195 @@
+"""
+Deterministic fast path for literal AWS commands.
+
+Commands like "stop instance i-0abc..." or "terminate i-0abc..." need no
+model to pick a tool. Router.from_tools() compiles one anchored pattern per
+MCP tool from its name and input schema:
+
+    stop_aws_ec2_instance(instance_id)       stop [ec2] instance i-...
+    terminate_aws_ec2_instances(instance_ids) terminate [ec2] instances i-..., i-...
+    initiate_s3_bucket_creation()             create [s3] bucket
+    list_lambda_functions()                   list [lambda] functions
+
+A tool gets a pattern only if its verb is known and every required argument
+has a value grammar (PARAM_GRAMMARS), so arguments are never guessed. The
+whole command must match: anything extra ("... with t3.large", "... if it
+is idle") goes to the model, as do commands that match more than one tool.
+
+Matchers are pluggable: any callable text -> [Route] can be added with
+Router.add(). stats() reports hits, fallbacks and the latency saved.
+
+    MCP_AGENT_FAST_PATH   0 to send every command to the model (default 1)
+"""
+import re
+import statistics
+from dataclasses import dataclass
+
+import config
+
+INSTANCE_ID = r"i-[0-9a-f]{8}(?:[0-9a-f]{9})?"
+_LIST_SEPARATOR = r"(?:\s*,\s*(?:and\s+)?|\s+and\s+|\s+)"
+
+# Argument name -> (regex for its value, converter from the matched text).
+PARAM_GRAMMARS = {
+    "instance_id": (INSTANCE_ID, str),
+    "instance_ids": (f"{INSTANCE_ID}(?:{_LIST_SEPARATOR}{INSTANCE_ID})*",
+                     lambda text: re.findall(INSTANCE_ID, text)),
+}
+
+# Verb in a tool name -> words a command may use for it.
+VERBS = {
+    "create": ("create", "make"),
+    "delete": ("delete", "remove"),
+    "start": ("start",),
+    "stop": ("stop",),
+    "terminate": ("terminate",),
+    "list": ("list",),
+    "describe": ("describe", "show"),
+}
+# initiate_s3_bucket_creation -> create; a bare initiate_* creates.
+NOMINALS = {"creation": "create", "deletion": "delete"}
+SILENT_TOKENS = {"aws"}
+
+_FILLER = r"(?:please\s+)?"
+_ARTICLE = r"(?:(?:the|an?|my)\s+)?"
+_ID_LEAD = r"(?:(?:with\s+)?(?:the\s+)?ids?\s+)?"
+
+
+@dataclass
+class Route:
+    tool: str
+    arguments: dict
+
+
+@dataclass
+class FastPathResult:
+    """What a fast-path command returns in place of the Agents SDK RunResult."""
+    tool: str
+    arguments: dict
+    final_output: str
+    is_error: bool
+    latency_ms: float
+
+
+def normalize(text):
+    return re.sub(r"\s+", " ", text.strip().rstrip(".!").lower())
+
+
+def _verb_and_nouns(tool_name):
+    tokens = [t for t in tool_name.lower().split("_") if t not in SILENT_TOKENS]
+    if tokens[0] == "initiate":
+        verb = NOMINALS.get(tokens[-1], "create")
+        nouns = tokens[1:-1] if tokens[-1] in NOMINALS else tokens[1:]
+    else:
+        verb, nouns = tokens[0], tokens[1:]
+    return verb, nouns
+
+
+def _noun_phrase(nouns):
+    """Every noun but the last is optional: "[ec2] instance", "[s3] bucket"."""
+    optional = "".join(rf"(?:{re.escape(noun)}\s+)?" for noun in nouns[:-1])
+    return rf"(?:aws\s+)?{optional}{re.escape(nouns[-1])}"
+
+
+class TemplateMatcher:
+    """Anchored patterns compiled from MCP tool schemas."""
+
+    def __init__(self, tools):
+        self.patterns = []
+        for tool in tools:
+            for pattern, params in self._templates(tool):
+                self.patterns.append((re.compile(pattern), tool.name, params))
+
+    def _templates(self, tool):
+        verb, nouns = _verb_and_nouns(tool.name)
+        if verb not in VERBS or not nouns:
+            return []
+        schema = tool.inputSchema or {}
+        properties = schema.get("properties", {})
+        if any(name not in PARAM_GRAMMARS for name in schema.get("required", [])):
+            return []
+        params = [name for name in properties if name in PARAM_GRAMMARS]
+        verbs = "|".join(re.escape(word) for word in VERBS[verb])
+        head = rf"^{_FILLER}(?:{verbs})\s+{_ARTICLE}"
+        noun = _noun_phrase(nouns)
+        if not params:
+            return [(rf"{head}{noun}$", [])]
+        if len(params) > 1:
+            return []
+        name = params[0]
+        value = rf"(?P<{name}>{PARAM_GRAMMARS[name][0]})"
+        if name == "instance_ids":
+            # A single bare ID belongs to the singular tool; the plural noun or a list picks this one.
+            two_or_more = rf"(?P<{name}>{INSTANCE_ID}(?:{_LIST_SEPARATOR}{INSTANCE_ID})+)"
+            return [(rf"{head}{noun}\s+{_ID_LEAD}{value}$", params),
+                    (rf"{head}{two_or_more}$", params)]
+        return [(rf"{head}(?:{noun}\s+)?{_ID_LEAD}{value}$", params)]
+
+    def __call__(self, text):
+        routes = []
+        for pattern, tool, params in self.patterns:
+            match = pattern.match(text)
+            if match:
+                arguments = {name: PARAM_GRAMMARS[name][1](match.group(name)) for name in params}
+                routes.append(Route(tool, arguments))
+        return routes
+
+
+class Router:
+    """Tries each matcher on a command; a single unambiguous route bypasses the model."""
+
+    def __init__(self, matchers=()):
+        self.matchers = list(matchers)
+        self.enabled = config.get_bool("MCP_AGENT_FAST_PATH", True)
+        self.hits = {}
+        self.fallbacks = 0
+        self.ambiguous = 0
+        self._fast_ms = []
+        self._model_ms = []
+
+    @classmethod
+    def from_tools(cls, tools):
+        return cls([TemplateMatcher(tools)])
+
+    def add(self, matcher):
+        self.matchers.append(matcher)
+
+    def match(self, command):
+        """The one Route for command, or None to fall back to the model."""
+        if not self.enabled:
+            return None
+        text = normalize(command)
+        routes = {route.tool: route for matcher in self.matchers for route in matcher(text)}
+        if len(routes) == 1:
+            return next(iter(routes.values()))
+        if routes:
+            self.ambiguous += 1
+        self.fallbacks += 1
+        return None
+
+    def record_fast_path(self, tool, elapsed_ms):
+        self.hits[tool] = self.hits.get(tool, 0) + 1
+        self._fast_ms.append(elapsed_ms)
+
+    def record_model(self, elapsed_ms):
+        self._model_ms.append(elapsed_ms)
+
+    def stats(self):
+        hits = sum(self.hits.values())
+        total = hits + self.fallbacks
+        stats = {
+            "commands": total,
+            "fast_path": hits,
+            "fallbacks": self.fallbacks,
+            "ambiguous": self.ambiguous,
+            "hit_rate": round(hits / total, 3) if total else None,
+            "by_tool": dict(self.hits),
+        }
+        if self._fast_ms:
+            stats["fast_path_p50_ms"] = round(statistics.median(self._fast_ms), 1)
+        if self._model_ms:
+            stats["model_p50_ms"] = round(statistics.median(self._model_ms), 1)
+        if self._fast_ms and self._model_ms:
+            saved = statistics.mean(self._model_ms) - statistics.mean(self._fast_ms)
+            stats["saved_ms_estimate"] = round(max(0.0, saved) * hits, 1)
+        return stats
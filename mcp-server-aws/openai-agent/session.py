@@ -0,0 +1,150 @@
+"""
+Long-lived agent session over one warm MCP server.
+
+The server is started once and its tool list is cached, so a query costs
+the model calls plus one ping, not an interpreter start, a `uv` resolve and
+an MCP handshake. If the server dies between queries, the liveness ping
+starts a new one and the query carries on. If it dies during a query, the
+query is not replayed, because some of its tool calls may already have run;
+a new server is started and the query fails with TurnInterrupted, leaving
+the caller to decide whether to send it again. Literal commands that the
+router (router.py) recognises call their tool directly, without the model.
+
+    MCP_AGENT_PING_TIMEOUT   seconds the liveness ping before each query may take (default 5)
+"""
+import asyncio
+import json
+import logging
+import time
+
+import anyio
+from agents import Agent, Runner, gen_trace_id
+
+import config
+from mcp_tracing import TracedMCPServerStdio, turn
+from router import FastPathResult, Router
+
+logger = logging.getLogger(__name__)
+
+# Raised by the MCP client streams when the server process has gone away.
+SERVER_GONE = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream,
+               BrokenPipeError, ConnectionResetError)
+
+
+def _server_gone(error):
+    """True if error, or anything in its cause chain, means the server connection is lost."""
+    while error is not None:
+        if isinstance(error, SERVER_GONE):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class TurnInterrupted(RuntimeError):
+    """The MCP server went away during a query, after which its tool calls may or may not have run."""
+
+
+def _tool_failed(result, text):
+    """True for an MCP error result or a tool result of {"ok": false, ...} (see ../results.py)."""
+    if result.isError:
+        return True
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return False
+    return isinstance(payload, dict) and not payload.get("ok", True)
+
+
+class AgentSession:
+    """An Agent bound to one MCP server connection that is reused for every query."""
+
+    def __init__(self, name, params, instructions, router=None):
+        self.name = name
+        self.params = params
+        self.instructions = instructions
+        self.router = router
+        self.server = None
+        self.agent = None
+        self.restarts = 0
+
+    async def connect(self):
+        self.server = TracedMCPServerStdio(name=self.name, params=self.params, cache_tools_list=True)
+        await self.server.connect()
+        self.agent = Agent(name="Assistant", instructions=self.instructions, mcp_servers=[self.server])
+        if self.router is None:
+            # Also fills the tool cache the Agent reads on its first run.
+            self.router = Router.from_tools(await self.server.list_tools())
+
+    async def reconnect(self):
+        logger.warning("MCP server '%s' is gone; starting a new one", self.name)
+        await self.close()
+        self.restarts += 1
+        await self.connect()
+
+    async def ensure_alive(self):
+        """Ping the server (one round trip) and restart it if it does not answer."""
+        if self.server is None:
+            await self.connect()
+            return
+        try:
+            await asyncio.wait_for(self.server.session.send_ping(),
+                                   config.get_float("MCP_AGENT_PING_TIMEOUT", 5.0))
+        except Exception:
+            await self.reconnect()
+
+    async def run(self, user_input, trace_id=None):
+        """
+        Run one query on a live server.
+
+        :return: the Agents SDK RunResult, or a FastPathResult if the router handled it
+        :raises TurnInterrupted: if the server died during the query (it is restarted for the next one)
+        """
+        with turn(trace_id or gen_trace_id(), user_input):
+            await self.ensure_alive()
+            route = self.router.match(user_input)
+            started = time.perf_counter()
+            if route is not None:
+                result = await self._interruptible(self.server.call_tool(route.tool, route.arguments))
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self.router.record_fast_path(route.tool, elapsed_ms)
+                text = "".join(getattr(part, "text", "") for part in result.content)
+                return FastPathResult(
+                    tool=route.tool,
+                    arguments=route.arguments,
+                    final_output=text,
+                    is_error=_tool_failed(result, text),
+                    latency_ms=round(elapsed_ms, 1),
+                )
+            result = await self._interruptible(Runner.run(starting_agent=self.agent, input=user_input))
+            self.router.record_model((time.perf_counter() - started) * 1000)
+            return result
+
+    async def _interruptible(self, call):
+        """
+        Await call, which may have side effects, so it is never retried.
+
+        If the server connection is lost, a new server is started for the next
+        query and TurnInterrupted is raised instead.
+        """
+        try:
+            return await call
+        except Exception as e:
+            if not _server_gone(e):
+                raise
+            error = e
+        try:
+            await self.reconnect()
+        except Exception as e:
+            logger.warning("Could not restart MCP server '%s': %s", self.name, e)
+        raise TurnInterrupted(
+            f"MCP server '{self.name}' exited during the command; some of its tool calls may "
+            "already have run. Check their effect before sending the command again."
+        ) from error
+
+    async def close(self):
+        if self.server is not None:
+            try:
+                await self.server.cleanup()
+            except Exception as e:
+                logger.debug("Error closing MCP server '%s': %s", self.name, e)
+            self.server = None
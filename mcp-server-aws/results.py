@@ -0,0 +1,66 @@
+"""
+Compact, structured results for the AWS tools.
+
+Tools return a small dict instead of an English sentence, so the agent
+gets the facts (IDs, states, timings) in a handful of tokens and can tell
+success from failure without parsing prose:
+
+    {"ok": true, "instance_id": "i-0abc", "previous_state": "running", "state": "shutting-down"}
+    {"ok": false, "error": "The instance ID 'i-0abc' does not exist", "code": "InvalidInstanceID.NotFound"}
+
+Fields that are None are dropped, and results go on the wire as compact
+JSON (FastMCP would otherwise pretty-print them with two-space indents).
+Progress and diagnostics go to the logger (stderr), never to stdout, which
+the stdio transport uses for the protocol itself.
+
+    MCP_AWS_LOG_LEVEL   log level for the server and helpers (default INFO)
+"""
+import json
+import logging
+import sys
+
+import config
+
+
+def _compact(fields):
+    return {name: value for name, value in fields.items() if value is not None}
+
+
+def success(**fields) -> dict:
+    """{"ok": true, ...fields} without None values."""
+    return {"ok": True, **_compact(fields)}
+
+
+def failure(error, **fields) -> dict:
+    """
+    {"ok": false, "error": ..., "code": ...} for a message or an exception.
+
+    For botocore ClientErrors the AWS error code and message are split out.
+    """
+    code = None
+    if isinstance(error, BaseException):
+        details = getattr(error, "response", {}).get("Error", {})
+        code = details.get("Code") or type(error).__name__
+        error = details.get("Message") or str(error)
+    return {"ok": False, "error": str(error), **_compact(dict(fields, code=code))}
+
+
+def succeeded(result) -> bool:
+    """True for a success() result (used as run_once's remember predicate)."""
+    return isinstance(result, dict) and result.get("ok", False)
+
+
+def to_text(result) -> str:
+    """result as compact JSON; strings pass through unchanged."""
+    if isinstance(result, str):
+        return result
+    return json.dumps(result, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def configure_logging():
+    """Send this process's logs to stderr; MCP_AWS_LOG_LEVEL sets the level (default INFO)."""
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=config.get("MCP_AWS_LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
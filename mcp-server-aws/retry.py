@@ -0,0 +1,195 @@
+"""
+Throttle-aware retries and client-side rate limiting for every pooled AWS client.
+
+install() registers two botocore event handlers on a client:
+
+    before-send   waits on a token bucket per (account, region, API) so
+                  concurrent tools share a request budget instead of
+                  stampeding the API; every attempt, retries included, pays
+    needs-retry   retries throttling, transient 5xx and connection errors
+                  with full-jitter exponential backoff; a throttle also
+                  halves that bucket's rate, which then recovers on success
+
+botocore's own retries are switched off for pooled clients (see
+client_pool.client_config) so there is exactly one retry policy. Retry
+counts and time spent throttled are available from stats().
+
+    AWS_MAX_ATTEMPTS      attempts per call, including the first (default 8)
+    AWS_RETRY_BASE_DELAY  backoff ceiling of the first retry, seconds (default 0.2)
+    AWS_RETRY_MAX_DELAY   backoff ceiling cap, seconds (default 20)
+    AWS_RATE_LIMIT        requests/s per (account, region, API) (default 20)
+    AWS_RATE_BURST        token bucket size (default 40)
+"""
+import random
+import threading
+import time
+
+import config
+
+THROTTLE_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+    "ProvisionedThroughputExceededException",
+    "BandwidthLimitExceeded",
+    "LimitExceededException",
+    "EC2ThrottledException",
+    "SlowDown",
+}
+
+TRANSIENT_CODES = {
+    "RequestTimeout",
+    "RequestTimeoutException",
+    "PriorRequestNotComplete",
+    "InternalError",
+    "InternalFailure",
+    "ServiceUnavailable",
+    "Unavailable",
+}
+
+TRANSIENT_STATUS = {500, 502, 503, 504}
+
+
+def _setting(name, default):
+    return config.get_float(name, float(default))
+
+
+class TokenBucket:
+    """Token bucket whose refill rate backs off on throttling (AIMD)."""
+
+    def __init__(self, rate: float, burst: float):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available; returns seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token now (possibly going negative) so waiters queue
+            # in order instead of racing for the next refill.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def throttled(self):
+        with self._lock:
+            self.rate = max(self.max_rate / 64, self.rate / 2)
+
+    def succeeded(self):
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+_lock = threading.Lock()
+_buckets = {}
+_stats = {
+    "attempts": 0,
+    "retries": 0,
+    "throttles": 0,
+    "throttled_seconds": 0.0,
+    "rate_limited_seconds": 0.0,
+    "gave_up": 0,
+}
+_by_operation = {}
+
+
+def _bucket(key):
+    bucket = _buckets.get(key)
+    if bucket is None:
+        with _lock:
+            bucket = _buckets.setdefault(
+                key, TokenBucket(_setting("AWS_RATE_LIMIT", "20"), _setting("AWS_RATE_BURST", "40"))
+            )
+    return bucket
+
+
+def _record(operation, **increments):
+    with _lock:
+        per_operation = _by_operation.setdefault(
+            operation, {"attempts": 0, "retries": 0, "throttles": 0}
+        )
+        for name, value in increments.items():
+            _stats[name] += value
+            if name in per_operation:
+                per_operation[name] += value
+
+
+def _error_code(response, caught_exception):
+    """(code, retryable, is_throttle) for one attempt."""
+    if caught_exception is not None:
+        # Connection resets, read timeouts and the like are worth retrying.
+        return type(caught_exception).__name__, True, False
+    if response is None:
+        return None, False, False
+    http_response, parsed = response
+    code = parsed.get("Error", {}).get("Code")
+    if code in THROTTLE_CODES or http_response.status_code == 429:
+        return code or "429", True, True
+    retryable = code in TRANSIENT_CODES or http_response.status_code in TRANSIENT_STATUS
+    return code, retryable, False
+
+
+def backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+    ceiling = min(
+        _setting("AWS_RETRY_MAX_DELAY", "20"),
+        _setting("AWS_RETRY_BASE_DELAY", "0.2") * 2 ** (attempt - 1),
+    )
+    return random.uniform(0, ceiling)
+
+
+def install(client, account: str = "default"):
+    """Attach rate limiting and retry handlers to a freshly created client."""
+    region = client.meta.region_name
+    service = client.meta.service_model.service_name
+
+    def before_send(request, event_name, **kwargs):
+        operation = event_name.rsplit(".", 1)[-1]
+        bucket = _bucket((account, region, service, operation))
+        waited = bucket.acquire()
+        _record(f"{service}.{operation}", attempts=1, rate_limited_seconds=waited)
+
+    def needs_retry(response, attempts, operation, caught_exception=None, **kwargs):
+        name = f"{service}.{operation.name}"
+        bucket = _bucket((account, region, service, operation.name))
+        code, retryable, is_throttle = _error_code(response, caught_exception)
+        if code is None:
+            bucket.succeeded()
+            return None
+        if is_throttle:
+            bucket.throttled()
+            _record(name, throttles=1)
+        if not retryable:
+            return None
+        if attempts >= int(_setting("AWS_MAX_ATTEMPTS", "8")):
+            _record(name, gave_up=1)
+            return None
+        delay = backoff(attempts)
+        _record(name, retries=1, throttled_seconds=delay if is_throttle else 0.0)
+        return delay
+
+    client.meta.events.register("before-send", before_send)
+    client.meta.events.register("needs-retry", needs_retry)
+
+
+def stats():
+    """Totals plus per-operation attempt/retry/throttle counters."""
+    with _lock:
+        totals = dict(_stats)
+        totals["by_operation"] = {op: dict(counts) for op, counts in _by_operation.items()}
+    totals["throttled_seconds"] = round(totals["throttled_seconds"], 3)
+    totals["rate_limited_seconds"] = round(totals["rate_limited_seconds"], 3)
+    return totals
@@ -0,0 +1,258 @@
+"""
+Parallel multipart S3 uploads and downloads for large artifacts.
+
+Local files are memory-mapped rather than read into Python buffers. Each part
+is a slice of the mapping, hashed and sent (or written) in place, and parts
+move in parallel on a thread pool sharing one pooled client.
+
+Every part carries a SHA-256 checksum. On upload, S3 rejects any part whose
+bytes do not match it. On download, objects uploaded with checksums are
+fetched part by part and each part is verified against the checksum S3 stored
+for it; a mismatching part is fetched again.
+
+    S3_TRANSFER_PART_SIZE_MB    part size (default 16, min 5; grown to stay within 10,000 parts)
+    S3_TRANSFER_CONCURRENCY     parts in flight per transfer (default 16)
+"""
+import base64
+import contextvars
+import hashlib
+import io
+import logging
+import mmap
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from client_pool import get_client
+import config
+
+logger = logging.getLogger(__name__)
+
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+_PART_ATTEMPTS = 3
+_CHUNK = 1024 * 1024
+
+
+class ChecksumMismatch(Exception):
+    pass
+
+
+class _PartReader(io.RawIOBase):
+    """Seekable file object over a memoryview, so botocore can stream and rewind a part."""
+
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), len(self._view) - self._pos)
+        buffer[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, min(len(self._view), base + offset))
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def __len__(self):
+        return len(self._view)
+
+
+def _sha256_b64(view):
+    return base64.b64encode(hashlib.sha256(view).digest()).decode()
+
+
+def part_size_for(size, part_size_mb=None):
+    """Part size in bytes: the requested size, at least 5 MiB, and large enough for <= 10,000 parts."""
+    part_size = int(float(part_size_mb or config.get_float("S3_TRANSFER_PART_SIZE_MB", 16.0)) * 1024 * 1024)
+    part_size = max(MIN_PART_SIZE, part_size)
+    return max(part_size, -(-size // MAX_PARTS))
+
+
+def _concurrency(concurrency):
+    return max(1, int(concurrency or config.get_int("S3_TRANSFER_CONCURRENCY", 16)))
+
+
+def _map_parts(concurrency, fn, parts):
+    with ThreadPoolExecutor(max_workers=min(concurrency, max(1, len(parts)))) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, fn, part) for part in parts]
+        return [future.result() for future in futures]
+
+
+def _summary(bucket, key, size, parts, started, **extra):
+    seconds = time.perf_counter() - started
+    return dict(
+        bucket=bucket,
+        key=key,
+        bytes=size,
+        parts=parts,
+        seconds=round(seconds, 3),
+        mb_per_s=round(size / 1024 / 1024 / seconds, 1) if seconds else None,
+        **extra,
+    )
+
+
+def upload_file(file_path, bucket, key, part_size_mb=None, concurrency=None, region=None):
+    """
+    Upload file_path to s3://bucket/key with parallel, checksummed multipart parts.
+
+    Files smaller than one part go up in a single put_object. A failed
+    multipart upload is aborted so no orphaned parts are left behind.
+
+    :return: dict with bytes, parts, seconds and mb_per_s
+    """
+    s3 = get_client("s3", region)
+    concurrency = _concurrency(concurrency)
+    size = os.path.getsize(file_path)
+    part_size = part_size_for(size, part_size_mb)
+    started = time.perf_counter()
+
+    if size == 0:
+        s3.put_object(Bucket=bucket, Key=key, Body=b"", ChecksumAlgorithm="SHA256")
+        return _summary(bucket, key, 0, 1, started, checksum="SHA256")
+
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            if size <= part_size:
+                s3.put_object(Bucket=bucket, Key=key, Body=_PartReader(view),
+                              ChecksumSHA256=_sha256_b64(view))
+                return _summary(bucket, key, size, 1, started, checksum="SHA256")
+
+            upload_id = s3.create_multipart_upload(
+                Bucket=bucket, Key=key, ChecksumAlgorithm="SHA256"
+            )["UploadId"]
+
+            def upload_part(number):
+                part = view[(number - 1) * part_size:number * part_size]
+                checksum = _sha256_b64(part)
+                try:
+                    response = s3.upload_part(
+                        Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number,
+                        Body=_PartReader(part), ChecksumSHA256=checksum,
+                    )
+                finally:
+                    part.release()
+                return {"PartNumber": number, "ETag": response["ETag"], "ChecksumSHA256": checksum}
+
+            try:
+                parts = _map_parts(concurrency, upload_part, range(1, -(-size // part_size) + 1))
+                s3.complete_multipart_upload(
+                    Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+                )
+            except BaseException:
+                try:
+                    s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+                except Exception as e:
+                    # Report the failure that stopped the upload, not this one.
+                    logger.warning("Could not abort multipart upload %s of s3://%s/%s: %s",
+                                   upload_id, bucket, key, e)
+                raise
+            return _summary(bucket, key, size, len(parts), started, checksum="SHA256")
+        finally:
+            view.release()
+
+
+def _fetch_into(s3, view, expected_checksum=None, **get_kwargs):
+    """Stream one get_object response into view, verifying its SHA-256 if S3 returned one."""
+    for attempt in range(1, _PART_ATTEMPTS + 1):
+        response = s3.get_object(**get_kwargs)
+        offset = 0
+        for chunk in response["Body"].iter_chunks(_CHUNK):
+            view[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+        if offset != len(view):
+            raise IOError(f"Expected {len(view)} bytes, got {offset}")
+        expected = expected_checksum or response.get("ChecksumSHA256")
+        # Composite (multipart) checksums end in "-<parts>" and cannot be checked per range.
+        if not expected or "-" in expected or _sha256_b64(view) == expected:
+            return bool(expected and "-" not in expected)
+        if attempt == _PART_ATTEMPTS:
+            raise ChecksumMismatch(f"SHA-256 mismatch for {get_kwargs} after {attempt} attempts")
+
+
+def download_file(bucket, key, file_path, part_size_mb=None, concurrency=None, region=None):
+    """
+    Download s3://bucket/key to file_path with parallel part GETs into a memory-mapped file.
+
+    Objects uploaded in parts with checksums are fetched by PartNumber and
+    every part is verified against its stored SHA-256. Other objects are
+    fetched in byte ranges of the configured part size; a single-part
+    object's SHA-256, if stored, is verified once at the end.
+
+    :return: dict with bytes, parts, seconds, mb_per_s and verified_parts
+    """
+    s3 = get_client("s3", region)
+    concurrency = _concurrency(concurrency)
+    started = time.perf_counter()
+    head = s3.head_object(Bucket=bucket, Key=key, PartNumber=1, ChecksumMode="ENABLED")
+    parts_count = head.get("PartsCount")
+    size = int(head["ContentRange"].rsplit("/", 1)[1]) if "ContentRange" in head \
+        else head["ContentLength"]
+
+    if parts_count and head.get("ChecksumSHA256"):
+        # Part sizes are uniform except the last, so part 1 gives the layout.
+        part_size = head["ContentLength"]
+        ranges = [(n, (n - 1) * part_size, min(n * part_size, size)) for n in range(1, parts_count + 1)]
+        by_part = True
+    else:
+        part_size = part_size_for(size, part_size_mb)
+        ranges = [(n, start, min(start + part_size, size))
+                  for n, start in enumerate(range(0, size, part_size), 1)]
+        by_part = False
+
+    tmp = f"{file_path}.part"
+    try:
+        verified = _download_into(s3, tmp, size, ranges, by_part, head, bucket, key, concurrency)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, file_path)
+    return _summary(bucket, key, size, len(ranges), started, verified_parts=verified)
+
+
+def _download_into(s3, tmp, size, ranges, by_part, head, bucket, key, concurrency):
+    with open(tmp, "wb+") as f:
+        f.truncate(size)
+        if size == 0:
+            verified = 0
+        else:
+            with mmap.mmap(f.fileno(), size) as mm:
+                view = memoryview(mm)
+
+                def fetch(item):
+                    number, start, end = item
+                    part = view[start:end]
+                    try:
+                        if by_part:
+                            return _fetch_into(s3, part, Bucket=bucket, Key=key,
+                                               PartNumber=number, ChecksumMode="ENABLED")
+                        return _fetch_into(s3, part, None, Bucket=bucket, Key=key,
+                                           Range=f"bytes={start}-{end - 1}")
+                    finally:
+                        part.release()
+
+                try:
+                    verified = sum(_map_parts(concurrency, fetch, ranges))
+                    # Range GETs carry no checksum; check the whole object instead.
+                    if not by_part and head.get("ChecksumSHA256") \
+                            and "-" not in head["ChecksumSHA256"]:
+                        if _sha256_b64(view) != head["ChecksumSHA256"]:
+                            raise ChecksumMismatch(f"SHA-256 mismatch for s3://{bucket}/{key}")
+                        verified = len(ranges)
+                    mm.flush()
+                finally:
+                    view.release()
+    return verified
@@ -0,0 +1,158 @@
+"""
+Consolidated AWS MCP server.
+
+One process serves every selected toolset (see toolsets/), so EC2, S3 and
+Lambda tools share a single boto3 import, client pool, inventory cache,
+retry budget and executor instead of each running in its own process.
+
+    uv run server.py                         # ec2, s3 and lambda over stdio
+    uv run server.py --toolsets ec2,lambda
+    MCP_AWS_TOOLSETS=s3 uv run server.py
+    uv run server.py --transport http --port 8080    # http://localhost:8080/mcp
+
+Over HTTP (streamable HTTP, or SSE on mcp releases that predate it) many
+agents share one warm process and its connection pools. Tool calls run on
+the per-service pools of executor.py, so the MCP_AWS_MAX_CONCURRENCY*
+limits apply across all sessions. Prometheus metrics (see metrics.py) are
+served at /metrics over HTTP, or on MCP_AWS_METRICS_PORT over stdio.
+
+    MCP_AWS_TRANSPORT            stdio or http (default stdio)
+    MCP_AWS_HTTP_HOST            bind address (default 127.0.0.1)
+    MCP_AWS_HTTP_PORT            port (default 8080)
+    MCP_AWS_HTTP_WORKERS         server processes (default 1; >1 implies stateless sessions)
+    MCP_AWS_HTTP_MAX_CONNECTIONS concurrent connections before answering 503 (default 0, unlimited)
+    MCP_AWS_HTTP_KEEPALIVE       idle keep-alive seconds (default 75, above common LB idle timeouts)
+    MCP_AWS_HTTP_DRAIN_TIMEOUT   seconds to let in-flight requests finish on shutdown (default 30)
+    MCP_AWS_HTTP_STATELESS       1 to keep no per-session state (any worker can answer any request)
+    MCP_AWS_HTTP_JSON_RESPONSE   1 to answer POSTs with plain JSON instead of an SSE stream
+
+aws.py, aws-ec2.py, aws1.py and aws_lambda.py remain as entry points for
+existing MCP client configs; they run this server with their old toolset.
+"""
+import argparse
+import logging
+import os
+
+from mcp.server.fastmcp import FastMCP
+import config
+import executor
+from lazy import prewarm
+import metrics
+from results import configure_logging
+import toolsets
+
+logger = logging.getLogger(__name__)
+
+
+def _http_settings():
+    """FastMCP settings for the HTTP transport, from the environment."""
+    settings = {}
+    if config.get_bool("MCP_AWS_HTTP_STATELESS") or config.get_int("MCP_AWS_HTTP_WORKERS", 1) > 1:
+        settings["stateless_http"] = True
+    if config.get_bool("MCP_AWS_HTTP_JSON_RESPONSE"):
+        settings["json_response"] = True
+    return settings
+
+
+def build_server(names=None, **settings):
+    """
+    FastMCP server with the named toolsets (default: MCP_AWS_TOOLSETS) registered.
+
+    :return: (server, loaded Toolset objects)
+    """
+    loaded = toolsets.load(names or toolsets.selected())
+    mcp = FastMCP("aws", **settings)
+    toolsets.register(mcp, loaded)
+    return mcp, loaded
+
+
+def create_http_app():
+    """
+    ASGI app serving the toolsets from MCP_AWS_TOOLSETS at /mcp, plus /healthz and /metrics.
+
+    A factory rather than a module-level app so every uvicorn worker process
+    builds its own server.
+    """
+    from starlette.responses import PlainTextResponse, Response
+
+    mcp, loaded = build_server(**_http_settings())
+    prewarm(*(helper for toolset in loaded for helper in toolset.helpers))
+    if hasattr(mcp, "streamable_http_app"):
+        app = mcp.streamable_http_app()
+    else:
+        # mcp releases before streamable HTTP only ship the SSE transport (/sse),
+        # whose sessions live in one process.
+        if config.get_int("MCP_AWS_HTTP_WORKERS", 1) > 1:
+            raise RuntimeError("Multiple HTTP workers need mcp>=1.8 (streamable HTTP, stateless mode).")
+        app = mcp.sse_app()
+
+    async def healthz(request):
+        return PlainTextResponse("ok")
+
+    async def metrics_endpoint(request):
+        return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+    app.add_route("/healthz", healthz, methods=["GET"])
+    app.add_route("/metrics", metrics_endpoint, methods=["GET"])
+    return app
+
+
+def serve_http(names, host=None, port=None, workers=None):
+    """Run the HTTP transport under uvicorn until SIGINT/SIGTERM, then drain."""
+    import uvicorn
+
+    workers = workers or config.get_int("MCP_AWS_HTTP_WORKERS", 1)
+    # Worker processes rebuild the server from the environment.
+    os.environ["MCP_AWS_TOOLSETS"] = ",".join(names)
+    os.environ["MCP_AWS_HTTP_WORKERS"] = str(workers)
+    # With one worker, create_http_app runs in this process and reads the snapshot.
+    config.reload()
+    max_connections = config.get_int("MCP_AWS_HTTP_MAX_CONNECTIONS", 0)
+
+    uvicorn.run(
+        "server:create_http_app",
+        factory=True,
+        host=host or config.get("MCP_AWS_HTTP_HOST", "127.0.0.1"),
+        port=port or config.get_int("MCP_AWS_HTTP_PORT", 8080),
+        workers=workers,
+        limit_concurrency=max_connections or None,
+        timeout_keep_alive=config.get_int("MCP_AWS_HTTP_KEEPALIVE", 75),
+        timeout_graceful_shutdown=config.get_int("MCP_AWS_HTTP_DRAIN_TIMEOUT", 30),
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+    )
+    # uvicorn has stopped accepting and drained requests; let running AWS calls finish.
+    executor.shutdown(wait=True)
+
+
+def main(default_toolsets=toolsets.DEFAULT, argv=None):
+    parser = argparse.ArgumentParser(description="AWS MCP server")
+    parser.add_argument(
+        "--toolsets",
+        help="comma-separated toolsets: ec2, s3, lambda, all, or a plugin module "
+             f"(default: MCP_AWS_TOOLSETS, else {','.join(default_toolsets)})",
+    )
+    parser.add_argument("--transport", choices=["stdio", "http"],
+                        default=config.get("MCP_AWS_TRANSPORT", "stdio"))
+    parser.add_argument("--host", help="HTTP bind address (default: MCP_AWS_HTTP_HOST or 127.0.0.1)")
+    parser.add_argument("--port", type=int, help="HTTP port (default: MCP_AWS_HTTP_PORT or 8080)")
+    parser.add_argument("--workers", type=int, help="HTTP worker processes (default: MCP_AWS_HTTP_WORKERS or 1)")
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    names = toolsets.selected(args.toolsets, default_toolsets)
+    if args.transport == "http":
+        logger.info("Starting FastMCP HTTP server with toolsets: %s", ", ".join(names))
+        serve_http(names, args.host, args.port, args.workers)
+        return
+
+    mcp, loaded = build_server(names)
+    metrics_port = config.get_int("MCP_AWS_METRICS_PORT", 0)
+    if metrics_port:
+        metrics.serve(metrics_port, config.get("MCP_AWS_METRICS_HOST", "127.0.0.1"))
+    logger.info("Starting FastMCP server with toolsets: %s", ", ".join(t.name for t in loaded))
+    prewarm(*(helper for toolset in loaded for helper in toolset.helpers))
+    mcp.run(transport='stdio')
+
+
+if __name__ == "__main__":
+    main()
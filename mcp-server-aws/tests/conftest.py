@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+# After ROOT_DIR: benchmarks/s3_transfer.py must not shadow the s3_transfer module.
+sys.path.append(os.path.join(ROOT_DIR, "benchmarks"))
+
+# No real credentials or .env: every AWS call is answered by benchmarks/aws_stub.py.
+os.environ.update(
+    MCP_AWS_ENV_FILE=os.path.join(ROOT_DIR, "tests", "missing.env"),
+    AWS_ACCESS_KEY_ID="testing",
+    AWS_SECRET_ACCESS_KEY="testing",
+    AWS_REGION="us-east-1",
+    AWS_DEFAULT_REGION="us-east-1",
+    MCP_AWS_PREWARM="0",
+    MCP_AWS_METRICS="0",
+)
+
+import config  # noqa: E402
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    """Set environment variables for one test and rebuild the config snapshot around it."""
+    def apply(**values):
+        for name, value in values.items():
+            monkeypatch.setenv(name, str(value))
+        config.reload()
+    yield apply
+    monkeypatch.undo()
+    config.reload()
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    """A FakeAWS answering every call made through client_pool, with no latency."""
+    import client_pool
+    from aws_stub import FakeAWS
+    import idempotency
+    from inventory import inventory
+
+    fake = FakeAWS(latency_ms=0)
+    client_pool.clear()
+    inventory._entries.clear()
+    idempotency._results.clear()
+    idempotency._auto_scopes.clear()
+    monkeypatch.setattr(client_pool, "_client_hooks", [*client_pool._client_hooks, fake.install])
+    yield fake
+    client_pool.clear()
+    inventory._entries.clear()
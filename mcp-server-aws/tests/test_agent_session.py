@@ -0,0 +1,97 @@
+import asyncio
+import json
+import os
+import sys
+
+import anyio
+import pytest
+from mcp import types
+
+from conftest import ROOT_DIR
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "openai-agent"))
+
+import batch  # noqa: E402
+from router import Router  # noqa: E402
+from session import AgentSession, TurnInterrupted  # noqa: E402
+
+STOP = types.Tool(name="stop_aws_ec2_instance", inputSchema={
+    "type": "object", "properties": {"instance_id": {"type": "string"}}, "required": ["instance_id"],
+})
+
+
+class FakeServer:
+    """Answers every tool call with a fixed JSON body, like the AWS MCP server."""
+
+    def __init__(self, body):
+        self.body = body
+        self.calls = []
+        self.session = self
+
+    async def send_ping(self):
+        pass
+
+    async def call_tool(self, tool, arguments):
+        self.calls.append((tool, arguments))
+        return types.CallToolResult(content=[types.TextContent(type="text", text=json.dumps(self.body))])
+
+    async def cleanup(self):
+        pass
+
+
+def _session(body):
+    session = AgentSession("test", params={}, instructions="", router=Router.from_tools([STOP]))
+    session.server = FakeServer(body)
+    return session
+
+
+FAILED = {"ok": False, "error": "The instance ID 'i-0123456789abcdef0' does not exist",
+          "code": "InvalidInstanceID.NotFound"}
+
+
+def test_failed_tool_result_is_an_error():
+    result = asyncio.run(_session(FAILED).run("stop instance i-0123456789abcdef0"))
+    assert result.tool == "stop_aws_ec2_instance"
+    assert result.is_error is True
+
+
+def test_successful_tool_result_is_not_an_error():
+    body = {"ok": True, "instance_id": "i-0123456789abcdef0", "state": "stopping"}
+    result = asyncio.run(_session(body).run("stop instance i-0123456789abcdef0"))
+    assert result.is_error is False
+
+
+def test_batch_records_failed_tool_as_error():
+    async def run():
+        queue = asyncio.Queue()
+        await queue.put((1, "stop instance i-0123456789abcdef0"))
+        await queue.put(None)
+        records = []
+        await batch._worker(_session(FAILED), queue, records.append, [])
+        return records
+
+    [record] = asyncio.run(run())
+    assert record["route"] == "fast"
+    assert record["status"] == "error"
+
+
+def test_server_death_mid_command_is_not_replayed():
+    class DyingServer(FakeServer):
+        async def call_tool(self, tool, arguments):
+            self.calls.append((tool, arguments))
+            raise anyio.ClosedResourceError()
+
+    session = _session(FAILED)
+    server = session.server = DyingServer(FAILED)
+    restarts = []
+
+    async def reconnect():
+        restarts.append(True)
+        session.server = FakeServer(FAILED)
+    session.reconnect = reconnect
+
+    with pytest.raises(TurnInterrupted):
+        asyncio.run(session.run("stop instance i-0123456789abcdef0"))
+    assert len(server.calls) == 1
+    assert restarts == [True]
+    assert session.server.calls == []
@@ -0,0 +1,26 @@
+import helper1
+import helper_ec2
+from inventory import inventory
+
+
+def _write_env(path, **values):
+    path.write_text("".join(f"{name}={value}\n" for name, value in values.items()))
+
+
+def test_edited_env_file_applies_without_a_restart(aws, settings, tmp_path):
+    env_file = tmp_path / ".env"
+    _write_env(env_file, EC2_FLEET_BATCH_SIZE=2, MCP_AWS_INVENTORY_TTL=5,
+               S3_EMPTY_CHECKPOINT_DIR=tmp_path / "before")
+    settings(MCP_AWS_ENV_FILE=env_file, MCP_AWS_CONFIG_CHECK_INTERVAL=0,
+             AMI_ID="ami-12c6146b", KEY_NAME="bench", SECURITY_GROUP_IDS="sg-01234567")
+
+    assert len(helper_ec2.create_ec2_fleet(4)["batches"]) == 2
+    assert inventory.ttl == 5
+    assert helper1._checkpoint_dir() == str(tmp_path / "before")
+
+    _write_env(env_file, EC2_FLEET_BATCH_SIZE=4, MCP_AWS_INVENTORY_TTL=120,
+               S3_EMPTY_CHECKPOINT_DIR=tmp_path / "after-edit")
+
+    assert len(helper_ec2.create_ec2_fleet(4)["batches"]) == 1
+    assert inventory.ttl == 120
+    assert helper1._checkpoint_dir() == str(tmp_path / "after-edit")
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+
+import helper_ec2
+import toolsets
+from toolsets import core
+
+
+def test_fanout_is_a_core_tool():
+    owners = {name: toolset.name for toolset in toolsets.load(["ec2"]) for name in toolset.tool_names}
+
+    assert owners["aws_fanout_action"] == "core"
+
+
+def test_fanout_create_names_the_bucket_region(aws):
+    result = asyncio.run(core.aws_fanout_action(
+        "s3", "create", regions=["eu-west-1"], params={"BucketName": "fanout-eu"}))
+
+    assert result["ok"], result
+    assert aws.bucket_regions["fanout-eu"] == "eu-west-1"
+
+
+def test_fanout_create_in_us_east_1_omits_the_region(aws):
+    result = asyncio.run(core.aws_fanout_action(
+        "s3", "create", regions=["us-east-1"], params={"BucketName": "fanout-us"}))
+
+    assert result["ok"], result
+    assert aws.bucket_regions["fanout-us"] is None
+
+
+def test_fanout_returns_finished_targets_at_the_tool_timeout(aws, settings, monkeypatch):
+    settings(MCP_AWS_TOOL_TIMEOUT="0.5")
+    release = threading.Event()
+    target = helper_ec2._fanout_target
+
+    def slow_in_eu(service, action, region, role_arn, kwargs):
+        if region == "eu-west-1":
+            release.wait(10)
+        return target(service, action, region, role_arn, kwargs)
+
+    monkeypatch.setattr(helper_ec2, "_fanout_target", slow_in_eu)
+    try:
+        result = asyncio.run(core.aws_fanout_action(
+            "s3", "create", regions=["us-east-1", "eu-west-1"], params={"BucketName": "fanout-slow"}))
+    finally:
+        release.set()
+
+    assert not result["ok"]
+    assert result["timed_out"] == 1
+    assert [r["region"] for r in result["results"]] == ["us-east-1"]
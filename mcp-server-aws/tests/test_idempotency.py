@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from toolsets import ec2
+
+
+@pytest.fixture
+def ec2_settings(settings):
+    settings(AMI_ID="ami-12c6146b", KEY_NAME="bench", SECURITY_GROUP_IDS="sg-01234567")
+
+
+def test_identical_create_is_marked_replayed(aws, ec2_settings):
+    first = asyncio.run(ec2.initiate_aws_ec2_instance())
+    second = asyncio.run(ec2.initiate_aws_ec2_instance())
+
+    assert first["ok"] and "replayed" not in first
+    assert second["replayed"] is True
+    assert second["instance_id"] == first["instance_id"]
+    assert len(aws.instances) == 1
+
+
+def test_new_idempotency_key_creates_another_instance(aws, ec2_settings):
+    first = asyncio.run(ec2.initiate_aws_ec2_instance(idempotency_key="first"))
+    second = asyncio.run(ec2.initiate_aws_ec2_instance(idempotency_key="second"))
+
+    assert "replayed" not in second
+    assert second["instance_id"] != first["instance_id"]
+    assert len(aws.instances) == 2
+
+
+def test_keyless_retries_share_a_key_while_the_window_slides(monkeypatch, settings):
+    import idempotency
+
+    settings(MCP_AWS_IDEMPOTENCY_WINDOW=600)
+    clock = [1000.0]
+    monkeypatch.setattr(idempotency.time, "monotonic", lambda: clock[0])
+    idempotency._auto_scopes.clear()
+
+    keys = []
+    for _ in range(4):
+        keys.append(idempotency.derive_key("ec2.RunInstances", {"ImageId": "ami-1"}))
+        clock[0] += 500  # each retry is inside the window, the run as a whole is not
+    assert len(set(keys)) == 1
+
+    clock[0] += 601
+    assert idempotency.derive_key("ec2.RunInstances", {"ImageId": "ami-1"}) != keys[0]
+
+
+def test_fanout_bucket_create_is_deduplicated(aws):
+    import helper_ec2
+
+    first = helper_ec2.perform_aws_action("s3", "create", BucketName="fanout-bucket")
+    second = helper_ec2.perform_aws_action("s3", "create", BucketName="fanout-bucket")
+
+    assert first == {"ok": True, "bucket": "fanout-bucket"}
+    assert second["replayed"] is True
@@ -0,0 +1,51 @@
+import logging
+
+import helper_lambda
+
+
+def _zip(path, size):
+    with open(path, "wb") as f:
+        f.truncate(size)
+    return str(path)
+
+
+def test_oversized_zip_without_staging_bucket_fails_up_front(aws, tmp_path, monkeypatch):
+    zip_path = _zip(tmp_path / "big.zip", helper_lambda.DIRECT_UPLOAD_LIMIT + 1)
+    read = []
+    monkeypatch.setattr(helper_lambda, "code_sha256", lambda path: read.append(path))
+
+    result = helper_lambda.deploy_lambda_function("big-fn", zip_path)
+
+    assert result["ok"] is False
+    assert result["action"] == "failed"
+    assert result["code"] == "PackageTooLarge"
+    assert "LAMBDA_STAGING_BUCKET" in result["error"]
+    assert read == [] and aws.functions == {}
+
+
+def test_inline_fallback_over_the_staging_threshold_warns(aws, settings, tmp_path, caplog):
+    settings(LAMBDA_ROLE_ARN="arn:aws:iam::123456789012:role/lambda-execution-role",
+             LAMBDA_INLINE_ZIP_LIMIT="1024")
+    zip_path = _zip(tmp_path / "medium.zip", 4096)
+
+    with caplog.at_level(logging.WARNING, logger="helper_lambda"):
+        result = helper_lambda.deploy_lambda_function("medium-fn", zip_path)
+
+    assert result["ok"] is True and result["action"] == "created"
+    assert "LAMBDA_STAGING_BUCKET is not set" in caplog.text
+
+
+def test_spec_without_a_name_fails_alone(aws, settings, tmp_path):
+    settings(LAMBDA_ROLE_ARN="arn:aws:iam::123456789012:role/lambda-execution-role")
+    zip_path = _zip(tmp_path / "fn.zip", 128)
+
+    result = helper_lambda.deploy_lambda_functions([
+        {"function_name": "good-fn", "zip_path": zip_path},
+        {"zip_path": zip_path},
+    ])
+
+    assert result["ok"] is False
+    assert result["created"] == 1 and result["failed"] == 1
+    assert result["results"][1]["index"] == 1
+    assert "function_name" in result["results"][1]["error"]
+    assert list(aws.functions) == ["good-fn"]
@@ -0,0 +1,93 @@
+import os
+import zipfile
+
+import pytest
+
+import lambda_packager
+
+
+@pytest.fixture
+def cache(tmp_path, settings):
+    settings(LAMBDA_BUILD_CACHE=tmp_path / "cache")
+    return tmp_path
+
+
+def _source(root, body):
+    root.mkdir(parents=True)
+    (root / "lambda_function.py").write_text(body)
+    return str(root)
+
+
+def _code(zip_path):
+    with zipfile.ZipFile(zip_path) as package:
+        return package.read("lambda_function.py").decode()
+
+
+def test_same_basename_sources_do_not_share_a_zip(cache):
+    a = _source(cache / "a" / "src", "A = 1\n")
+    b = _source(cache / "b" / "src", "B = 2\n")
+
+    first = lambda_packager.build_package(a)
+    second = lambda_packager.build_package(b)
+    third = lambda_packager.build_package(a)
+
+    assert first["zip_path"] != second["zip_path"]
+    assert _code(second["zip_path"]) == "B = 2\n"
+    assert third["rebuilt"] is False
+    assert third["zip_path"] == first["zip_path"]
+    assert _code(third["zip_path"]) == "A = 1\n"
+
+
+def test_shared_output_is_rebuilt_after_another_build(cache):
+    a = _source(cache / "a" / "src", "A = 1\n")
+    b = _source(cache / "b" / "src", "B = 2\n")
+    output = str(cache / "function.zip")
+
+    lambda_packager.build_package(a, output=output)
+    lambda_packager.build_package(b, output=output)
+    again = lambda_packager.build_package(a, output=output)
+
+    assert again["rebuilt"] is True
+    assert _code(output) == "A = 1\n"
+
+
+def test_concurrent_builds_share_one_dependency_install(cache, monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    requirements = cache / "requirements.txt"
+    requirements.write_text("requests==2.32.3\n")
+    sources = [_source(cache / name / "src", f"{name.upper()} = 1\n") for name in ("a", "b")]
+    both_installed = threading.Barrier(2)
+
+    def fake_pip(command, check):
+        # Stands in for pip: both builds finish installing before either moves its copy into place.
+        target = command[command.index("--target") + 1]
+        os.makedirs(os.path.join(target, "requests"))
+        with open(os.path.join(target, "requests", "__init__.py"), "w") as f:
+            f.write("VERSION = '2.32.3'\n")
+        both_installed.wait(timeout=10)
+
+    monkeypatch.setattr(lambda_packager.subprocess, "run", fake_pip)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        builds = list(pool.map(lambda source: lambda_packager.build_package(source, str(requirements)),
+                               sources))
+
+    assert sorted(build["deps_cached"] for build in builds) == [False, True]
+    for build in builds:
+        with zipfile.ZipFile(build["zip_path"]) as package:
+            assert "requests/__init__.py" in package.namelist()
+    assert len(os.listdir(cache / "cache" / "deps")) == 1
+
+
+def test_concurrent_builds_of_one_source_do_not_collide(cache):
+    from concurrent.futures import ThreadPoolExecutor
+
+    source = _source(cache / "a" / "src", "A = 1\n")
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        builds = list(pool.map(lambda _: lambda_packager.build_package(source), range(8)))
+
+    assert len({build["content_hash"] for build in builds}) == 1
+    assert _code(builds[0]["zip_path"]) == "A = 1\n"
+    leftovers = [name for name in os.listdir(cache / "cache" / "builds") if not name.endswith(".zip")]
+    assert leftovers == []
@@ -0,0 +1,40 @@
+import asyncio
+
+from toolsets import ec2, s3
+
+
+def test_bad_cursor_is_a_failure_result(aws):
+    result = asyncio.run(ec2.list_aws_ec2_instances(cursor="not-a-cursor"))
+    assert result == {"ok": False, "error": "Cursor is not valid.", "code": "InvalidCursor"}
+
+
+def test_cursor_from_another_listing_is_a_failure_result(aws, settings):
+    settings(S3_BUCKET_NAME="bench-bucket")
+    aws.seed_bucket("bench-bucket", 3)
+    page = asyncio.run(s3.list_s3_objects(page_size=2))
+    assert page["ok"] and page["count"] == 2
+
+    result = asyncio.run(ec2.list_aws_ec2_instances(cursor=page["next_cursor"]))
+    assert result["ok"] is False
+    assert result["code"] == "InvalidCursor"
+
+
+def test_bad_group_by_is_a_failure_result(aws):
+    result = asyncio.run(ec2.aggregate_aws_ec2_instances(group_by="colour"))
+    assert result["ok"] is False
+    assert result["code"] == "ValueError"
+    assert "group_by" in result["error"]
+
+
+def test_aws_errors_are_failure_results(aws):
+    result = asyncio.run(s3.list_s3_objects(bucket="missing-bucket"))
+    assert result["ok"] is False
+    assert result["code"] == "NoSuchBucket"
+    assert result["bucket"] == "missing-bucket"
+
+
+def test_inventory_listing_is_a_success_result(aws):
+    aws.seed_bucket("bench-bucket", 0)
+    result = asyncio.run(s3.list_s3_buckets(refresh=True))
+    assert result["ok"] is True
+    assert [bucket["name"] for bucket in result["buckets"]] == ["bench-bucket"]
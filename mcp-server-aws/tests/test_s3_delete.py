@@ -0,0 +1,75 @@
+import asyncio
+
+import helper1
+from toolsets import s3
+
+
+class RecordingContext:
+    def __init__(self):
+        self.progress = []
+        self.messages = []
+
+    async def report_progress(self, progress, total=None):
+        self.progress.append((progress, total))
+
+    async def info(self, message):
+        self.messages.append(message)
+
+
+def test_force_delete_reports_every_batch_and_completion(aws, settings, tmp_path):
+    settings(S3_BUCKET_NAME="bench-bucket", S3_EMPTY_CHECKPOINT_DIR=str(tmp_path))
+    aws.seed_bucket("bench-bucket", 2500)
+    ctx = RecordingContext()
+
+    result = asyncio.run(s3.initiate_s3_bucket_deletion(force=True, ctx=ctx))
+
+    assert result["ok"] is True and result["deleted_objects"] == 2500
+    # One event per delete_objects batch of 1,000 keys, then the final 100%.
+    assert len(ctx.messages) == 3
+    assert max(progress for progress, _ in ctx.progress[:-1]) == 2500
+    assert ctx.progress[-1] == (2500, 2500)
+
+
+def test_checkpoint_is_written_by_one_writer_not_per_batch(aws, settings, tmp_path, monkeypatch):
+    settings(S3_EMPTY_CHECKPOINT_DIR=str(tmp_path), S3_EMPTY_CHECKPOINT_INTERVAL="60")
+    aws.seed_bucket("bench-bucket", 2500)
+    saved = []
+    monkeypatch.setattr(helper1, "_save_checkpoint", lambda bucket, state: saved.append(state))
+
+    result = helper1.empty_s3_bucket("bench-bucket")
+
+    assert result["deleted"] == 2500
+    # Three batches, but only the final write: the interval never elapsed.
+    assert saved == [{"deleted": 2500, "runs": 1, "start_after": "bench/object-0002499"}]
+
+
+def test_rerun_lists_after_the_checkpointed_key(aws, settings, tmp_path):
+    settings(S3_EMPTY_CHECKPOINT_DIR=str(tmp_path))
+    aws.seed_bucket("bench-bucket", 2500)
+    helper1._save_checkpoint("bench-bucket", {"deleted": 1000, "runs": 1,
+                                              "start_after": "bench/object-0000999"})
+
+    result = helper1.empty_s3_bucket("bench-bucket")
+
+    assert result["deleted"] == 2500 and result["runs"] == 2
+    # Keys up to the checkpoint are taken as gone and not listed again.
+    assert len(aws.buckets["bench-bucket"]) == 1000
+    assert max(aws.buckets["bench-bucket"]) == "bench/object-0000999"
+
+
+def test_a_failed_batch_holds_the_resume_point(aws, settings, tmp_path, monkeypatch):
+    settings(S3_EMPTY_CHECKPOINT_DIR=str(tmp_path), S3_EMPTY_MAX_WORKERS="1")
+    aws.seed_bucket("bench-bucket", 2500)
+    delete_objects = aws._s3_DeleteObjects
+
+    def fail_second_batch(Bucket, Delete, **params):
+        if Delete["Objects"][0]["Key"] == "bench/object-0001000":
+            return {"Errors": [{"Key": "bench/object-0001000", "Code": "AccessDenied"}]}
+        return delete_objects(Bucket, Delete, **params)
+
+    monkeypatch.setattr(aws, "_s3_DeleteObjects", fail_second_batch)
+
+    result = helper1.empty_s3_bucket("bench-bucket")
+
+    assert result["failed"] == 1
+    assert helper1._load_checkpoint("bench-bucket")["start_after"] == "bench/object-0000999"
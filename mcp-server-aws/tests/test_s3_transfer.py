@@ -0,0 +1,29 @@
+import logging
+
+import pytest
+from aws_stub import StubError
+from botocore.exceptions import ClientError
+
+import s3_transfer
+
+
+def test_failed_abort_does_not_mask_the_upload_error(aws, tmp_path, caplog):
+    path = tmp_path / "artifact.bin"
+    path.write_bytes(b"x" * (6 * 1024 * 1024))
+    aws.buckets["bench-bucket"] = {}
+
+    def upload_part(**params):
+        raise StubError(500, "InternalError", "part failed")
+
+    def abort(**params):
+        raise StubError(403, "AccessDenied", "abort denied")
+
+    aws._s3_CreateMultipartUpload = lambda **params: {"UploadId": "upload-1"}
+    aws._s3_UploadPart = upload_part
+    aws._s3_AbortMultipartUpload = abort
+
+    with caplog.at_level(logging.WARNING, logger="s3_transfer"), pytest.raises(ClientError) as raised:
+        s3_transfer.upload_file(str(path), "bench-bucket", "artifact.bin", part_size_mb=5, concurrency=2)
+
+    assert raised.value.response["Error"]["Code"] == "InternalError"
+    assert "Could not abort multipart upload upload-1" in caplog.text
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+import helper1
+
+
+@pytest.fixture
+def transfer_dir(tmp_path, settings):
+    root = tmp_path / "transfers"
+    root.mkdir()
+    settings(MCP_AWS_TRANSFER_DIR=root, S3_BUCKET_NAME="bench-bucket")
+    return root
+
+
+@pytest.mark.parametrize("path", ["../secret.txt", "sub/../../secret.txt", "/etc/passwd"])
+def test_paths_outside_the_transfer_dir_are_rejected(aws, transfer_dir, path):
+    (transfer_dir.parent / "secret.txt").write_text("secret")
+
+    upload = helper1.upload_s3_object(path, key="stolen")
+    download = helper1.download_s3_object("object", file_path=path)
+
+    for result in (upload, download):
+        assert result["ok"] is False
+        assert result["code"] == "TransferPathError"
+    assert (transfer_dir.parent / "secret.txt").read_text() == "secret"
+
+
+def test_symlink_out_of_the_transfer_dir_is_rejected(aws, transfer_dir):
+    os.symlink(transfer_dir.parent, transfer_dir / "escape")
+    result = helper1.upload_s3_object("escape/secret.txt")
+    assert result["code"] == "TransferPathError"
+
+
+def test_download_key_cannot_pick_a_path_outside(aws, transfer_dir):
+    result = helper1.download_s3_object("..")
+    assert result["code"] == "TransferPathError"
+
+
+def test_relative_paths_resolve_inside_the_transfer_dir(transfer_dir):
+    assert helper1.transfer_path("builds/app.zip") == os.path.realpath(transfer_dir / "builds" / "app.zip")
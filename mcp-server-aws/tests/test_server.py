@@ -0,0 +1,78 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+from mcp import ClientSession
+
+from conftest import ROOT_DIR
+
+try:
+    from mcp.client.streamable_http import streamablehttp_client
+except ImportError:  # mcp releases before streamable HTTP
+    streamablehttp_client = None
+    from mcp.client.sse import sse_client
+
+import toolsets
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_healthy(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("HTTP server did not become healthy")
+
+
+async def _list_tools(port):
+    if streamablehttp_client is not None:
+        transport = streamablehttp_client(f"http://127.0.0.1:{port}/mcp")
+    else:
+        transport = sse_client(f"http://127.0.0.1:{port}/sse")
+    async with transport as streams:
+        async with ClientSession(*streams[:2]) as session:
+            await session.initialize()
+            return {tool.name for tool in (await session.list_tools()).tools}
+
+
+def _http_tools(script, *args):
+    port = _free_port()
+    env = {key: value for key, value in os.environ.items() if key != "MCP_AWS_TOOLSETS"}
+    env["MCP_AWS_HTTP_DRAIN_TIMEOUT"] = "1"
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT_DIR, script), "--transport", "http", "--port", str(port), *args],
+        cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_healthy(port, process)
+        return asyncio.run(_list_tools(port))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def _expected(*names):
+    return {tool for toolset in toolsets.load(names) for tool in toolset.tool_names}
+
+
+@pytest.mark.parametrize("script, args, names", [
+    ("server.py", ["--toolsets", "s3"], ["s3"]),
+    ("aws-ec2.py", [], ["ec2"]),
+])
+def test_http_serves_only_selected_toolsets(script, args, names):
+    assert _http_tools(script, *args) == _expected(*names)
@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT_DIR
+
+# Builds the server in a fresh interpreter, runs argv[2] and prints the AWS SDK modules imported.
+PROBE = """
+import json, sys
+import server
+server.build_server(sys.argv[1].split(","))
+exec(sys.argv[2])
+print(json.dumps(sorted(m for m in sys.modules if m.partition(".")[0] in ("boto3", "botocore"))))
+"""
+
+
+def _sdk_modules_after_build(toolsets, then="", **env):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, toolsets, then],
+        cwd=ROOT_DIR, env=dict(os.environ, **env), capture_output=True, text=True, timeout=60, check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize("toolsets", ["ec2", "s3", "lambda", "all"])
+def test_build_server_does_not_import_boto3(toolsets):
+    assert _sdk_modules_after_build(toolsets, MCP_AWS_LAZY_IMPORTS="1", MCP_AWS_PREWARM="0") == []
+
+
+def test_first_client_imports_boto3():
+    # Guards the probe itself: boto3 must show up once a client is made.
+    modules = _sdk_modules_after_build("ec2", "import client_pool; client_pool.get_client('ec2')")
+    assert "boto3" in modules
@@ -0,0 +1,29 @@
+import asyncio
+
+import helper_ec2
+import waiters
+
+
+def test_unknown_id_fails_after_one_grace_poll(aws, settings, monkeypatch):
+    settings(EC2_WAIT_MIN_INTERVAL="0", EC2_WAIT_MAX_INTERVAL="0")
+    monkeypatch.setattr(helper_ec2, "describe_instance_states",
+                        lambda ids, region=None: {"i-0000000000000000a": "running"})
+
+    result = asyncio.run(waiters.wait_for_instances(
+        ["i-0000000000000000a", "i-00000000000000bad"], timeout=60))
+
+    assert result["settled"] == {"i-0000000000000000a": "running"}
+    assert result["failed"] == {"i-00000000000000bad": "InvalidInstanceID.NotFound"}
+    assert result["timed_out"] == {}
+    assert result["polls"] == 2
+
+
+def test_id_that_shows_up_on_the_grace_poll_is_waited_for(aws, settings, monkeypatch):
+    settings(EC2_WAIT_MIN_INTERVAL="0", EC2_WAIT_MAX_INTERVAL="0")
+    polls = iter([{}, {"i-0000000000000000a": "pending"}, {}, {"i-0000000000000000a": "running"}])
+    monkeypatch.setattr(helper_ec2, "describe_instance_states", lambda ids, region=None: next(polls))
+
+    result = asyncio.run(waiters.wait_for_instances(["i-0000000000000000a"], timeout=60))
+
+    assert result["settled"] == {"i-0000000000000000a": "running"}
+    assert result["failed"] == {}
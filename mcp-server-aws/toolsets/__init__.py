@@ -0,0 +1,120 @@
+"""
+Service toolsets for the consolidated AWS MCP server (server.py).
+
+A toolset is a module that defines `toolset = Toolset(...)` and declares its
+tools with @toolset.tool(), exactly like FastMCP's @mcp.tool(). Only the
+selected toolsets are imported and registered, and their helper modules stay
+lazy until the first tool call, so an unused service costs nothing.
+
+Built-in toolsets are "ec2", "s3" and "lambda"; "core" (cache and retry
+stats) is always loaded. A plugin toolset can be named by its dotted module
+path, or published by another package under the "mcp_aws.toolsets" entry
+point group.
+
+    MCP_AWS_TOOLSETS   comma-separated toolsets to load (default ec2,s3,lambda; "all" for every built-in)
+"""
+import functools
+import importlib
+from importlib.metadata import entry_points
+
+import config
+import metrics
+from results import to_text
+import tracing
+
+BUILTIN = {
+    "core": "toolsets.core",
+    "ec2": "toolsets.ec2",
+    "s3": "toolsets.s3",
+    "lambda": "toolsets.lambda_functions",
+}
+DEFAULT = ("ec2", "s3", "lambda")
+ENTRY_POINT_GROUP = "mcp_aws.toolsets"
+
+
+class Toolset:
+    """A named group of MCP tools, registered on a server on demand."""
+
+    def __init__(self, name: str, helpers=()):
+        self.name = name
+        # Lazy helper modules, handed to lazy.prewarm() by the server.
+        self.helpers = tuple(helpers)
+        self._tools = []
+
+    def tool(self, **kwargs):
+        """Decorator mirroring FastMCP.tool(); kwargs are passed to add_tool()."""
+        def decorator(fn):
+            self._tools.append((fn, kwargs))
+            return fn
+        return decorator
+
+    @property
+    def tool_names(self):
+        return [kwargs.get("name", fn.__name__) for fn, kwargs in self._tools]
+
+    def register(self, mcp):
+        measure, trace = metrics.enabled(), tracing.enabled()
+        for fn, kwargs in self._tools:
+            name = kwargs.get("name", fn.__name__)
+            if trace:
+                fn = tracing.instrument(name, fn)
+            if measure:
+                fn = metrics.instrument(name, fn)
+            mcp.add_tool(_compact(fn), **kwargs)
+
+
+def _compact(fn):
+    """Wrap an async tool so its result is sent as compact JSON text."""
+    @functools.wraps(fn)
+    async def tool(*args, **kwargs):
+        return to_text(await fn(*args, **kwargs))
+    return tool
+
+
+def selected(value: str = None, default=DEFAULT):
+    """Toolset names from value, else MCP_AWS_TOOLSETS, else default."""
+    if value:
+        return [name.strip() for name in value.split(",") if name.strip()]
+    return config.get_list("MCP_AWS_TOOLSETS") or list(default)
+
+
+def _module_for(name):
+    if name in BUILTIN:
+        return importlib.import_module(BUILTIN[name])
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        if entry_point.name == name:
+            return entry_point.load()
+    if "." in name:
+        return importlib.import_module(name)
+    raise ValueError(
+        f"Unknown toolset '{name}'. Built-in toolsets: {', '.join(n for n in BUILTIN if n != 'core')}."
+    )
+
+
+def load(names):
+    """Import the named toolsets (plus core) and return their Toolset objects."""
+    expanded = ["core"]
+    for name in names:
+        expanded += [n for n in BUILTIN if n != "core"] if name == "all" else [name]
+    toolsets = []
+    for name in dict.fromkeys(expanded):
+        module = _module_for(name)
+        toolset = getattr(module, "toolset", None)
+        if not isinstance(toolset, Toolset):
+            raise ValueError(f"Toolset module '{module.__name__}' does not define `toolset`.")
+        toolsets.append(toolset)
+    return toolsets
+
+
+def register(mcp, toolsets):
+    """Register every tool, refusing two toolsets that define the same tool name."""
+    owners = {}
+    for toolset in toolsets:
+        for tool_name in toolset.tool_names:
+            if tool_name in owners:
+                raise ValueError(
+                    f"Tool '{tool_name}' is defined by both '{owners[tool_name]}' and '{toolset.name}'."
+                )
+            owners[tool_name] = toolset.name
+        toolset.register(mcp)
+    return owners
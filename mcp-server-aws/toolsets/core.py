@@ -0,0 +1,100 @@
+"""
+Tools shared by every service: cache and retry statistics, and multi-region fan-out.
+
+aws_fanout_action covers EC2, S3 and Lambda alike, so it lives here rather
+than in a service toolset. It runs on its own "fanout" executor pool, so a
+long fan-out never holds the EC2 pool's threads, and stops waiting after
+MCP_AWS_TOOL_TIMEOUT like any other tool call.
+"""
+import asyncio
+import json
+
+from mcp.server.fastmcp import Context
+from executor import default_timeout, run_blocking
+from inventory import inventory
+from lazy import lazy_import
+from results import failure
+import retry
+from toolsets import Toolset
+
+# perform_aws_action and the fan-out live in helper_ec2; loaded on the first call.
+helper_ec2 = lazy_import("helper_ec2")
+
+toolset = Toolset("core")
+
+
+@toolset.tool()
+async def inventory_cache_stats():
+    """Returns inventory cache hit/miss counters and the AWS API calls it saved."""
+    return inventory.stats()
+
+
+@toolset.tool()
+async def aws_retry_stats():
+    """Returns AWS API attempt, retry and throttling counters for this server."""
+    return retry.stats()
+
+
+@toolset.tool()
+async def aws_fanout_action(
+    service: str,
+    action: str,
+    regions: list[str] | None = None,
+    role_arns: list[str] | None = None,
+    params: dict | None = None,
+    ctx: Context = None,
+):
+    """
+    Runs one AWS action (same as perform_aws_action) across many regions and accounts at once.
+
+    Every region is combined with every role in role_arns (omit role_arns for
+    the default account). Each target's result is streamed as a log message
+    as soon as it finishes; the final response merges all targets with their
+    latency and error reported separately. Targets still running when the
+    tool timeout passes are reported as timed_out.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    total = len(helper_ec2.fanout_targets(regions, role_arns))
+
+    def produce():
+        try:
+            for item in helper_ec2.iter_aws_action_fanout(
+                service, action, regions, role_arns, **(params or {})
+            ):
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    # The producer thread is not awaited: on timeout the tool answers with what
+    # it has, and the targets already started finish in the background.
+    asyncio.ensure_future(run_blocking("fanout", produce, timeout=None))
+    results = []
+    timed_out = False
+    try:
+        async with asyncio.timeout(default_timeout()):
+            while (item := await queue.get()) is not None:
+                if isinstance(item, Exception):
+                    return failure(item, service=service, action=action)
+                results.append(item)
+                if ctx is not None:
+                    await ctx.report_progress(len(results), total)
+                    await ctx.info(json.dumps(item, default=str))
+    except TimeoutError:
+        timed_out = True
+
+    failed = sum(1 for r in results if r["error"])
+    summary = {
+        "ok": not failed and not timed_out,
+        "service": service,
+        "action": action,
+        "targets": total,
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": results,
+    }
+    if timed_out:
+        summary["timed_out"] = total - len(results)
+    return summary
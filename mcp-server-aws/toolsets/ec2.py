@@ -0,0 +1,227 @@
+"""EC2 tools: single and bulk instance actions, fleets, listings and waiters."""
+import json
+
+from mcp.server.fastmcp import Context
+from executor import run_blocking
+from inventory import INSTANCES, inventory
+from lazy import lazy_import
+from results import failure, success
+from toolsets import Toolset
+import waiters
+
+# boto3 and .env are loaded on the first tool call, not at startup.
+helper_ec2 = lazy_import("helper_ec2")
+
+toolset = Toolset("ec2", helpers=[helper_ec2])
+
+
+@toolset.tool()
+async def initiate_aws_ec2_instance(idempotency_key: str | None = None):
+    """
+    Initiates the AWS EC2 instance creation process.
+    Pass the same idempotency_key when retrying so a retry cannot launch a second instance.
+    Without one, an identical call made within MCP_AWS_IDEMPOTENCY_WINDOW (default 10 minutes)
+    of the previous one counts as a retry: it returns the first instance, marked
+    "replayed": true. Pass a new idempotency_key to launch another instance on purpose.
+    """
+    return await run_blocking("ec2", helper_ec2.create_ec2_instance, IdempotencyKey=idempotency_key)
+
+@toolset.tool()
+async def terminate_aws_ec2_instance(instance_id: str):
+    """Terminates the AWS EC2 instance and returns its previous and current state."""
+    if not instance_id:
+        return failure("No instance ID provided.")
+    return await run_blocking("ec2", helper_ec2.terminate_ec2_instance, instance_id)
+
+@toolset.tool()
+async def stop_aws_ec2_instance(instance_id: str):
+    """Stops the AWS EC2 instance and returns its previous and current state."""
+    if not instance_id:
+        return failure("No instance ID provided.")
+    return await run_blocking("ec2", helper_ec2.stop_ec2_instance, instance_id)
+
+@toolset.tool()
+async def start_aws_ec2_instance(instance_id: str):
+    """Starts the AWS EC2 instance and returns its previous and current state."""
+    if not instance_id:
+        return failure("No instance ID provided.")
+    return await run_blocking("ec2", helper_ec2.start_ec2_instance, instance_id)
+
+@toolset.tool()
+async def launch_aws_ec2_fleet(
+    count: int,
+    instance_types: list[str] | None = None,
+    subnet_ids: list[str] | None = None,
+    availability_zones: list[str] | None = None,
+    idempotency_key: str | None = None,
+):
+    """
+    Launches a fleet of `count` EC2 instances in one request.
+
+    The instances are spread over the given subnets (or availability zones)
+    and launched as concurrent batches. On capacity errors a batch falls back
+    to the other instance types and placements. Returns all instance IDs plus
+    per-batch details. Pass the same idempotency_key when retrying so a retry
+    returns the same fleet instead of launching another. Without one, an
+    identical call made within MCP_AWS_IDEMPOTENCY_WINDOW (default 10 minutes)
+    of the previous one also returns the first fleet, marked "replayed": true;
+    pass a new idempotency_key to launch a second fleet on purpose.
+    """
+    if count < 1:
+        return failure("Count must be at least 1.")
+    return await run_blocking(
+        "ec2",
+        helper_ec2.create_ec2_fleet,
+        count,
+        subnet_ids=subnet_ids,
+        availability_zones=availability_zones,
+        instance_types=instance_types,
+        IdempotencyKey=idempotency_key,
+    )
+
+
+async def _bulk_action(action: str, instance_ids, tags, regions):
+    if not instance_ids and not tags:
+        return failure(f"Provide instance_ids and/or tags to select the instances to {action}.")
+    return await run_blocking(
+        "ec2", helper_ec2.bulk_instance_action, action, instance_ids, tags, regions
+    )
+
+
+@toolset.tool()
+async def stop_aws_ec2_instances(
+    instance_ids: list[str] | None = None,
+    tags: dict[str, str] | None = None,
+    regions: list[str] | None = None,
+):
+    """
+    Stops many EC2 instances at once.
+
+    Select instances by ID (optionally region-qualified, e.g. 'us-west-2:i-0abc')
+    and/or by tag filters searched in `regions`. Returns per-instance state
+    transitions and any failures.
+    """
+    return await _bulk_action("stop", instance_ids, tags, regions)
+
+
+@toolset.tool()
+async def start_aws_ec2_instances(
+    instance_ids: list[str] | None = None,
+    tags: dict[str, str] | None = None,
+    regions: list[str] | None = None,
+):
+    """
+    Starts many EC2 instances at once.
+
+    Select instances by ID (optionally region-qualified, e.g. 'us-west-2:i-0abc')
+    and/or by tag filters searched in `regions`. Returns per-instance state
+    transitions and any failures.
+    """
+    return await _bulk_action("start", instance_ids, tags, regions)
+
+
+@toolset.tool()
+async def terminate_aws_ec2_instances(
+    instance_ids: list[str] | None = None,
+    tags: dict[str, str] | None = None,
+    regions: list[str] | None = None,
+):
+    """
+    Terminates many EC2 instances at once.
+
+    Select instances by ID (optionally region-qualified, e.g. 'us-west-2:i-0abc')
+    and/or by tag filters searched in `regions`. Returns per-instance state
+    transitions and any failures.
+    """
+    return await _bulk_action("terminate", instance_ids, tags, regions)
+
+
+
+@toolset.tool()
+async def describe_aws_ec2_instances(state: str | None = None, refresh: bool = False):
+    """
+    Lists the live EC2 instances in the default region from the inventory cache.
+
+    Optionally filter by state (e.g. 'running', 'stopped'). Set refresh=True
+    to bypass the cache and reload from AWS.
+    """
+    try:
+        instances = await run_blocking("ec2", inventory.get, INSTANCES, refresh=refresh)
+    except Exception as e:
+        return failure(e)
+    if state:
+        instances = [i for i in instances if i["state"] == state]
+    return success(count=len(instances), instances=instances)
+
+
+@toolset.tool()
+async def list_aws_ec2_instances(
+    states: list[str] | None = None,
+    instance_types: list[str] | None = None,
+    tags: dict[str, str] | None = None,
+    page_size: int = 50,
+    cursor: str | None = None,
+):
+    """
+    Lists one page of EC2 instances, filtered by EC2 itself.
+
+    Filters: states (e.g. ["running"]), instance_types and tags ({key: value};
+    use "*" to match any value). Pass the returned next_cursor back for the
+    following page; it is None on the last one. page_size is 5 to 1000.
+    """
+    return await run_blocking(
+        "ec2", helper_ec2.list_ec2_instances, states, instance_types, tags, page_size, cursor
+    )
+
+
+@toolset.tool()
+async def aggregate_aws_ec2_instances(
+    group_by: str = "state",
+    states: list[str] | None = None,
+    instance_types: list[str] | None = None,
+    tags: dict[str, str] | None = None,
+    top: int = 50,
+):
+    """
+    Counts EC2 instances (and their vCPUs) without listing them.
+
+    group_by is "state", "instance_type", "availability_zone" or "tag:<key>".
+    The same filters as list_aws_ec2_instances apply. Returns the largest
+    `top` groups.
+    """
+    return await run_blocking(
+        "ec2", helper_ec2.aggregate_ec2_instances, group_by, states, instance_types, tags, top
+    )
+
+
+@toolset.tool()
+async def wait_for_aws_ec2_instances(
+    instance_ids: list[str],
+    target_states: list[str] | None = None,
+    timeout_seconds: int = 600,
+    ctx: Context = None,
+):
+    """
+    Waits until every instance reaches one of target_states (default: running).
+
+    All instances are polled together with one batched describe per interval,
+    with progress streamed to the client. Returns when all have settled, one
+    has hit a dead end (e.g. terminated while waiting for running) or the
+    timeout passes.
+    """
+    async def report(event):
+        if ctx is not None:
+            await ctx.report_progress(event["settled"] + event["failed"], event["total"])
+            await ctx.info(json.dumps(event))
+
+    try:
+        result = await waiters.wait_for_instances(
+            instance_ids,
+            target_states or ["running"],
+            timeout=timeout_seconds,
+            on_progress=report,
+        )
+    except Exception as e:
+        return failure(e, instance_ids=instance_ids)
+    # As with aws_fanout_action, ok is false if any instance failed or timed out.
+    return {"ok": not result["failed"] and not result["timed_out"], **result}
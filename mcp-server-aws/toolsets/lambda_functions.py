@@ -0,0 +1,73 @@
+"""Lambda tools: create, build, deploy, list and delete functions."""
+from executor import run_blocking
+from inventory import FUNCTIONS, inventory
+from lazy import lazy_import
+from results import failure, success
+from toolsets import Toolset
+
+# boto3 and .env are loaded on the first tool call, not at startup.
+helper_lambda = lazy_import("helper_lambda")
+
+toolset = Toolset("lambda", helpers=[helper_lambda])
+
+@toolset.tool()
+async def create_lambda(idempotency_key: str | None = None):
+    """
+    Creates an AWS Lambda function.
+    Concurrent or retried calls with the same idempotency_key share one request.
+    Without one, an identical call (same function and zip) made within MCP_AWS_IDEMPOTENCY_WINDOW
+    (default 10 minutes) of the previous one counts as a retry and returns the first result,
+    marked "replayed": true.
+    """
+    return await run_blocking("lambda", helper_lambda.create_lambda_function, idempotency_key)
+
+@toolset.tool()
+async def deploy_lambda(function_name: str | None = None, zip_path: str | None = None):
+    """
+    Deploys a zip to a Lambda function, creating or updating it as needed.
+
+    Nothing is uploaded when the zip's SHA-256 matches the deployed code.
+    Defaults come from LAMBDA_FUNCTION_NAME and LAMBDA_ZIP_PATH.
+    """
+    return await run_blocking("lambda", helper_lambda.deploy_lambda_function, function_name, zip_path)
+
+@toolset.tool()
+async def deploy_lambda_functions(functions: list[dict[str, str]]):
+    """
+    Deploys many Lambda functions concurrently.
+
+    Each item is {"function_name": ..., "zip_path": ...}. Unchanged functions
+    are skipped; returns per-function actions and counts.
+    """
+    return await run_blocking("lambda", helper_lambda.deploy_lambda_functions, functions)
+
+@toolset.tool()
+async def build_and_deploy_lambda(source_dir: str, function_name: str | None = None,
+                                  requirements_file: str | None = None):
+    """
+    Builds a Lambda package from source_dir (and requirements_file) and deploys it.
+
+    Dependencies are installed once per requirements hash and only changed
+    files are recompressed. The zip is byte-reproducible, so an unchanged
+    tree is not uploaded again.
+    """
+    return await run_blocking("lambda", helper_lambda.build_and_deploy_lambda_function,
+                              source_dir, function_name, requirements_file)
+
+@toolset.tool()
+async def delete_lambda():
+    """Deletes an AWS Lambda function."""
+    return await run_blocking("lambda", helper_lambda.delete_lambda_function)
+
+@toolset.tool()
+async def list_lambda_functions(refresh: bool = False):
+    """
+    Lists the Lambda functions in the default region from the inventory cache.
+
+    Set refresh=True to bypass the cache and reload from AWS.
+    """
+    try:
+        functions = await run_blocking("lambda", inventory.get, FUNCTIONS, refresh=refresh)
+    except Exception as e:
+        return failure(e)
+    return success(count=len(functions), functions=functions)
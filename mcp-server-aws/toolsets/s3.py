@@ -0,0 +1,153 @@
+"""S3 tools: bucket lifecycle, object listings and multipart transfers."""
+import asyncio
+import json
+from mcp.server.fastmcp import Context
+from executor import run_blocking
+from inventory import BUCKETS, inventory
+from lazy import lazy_import
+from results import failure, success
+from toolsets import Toolset
+
+# boto3 and .env are loaded on the first tool call, not at startup.
+helper1 = lazy_import("helper1")
+
+toolset = Toolset("s3", helpers=[helper1])
+
+@toolset.tool()
+async def initiate_s3_bucket_creation(idempotency_key: str | None = None):
+    """
+    Initiates the creation of an S3 bucket.
+    Concurrent or retried calls with the same idempotency_key share one request.
+    Without one, an identical call made within MCP_AWS_IDEMPOTENCY_WINDOW (default 10 minutes)
+    of the previous one counts as a retry and returns the first result, marked "replayed": true.
+    """
+    return await run_blocking("s3", helper1.create_s3_bucket, idempotency_key)
+
+@toolset.tool()
+async def initiate_s3_bucket_deletion(force: bool = False, ctx: Context = None):
+    """
+    Initiates the deletion of an S3 bucket.
+
+    With force=True every object and version is deleted first, in parallel
+    batches of 1,000, with progress streamed to the client. An interrupted
+    force delete resumes when called again.
+    """
+    if not force:
+        return await run_blocking("s3", helper1.delete_s3_bucket)
+
+    loop = asyncio.get_running_loop()
+    progress = asyncio.Queue()
+
+    def on_progress(event):
+        loop.call_soon_threadsafe(progress.put_nowait, event)
+
+    async def report(event):
+        if ctx is not None:
+            await ctx.report_progress(event["deleted"] + event["failed"])
+            await ctx.info(json.dumps(event))
+
+    # Emptying a large bucket can take far longer than the default tool timeout.
+    deletion = asyncio.ensure_future(
+        run_blocking("s3", helper1.delete_s3_bucket, True, on_progress, timeout=None)
+    )
+    while not deletion.done():
+        getter = asyncio.ensure_future(progress.get())
+        await asyncio.wait([deletion, getter], return_when=asyncio.FIRST_COMPLETED)
+        if not getter.done():
+            getter.cancel()
+            continue
+        await report(getter.result())
+    # The worker queued its last events before the deletion future resolved,
+    # so they are in the queue by now even if the loop above never saw them.
+    while not progress.empty():
+        await report(progress.get_nowait())
+    result = deletion.result()
+    if ctx is not None and result.get("ok") and result.get("deleted_objects"):
+        await ctx.report_progress(result["deleted_objects"], result["deleted_objects"])
+    return result
+
+@toolset.tool()
+async def upload_s3_object(
+    file_path: str,
+    key: str | None = None,
+    bucket: str | None = None,
+    part_size_mb: float | None = None,
+    concurrency: int | None = None,
+):
+    """
+    Uploads a local file to S3 with parallel, SHA-256-checked multipart parts.
+
+    file_path must be inside MCP_AWS_TRANSFER_DIR (relative paths are resolved
+    against it). key defaults to the file name and bucket to S3_BUCKET_NAME.
+    Returns the size, part count, elapsed time and throughput in MB/s.
+    """
+    return await run_blocking("s3", helper1.upload_s3_object, file_path, key, bucket,
+                              part_size_mb, concurrency, timeout=None)
+
+@toolset.tool()
+async def download_s3_object(
+    key: str,
+    file_path: str | None = None,
+    bucket: str | None = None,
+    part_size_mb: float | None = None,
+    concurrency: int | None = None,
+):
+    """
+    Downloads an S3 object to a local file with parallel part GETs.
+
+    Parts uploaded with checksums are verified one by one. file_path must be
+    inside MCP_AWS_TRANSFER_DIR (relative paths are resolved against it) and
+    defaults to the key's file name; bucket defaults to S3_BUCKET_NAME.
+    Returns the size, part count, elapsed time and throughput in MB/s.
+    """
+    return await run_blocking("s3", helper1.download_s3_object, key, file_path, bucket,
+                              part_size_mb, concurrency, timeout=None)
+
+@toolset.tool()
+async def list_s3_objects(
+    bucket: str | None = None,
+    prefix: str = "",
+    delimiter: str | None = None,
+    page_size: int = 100,
+    cursor: str | None = None,
+):
+    """
+    Lists one page of objects in a bucket (default S3_BUCKET_NAME), filtered by key prefix.
+
+    Pass the returned next_cursor back to get the following page; it is None
+    on the last one. With delimiter="/", sub-"directories" are returned as
+    common_prefixes instead of their contents. page_size is at most 1000.
+    """
+    return await run_blocking("s3", helper1.list_s3_objects, bucket, prefix=prefix,
+                              delimiter=delimiter, page_size=page_size, cursor=cursor)
+
+@toolset.tool()
+async def aggregate_s3_objects(
+    bucket: str | None = None,
+    prefix: str = "",
+    depth: int = 1,
+    top: int = 50,
+    max_objects: int | None = None,
+):
+    """
+    Summarises a bucket (default S3_BUCKET_NAME) without listing its objects.
+
+    Returns object counts and total bytes under prefix, grouped by the
+    sub-prefix `depth` levels down (largest `top` groups) and by storage
+    class. Set max_objects to cap the scan on very large buckets.
+    """
+    return await run_blocking("s3", helper1.aggregate_s3_objects, bucket, prefix=prefix,
+                              depth=depth, top=top, max_objects=max_objects)
+
+@toolset.tool()
+async def list_s3_buckets(refresh: bool = False):
+    """
+    Lists the account's S3 buckets from the inventory cache.
+
+    Set refresh=True to bypass the cache and reload from AWS.
+    """
+    try:
+        buckets = await run_blocking("s3", inventory.get, BUCKETS, refresh=refresh)
+    except Exception as e:
+        return failure(e)
+    return success(count=len(buckets), buckets=buckets)
@@ -0,0 +1,163 @@
+"""
+Per-turn latency breakdown from exported traces (see tracing.py).
+
+Reads OTLP JSON lines written by MCP_AWS_TRACE_FILE (agent and server may
+share one file or use several) and splits every agent turn into:
+
+    llm      time in the agent outside tool calls (model calls, SDK overhead)
+    spawn    starting the MCP server process and its handshake
+    mcp      tool call time the server did not account for (transport, JSON, queueing in the client)
+    server   time in the server's tool code outside AWS calls (executor queueing, Python)
+    aws      wall time with at least one AWS API call in flight
+
+    uv run trace_report.py traces.jsonl
+    uv run trace_report.py traces.jsonl --tree <trace id>
+    uv run trace_report.py traces.jsonl --json
+"""
+import argparse
+import json
+from collections import defaultdict
+
+# OTLP span kinds and status codes, as written by tracing.py
+SERVER, CLIENT = 2, 3
+STATUS_ERROR = 2
+
+
+def load(paths):
+    """Every span in the files, keyed by span ID."""
+    spans = {}
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                for resource in json.loads(line).get("resourceSpans", []):
+                    service = next((a["value"].get("stringValue") for a in resource["resource"]["attributes"]
+                                    if a["key"] == "service.name"), None)
+                    for scope in resource.get("scopeSpans", []):
+                        for span in scope.get("spans", []):
+                            span["service"] = service
+                            span["start"] = int(span["startTimeUnixNano"]) / 1e6
+                            span["end"] = int(span["endTimeUnixNano"]) / 1e6
+                            span["attrs"] = {a["key"]: next(iter(a["value"].values()))
+                                             for a in span.get("attributes", [])}
+                            spans[span["spanId"]] = span
+    return spans
+
+
+def _union_ms(intervals):
+    """Total length of the union of (start, end) intervals."""
+    total, reach = 0.0, None
+    for start, end in sorted(intervals):
+        if reach is None or start > reach:
+            total += end - start
+            reach = end
+        elif end > reach:
+            total += end - reach
+            reach = end
+    return total
+
+
+def _is_aws(span):
+    return span["attrs"].get("rpc.system") == "aws-api"
+
+
+def _is_tool(span, kind):
+    return span["name"].startswith("tools/call ") and span.get("kind") == kind
+
+
+def breakdown(spans):
+    """One row per root span (normally an agent turn), oldest first."""
+    children = defaultdict(list)
+    for span in spans.values():
+        children[span.get("parentSpanId")].append(span)
+
+    def descendants(span):
+        for child in children[span["spanId"]]:
+            yield child
+            yield from descendants(child)
+
+    rows = []
+    for root in (s for s in spans.values() if s.get("parentSpanId") not in spans):
+        inside = list(descendants(root))
+
+        def union(match):
+            return _union_ms((s["start"], s["end"]) for s in inside if match(s))
+
+        total = root["end"] - root["start"]
+        spawn = union(lambda s: s["name"] == "mcp.spawn")
+        tool_client = union(lambda s: _is_tool(s, CLIENT))
+        tool_server = union(lambda s: _is_tool(s, SERVER))
+        aws = union(_is_aws)
+        if _is_tool(root, SERVER):
+            # No agent span (another MCP client): the root is the server's tool span.
+            tool_client = tool_server = total
+        tool_calls = sum(1 for s in inside if _is_tool(s, CLIENT)) or int(_is_tool(root, SERVER))
+        rows.append({
+            "trace_id": root["traceId"],
+            "root": root["name"],
+            "input": root["attrs"].get("agent.input", ""),
+            "start_ms": root["start"],
+            "total_ms": round(total, 1),
+            "llm_ms": round(max(0.0, total - spawn - tool_client), 1),
+            "spawn_ms": round(spawn, 1),
+            "mcp_ms": round(max(0.0, tool_client - tool_server), 1) if tool_server else None,
+            "server_ms": round(max(0.0, tool_server - aws), 1) if tool_server else None,
+            "aws_ms": round(aws, 1),
+            "tool_calls": tool_calls,
+            "aws_calls": sum(1 for s in inside if _is_aws(s)),
+            "errors": sum(1 for s in [root, *inside] if s.get("status", {}).get("code") == STATUS_ERROR),
+        })
+    return sorted(rows, key=lambda row: row["start_ms"])
+
+
+def print_table(rows):
+    columns = ["total_ms", "llm_ms", "spawn_ms", "mcp_ms", "server_ms", "aws_ms"]
+    print(f"{'trace':<12} {'input':<32} " + " ".join(f"{c[:-3]:>8}" for c in columns)
+          + f" {'tools':>5} {'aws':>4} {'err':>3}")
+    for row in rows:
+        cells = " ".join(f"{'-' if row[c] is None else row[c]:>8}" for c in columns)
+        print(f"{row['trace_id'][:12]:<12} {row['input'][:32]:<32} {cells} "
+              f"{row['tool_calls']:>5} {row['aws_calls']:>4} {row['errors']:>3}")
+
+
+def print_tree(spans, trace_id):
+    members = [s for s in spans.values() if s["traceId"].startswith(trace_id)]
+    children = defaultdict(list)
+    for span in members:
+        children[span.get("parentSpanId")].append(span)
+    origin = min((s["start"] for s in members), default=0)
+
+    def walk(span, depth):
+        failed = span.get("status", {}).get("code") == STATUS_ERROR
+        status = " ERROR " + span["status"].get("message", "") if failed else ""
+        print(f"{span['start'] - origin:>9.1f} {span['end'] - span['start']:>9.1f}  "
+              f"{'  ' * depth}{span['name']} [{span['service']}]{status}")
+        for child in sorted(children[span["spanId"]], key=lambda s: s["start"]):
+            walk(child, depth + 1)
+
+    print(f"{'start ms':>9} {'dur ms':>9}  span")
+    ids = {s["spanId"] for s in members}
+    for root in sorted((s for s in members if s.get("parentSpanId") not in ids), key=lambda s: s["start"]):
+        walk(root, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="+", help="OTLP JSON lines files (MCP_AWS_TRACE_FILE)")
+    parser.add_argument("--tree", metavar="TRACE_ID", help="print the span tree of one trace (ID prefix)")
+    parser.add_argument("--json", action="store_true", help="print the breakdown as JSON lines")
+    args = parser.parse_args()
+
+    spans = load(args.files)
+    if args.tree:
+        print_tree(spans, args.tree)
+    elif args.json:
+        for row in breakdown(spans):
+            print(json.dumps(row))
+    else:
+        print_table(breakdown(spans))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Lightweight distributed tracing from the agent, through MCP, down to botocore.
+
+Spans follow the W3C Trace Context / OpenTelemetry model and are exported as
+OTLP JSON, so any OpenTelemetry collector (or a plain file) can take them;
+no OpenTelemetry SDK is needed.
+
+  * The agent (openai-agent/mcp_tracing.py) opens a span per turn under its
+    Agents SDK trace_id and sends a W3C `traceparent` in the `_meta` of each
+    tools/call request.
+  * The server opens a span around every tool call, parented to that
+    traceparent (see toolsets.Toolset.register).
+  * Every pooled boto3 client gets a span per API call, retries included,
+    through a client_pool hook; run_blocking carries the tool span into the
+    executor thread.
+
+Tracing is off unless an exporter is configured:
+
+    MCP_AWS_TRACE_FILE       append OTLP JSON, one export batch per line
+    MCP_AWS_TRACE_ENDPOINT   POST OTLP JSON to a collector, e.g. http://localhost:4318/v1/traces
+    MCP_AWS_TRACE_SERVICE    service.name of this process (default mcp-aws)
+
+trace_report.py turns exported spans into a per-turn latency breakdown.
+"""
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+
+FLUSH_INTERVAL = 1.0
+MAX_BATCH = 512
+
+_current = contextvars.ContextVar("trace_span", default=None)
+
+
+def enabled():
+    return bool(config.get("MCP_AWS_TRACE_FILE") or config.get("MCP_AWS_TRACE_ENDPOINT"))
+
+
+def environment():
+    """The MCP_AWS_TRACE_* settings, for passing on to a child server process."""
+    return {name: value for name, value in config.current().values.items()
+            if name.startswith("MCP_AWS_TRACE_") and name != "MCP_AWS_TRACE_SERVICE"}
+
+
+def _new_id(bits):
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+def parse_traceparent(value):
+    """(trace_id, span_id) from a W3C traceparent header, or None if it is malformed."""
+    parts = (value or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2]
+
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Span:
+    """One timed operation; ended exactly once, then handed to the exporter."""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "remote_parent",
+                 "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, name, kind=INTERNAL, attributes=None, parent=None, trace_id=None):
+        """
+        :param parent: a Span, a (trace_id, span_id) pair from a traceparent, or
+            None for the span current in this context
+        :param trace_id: trace ID for a new root span (32 hex characters)
+        """
+        if parent is None:
+            parent = _current.get()
+        if isinstance(parent, Span):
+            self.trace_id, self.parent_id, self.remote_parent = parent.trace_id, parent.span_id, False
+        elif parent:
+            (self.trace_id, self.parent_id), self.remote_parent = parent, True
+        else:
+            self.trace_id, self.parent_id, self.remote_parent = trace_id or _new_id(128), None, False
+        self.name = name
+        self.kind = kind
+        self.span_id = _new_id(64)
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_error(self, message):
+        self.error = str(message)
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            _exporter.export(self)
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": STATUS_ERROR, "message": self.error} if self.error else {"code": STATUS_OK},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def current_span():
+    return _current.get()
+
+
+@contextmanager
+def span(name, kind=INTERNAL, attributes=None, parent=None, trace_id=None):
+    """Run the block inside a new span, which becomes the current span."""
+    current = Span(name, kind, attributes, parent, trace_id)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set_error(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current.reset(token)
+        current.end()
+
+
+class _Exporter:
+    """Batches ended spans and writes them from a background thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = []
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def export(self, span):
+        if not enabled():
+            return
+        with self._lock:
+            self._spans.append(span)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-export", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+        # A local root (an agent turn or a server tool call) is complete; ship it now.
+        if span.parent_id is None or span.remote_parent or len(self._spans) >= MAX_BATCH:
+            self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(FLUSH_INTERVAL)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            spans, self._spans = self._spans, []
+        if not spans:
+            return
+        service = config.get("MCP_AWS_TRACE_SERVICE", "mcp-aws")
+        payload = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", service)]},
+            "scopeSpans": [{"scope": {"name": "mcp-aws"}, "spans": [s.to_otlp() for s in spans]}],
+        }]}, separators=(",", ":"))
+        path, endpoint = config.get("MCP_AWS_TRACE_FILE"), config.get("MCP_AWS_TRACE_ENDPOINT")
+        try:
+            if path:
+                # One O_APPEND write per batch, so agent and server can share a file.
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, (payload + "\n").encode())
+                finally:
+                    os.close(fd)
+            if endpoint:
+                request = urllib.request.Request(endpoint, payload.encode(),
+                                                 {"Content-Type": "application/json"})
+                urllib.request.urlopen(request, timeout=5).close()
+        except OSError as e:
+            logger.warning("Could not export %d spans: %s", len(spans), e)
+
+
+_exporter = _Exporter()
+
+
+def _incoming_parent():
+    """(trace_id, span_id) from the traceparent in the current MCP request's _meta, if any."""
+    try:
+        from mcp.server.lowlevel.server import request_ctx
+        meta = request_ctx.get().meta
+    except (ImportError, LookupError):
+        return None
+    if meta is None:
+        return None
+    value = meta.get("traceparent") if isinstance(meta, dict) else getattr(meta, "traceparent", None)
+    return parse_traceparent(value)
+
+
+def instrument(name, fn):
+    """Wrap the async tool fn in a server span continuing the caller's trace."""
+    @functools.wraps(fn)
+    async def tool(*args, **kwargs):
+        with span(f"tools/call {name}", SERVER, {"mcp.tool.name": name},
+                  parent=_incoming_parent()) as current:
+            result = await fn(*args, **kwargs)
+            if isinstance(result, dict) and result.get("ok") is False:
+                current.set_error(result.get("code") or result.get("error"))
+            return result
+    return tool
+
+
+_CONTEXT_KEY = "mcp_trace_span"
+
+
+def install(client, account="default"):
+    """client_pool hook: a client span around every API call the client makes."""
+    service = client.meta.service_model.service_name
+    region = client.meta.region_name
+
+    def before_call(model, context, **kwargs):
+        context[_CONTEXT_KEY] = Span(f"{service}.{model.name}", CLIENT, {
+            "rpc.system": "aws-api",
+            "rpc.service": service,
+            "rpc.method": model.name,
+            "cloud.region": region,
+            "cloud.account.id": account,
+        })
+
+    def after_call(http_response, parsed, context, **kwargs):
+        current = context.pop(_CONTEXT_KEY, None)
+        if current is None:
+            return
+        metadata = parsed.get("ResponseMetadata", {}) if isinstance(parsed, dict) else {}
+        current.attributes["http.status_code"] = metadata.get("HTTPStatusCode", 0)
+        current.attributes["aws.retry_attempts"] = metadata.get("RetryAttempts", 0)
+        if metadata.get("RequestId"):
+            current.attributes["aws.request_id"] = metadata["RequestId"]
+        code = parsed.get("Error", {}).get("Code") if isinstance(parsed, dict) else None
+        if code:
+            current.set_error(code)
+        current.end()
+
+    def after_call_error(exception, context, **kwargs):
+        current = context.pop(_CONTEXT_KEY, None)
+        if current is not None:
+            current.set_error(f"{type(exception).__name__}: {exception}")
+            current.end()
+
+    client.meta.events.register("before-call", before_call)
+    client.meta.events.register("after-call", after_call)
+    client.meta.events.register("after-call-error", after_call_error)
+
+
+if enabled():
+    from client_pool import add_client_hook
+
+    add_client_hook(install)
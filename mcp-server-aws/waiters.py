@@ -0,0 +1,107 @@
+"""
+Multiplexed waiting on EC2 instance state changes.
+
+Instead of the agent spending one LLM turn and one describe call per
+instance per check, wait_for_instances polls every pending instance with
+one batched describe per interval. The interval backs off while nothing
+changes and resets as soon as something does.
+
+    EC2_WAIT_MIN_INTERVAL  first/reset poll interval in seconds (default 2)
+    EC2_WAIT_MAX_INTERVAL  longest poll interval in seconds (default 15)
+"""
+import asyncio
+import time
+
+import config
+from executor import run_blocking
+from lazy import lazy_import
+
+helper_ec2 = lazy_import("helper_ec2")
+
+# States an instance cannot leave to reach anything other than themselves.
+DEAD_END_STATES = {"shutting-down", "terminated"}
+# Reported in failed for an ID that describe_instances never returns.
+NOT_FOUND = "InvalidInstanceID.NotFound"
+
+
+def _interval(name, default):
+    return config.get_float(name, float(default))
+
+
+async def wait_for_instances(
+    instance_ids,
+    target_states=("running",),
+    timeout: float = 600,
+    region: str = None,
+    on_progress=None,
+):
+    """
+    Poll instance_ids until each reaches one of target_states or the deadline passes.
+
+    An instance that enters a dead-end state (shutting-down/terminated) it was
+    not waited for is reported as failed rather than polled until the deadline.
+    An ID missing from the first describe gets one more poll, since a fresh
+    launch can take a moment to show up; if it is still missing it is failed
+    as InvalidInstanceID.NotFound.
+
+    :param on_progress: optional async callable(event dict) awaited after
+        every poll, for streaming progress to the client
+    :return: dict with settled/failed/timed-out states and the number of polls
+    """
+    targets = set(target_states)
+    pending = list(dict.fromkeys(instance_ids))
+    total = len(pending)
+    states, settled, failed = {}, {}, {}
+    missing = set()
+    min_delay = _interval("EC2_WAIT_MIN_INTERVAL", "2")
+    max_delay = _interval("EC2_WAIT_MAX_INTERVAL", "15")
+    delay = min_delay
+    polls = 0
+    started = time.monotonic()
+    deadline = started + timeout
+
+    while pending:
+        observed = await run_blocking(
+            "ec2", helper_ec2.describe_instance_states, pending, region
+        )
+        polls += 1
+        changed = False
+        for instance_id in pending:
+            state = observed.get(instance_id)
+            if state is None and instance_id not in states:
+                if instance_id in missing:
+                    failed[instance_id] = NOT_FOUND
+                missing.add(instance_id)
+            if state is not None and state != states.get(instance_id):
+                states[instance_id] = state
+                changed = True
+            if state in targets:
+                settled[instance_id] = state
+            elif state in DEAD_END_STATES and not targets & DEAD_END_STATES:
+                failed[instance_id] = state
+        pending = [i for i in pending if i not in settled and i not in failed]
+
+        if on_progress is not None:
+            await on_progress({
+                "poll": polls,
+                "settled": len(settled),
+                "failed": len(failed),
+                "pending": len(pending),
+                "total": total,
+                "states": {i: states.get(i) for i in pending},
+            })
+
+        now = time.monotonic()
+        if not pending or now >= deadline:
+            break
+        delay = min_delay if changed else min(max_delay, delay * 1.5)
+        await asyncio.sleep(min(delay, deadline - now))
+
+    return {
+        "target_states": sorted(targets),
+        "settled": settled,
+        "failed": failed,
+        "timed_out": {i: states.get(i) for i in pending},
+        "polls": polls,
+        "elapsed_s": round(time.monotonic() - started, 1),
+    }